@@ -0,0 +1,58 @@
+from datetime import date, timedelta
+from typing import List, Optional
+from urllib.parse import urlencode
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+from .config.tasks import TasksConfigFile
+from .models import Result
+
+# Longest range /daily-events/range/ serves in one request
+DAILY_EVENTS_RANGE_MAX_DAYS = 366
+
+
+def _get_daily_window(config: TasksConfigFile, start_date: date, end_date: date,
+                      thread: Optional[str] = None) -> List[Result]:
+    params = {
+        'from': start_date.strftime('%Y-%m-%d'),
+        'to': end_date.strftime('%Y-%m-%d'),
+    }
+
+    if thread:
+        params['thread'] = thread
+
+    url = '{}/daily-events/range/?{}'.format(config.url, urlencode(params))
+
+    auth = HTTPBasicAuth(config.user, config.password)
+
+    r = requests.get(url, auth=auth)
+
+    out = r.json()
+
+    if not r.ok:
+        raise RuntimeError("{}: {}".format(r.status_code, str(out)))
+
+    return [Result.model_validate(day) for day in out['days']]
+
+
+def get_daily_results(config: TasksConfigFile, start_date: date, end_date: date,
+                      thread: Optional[str] = None) -> List[Result]:
+    """Fetch events, plan and reflection of every day from start_date to
+    end_date (inclusive), one Result per day.
+
+    Sends a request per DAILY_EVENTS_RANGE_MAX_DAYS days, the longest range
+    the server serves at once. Without a thread the server defaults to
+    Daily."""
+    results = []
+
+    while start_date <= end_date:
+        window_end = min(
+            end_date, start_date + timedelta(days=DAILY_EVENTS_RANGE_MAX_DAYS - 1)
+        )
+
+        results += _get_daily_window(config, start_date, window_end, thread)
+
+        start_date = window_end + timedelta(days=1)
+
+    return results
@@ -40,6 +40,7 @@ from .models import (
     ObservationMade, ObservationClosed, Result
 )
 from .presenters import get_presenter, get_plan_presenter, get_reflection_presenter
+from .daily import get_daily_results
 
 EVENT_TEMPLATE = """
 ### {{ resourcetype }}: {{ published }}
@@ -99,36 +100,6 @@ def first_line(text):
     return text
 
 
-def parse_result(result_data: dict) -> Result:
-    return Result.model_validate(result_data)
-
-
-def get_daily_events(config: TasksConfigFile, arguments: dict, dt: date = None):
-    if dt is None:
-        dt = datetime.now().date()
-
-    dt_string = '?date={}'.format(dt.strftime('%Y-%m-%d'))
-
-    if arguments.get('--thread'):
-        dt_string += '&thread={}'.format(arguments['--thread'])
-
-    url = '{}/api/events/daily/{}'.format(
-        config.url,
-        dt_string,
-    )
-
-    auth = HTTPBasicAuth(config.user, config.password)
-
-    r = requests.get(url, auth=auth)
-
-    out = r.json()
-
-    if not r.ok:
-        raise RuntimeError("{}: {}".format(r.status_code, str(out)))
-
-    return parse_result(out)
-
-
 def do_fill(text, width=80):
     # preserve links
     if any(a in text for a in ('](', 'http://', 'https://')):
@@ -265,20 +236,14 @@ def main():
         start_date = parse(arguments['--from']).date() if arguments['--from'] else datetime.now().date()
         end_date = parse(arguments['--to']).date() if arguments['--to'] else start_date
 
-    def date_range(start_date, end_date, delta):
-        current_date = start_date
-        while current_date <= end_date:
-            yield current_date
-            current_date += delta
-
     already_deleted = set()
 
-    for dt in date_range(start_date, end_date, timedelta(days=1)):
+    for result in get_daily_results(config, start_date, end_date, arguments['--thread']):
+        dt = result.date
+
         if path:
             print("Processing... {}".format(dt), "\r", end='')
 
-        result = get_daily_events(config, arguments, dt)
-
         if result.empty():
             continue
 
@@ -44,6 +44,10 @@ from .config.tasks import TasksConfigFile
 
 from .utils import get_cursor_position
 
+from .daily import get_daily_results
+
+from requests.exceptions import RequestException
+
 from datetime import timezone
 
 from dateutil.parser import parse
@@ -156,15 +160,11 @@ def published_from_arguments(arguments):
     return dt
 
 
-def fill_missing_journal_entries(arguments):
+def fill_missing_journal_entries(arguments, config):
     """Fill in missing journal entries for the specified date range."""
-    cmd = ['reflectiondump', '-M']
-
-    day = parse(arguments['--date']) if arguments['--date'] else date.today()
+    day = parse(arguments['--date']).date() if arguments['--date'] else date.today()
 
     thread = get_fetch_thread_from_arguments(arguments)
-    if thread is not None:
-        cmd += ['--thread', thread]
 
     if arguments['--week']:
         start, end = get_start_and_end_of_week(day)
@@ -175,48 +175,35 @@ def fill_missing_journal_entries(arguments):
     else:
         start = end = day
 
-    cmd += [
-        '-d', start.strftime('%Y-%m-%d'),
-        '-D', end.strftime('%Y-%m-%d'),
+    try:
+        results = get_daily_results(config, start, end, thread)
+    except (RequestException, RuntimeError) as e:
+        print(f"Error fetching reflections: {e}")
+        return
+
+    today = date.today()
+
+    missing_dates_until_today = [
+        result.date for result in results
+        if result.date <= today and (not result.reflection or result.reflection.empty())
     ]
 
-    try:
-        output = subprocess.check_output(cmd).decode('utf-8').strip()
-        
-        if not output:
-            return
-        
-        missing_dates = map(lambda x: x.strip(), output.split('\n'))
-        
-        today = date.today()
-        
-        def is_past_or_today(date_str):
-            try:
-                parsed_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                return parsed_date <= today
-            except ValueError:
-                return False
-        
-        missing_dates_until_today = list(filter(is_past_or_today, missing_dates))
-        
-        if not missing_dates_until_today:
-            print("No missing journal entries found for past dates.")
-            return
-            
-        print(f"Found {len(missing_dates_until_today)} missing journal entries for past dates.")
-        
-        for date_str in missing_dates_until_today:
-            date_str_formatted = datetime.strptime(date_str, '%Y-%m-%d').strftime('%Y-%m-%d (%A)')
-            print(f"Creating journal entry for {date_str_formatted}...")
+    if not missing_dates_until_today:
+        print("No missing journal entries found for past dates.")
+        return
+
+    print(f"Found {len(missing_dates_until_today)} missing journal entries for past dates.")
+
+    for missing_date in missing_dates_until_today:
+        date_str = missing_date.strftime('%Y-%m-%d')
+        print(f"Creating journal entry for {missing_date.strftime('%Y-%m-%d (%A)')}...")
+
+        journal_cmd = ['journal', '--date', date_str]
 
-            journal_cmd = ['journal', '--date', date_str]
-            
-            try:
-                subprocess.run(journal_cmd, check=True)
-            except subprocess.CalledProcessError:
-                print(f"Error creating journal entry for {date_str}")
-    except subprocess.CalledProcessError as e:
-        print(f"Error running reflectiondump: {e}")
+        try:
+            subprocess.run(journal_cmd, check=True)
+        except subprocess.CalledProcessError:
+            print(f"Error creating journal entry for {date_str}")
 
 
 def is_daily_mode(arguments):
@@ -276,7 +263,7 @@ def main():
     config = TasksConfigFile()
     
     if arguments['--missing']:
-        fill_missing_journal_entries(arguments)
+        fill_missing_journal_entries(arguments, config)
 
     if is_daily_mode(arguments):
         daily_reflection(arguments)
@@ -62,6 +62,7 @@ from .models import (
 from .presenters import (
     get_presenter, get_plan_presenter, get_reflection_presenter
 )
+from .daily import get_daily_results
 
 
 EVENT_TEMPLATE = """
@@ -121,38 +122,6 @@ TIME_FORMAT = '(%a) %H:%M'
 DAILY_TIME_FORMAT = '%H:%M'
 
 
-def parse_result(result_data: dict) -> Result:
-    return Result.model_validate(result_data)
-
-
-def get_daily_events(config: TasksConfigFile, arguments: dict, dt: date = None):
-    if dt is None:
-        dt = datetime.now().date()
-    
-    params = {
-        'date': dt.strftime('%Y-%m-%d'),
-        'thread': arguments['--thread'] if arguments['--thread'] else 'Daily',
-    }
-
-    dt_string = urlencode(params)
-
-    url = '{}/api/events/daily/?{}'.format(
-        config.url, 
-        dt_string,
-    )
-
-    auth = HTTPBasicAuth(config.user, config.password)
-
-    r = requests.get(url, auth=auth)
-
-    out = r.json()
-
-    if not r.ok:
-        raise RuntimeError("{}: {}".format(r.status_code, str(out)))
-
-    return parse_result(out)
-
-
 def do_fill(text, width=80):
     # preserve links
     if any(a in text for a in ('](', 'http://', 'https://')):
@@ -385,37 +354,23 @@ def main():
         start_date = parse(arguments['--from']).date() if arguments['--from'] else datetime.now().date()
         end_date = parse(arguments['--to']).date() if arguments['--to'] else start_date
 
-    def date_range(start_date, end_date, delta=timedelta(days=1)):
-        current_date = start_date
-        while current_date <= end_date:
-            yield current_date
-            current_date += delta
-
-    def try_get_daily_events(dt, config, arguments):
-        try:
-            return get_daily_events(config, arguments, dt)
-        except RequestException as e:
-            print(f"Error fetching data for {dt}: {str(e)}", file=sys.stderr)
-            return None
-
-    date_results = list(map(
-        lambda dt: (
-            dt,
-            try_get_daily_events(dt, config, arguments)
-        ),
-        date_range(start_date, end_date)
-    ))
-    
+    try:
+        results = get_daily_results(
+            config, start_date, end_date, arguments['--thread'] or 'Daily'
+        )
+    except (RequestException, RuntimeError) as e:
+        print(f"Error fetching data from {start_date} to {end_date}: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
     if arguments['--missing']:
-        missing_dates = [dt for dt, result in date_results if result is None or not result.reflection or result.reflection.empty()]
+        missing_dates = [result.date for result in results if not result.reflection or result.reflection.empty()]
         
         for dt in missing_dates:
             print(dt.strftime('%Y-%m-%d'))
         
         return
 
-    valid_results = [result for _, result in date_results 
-                    if result is not None and not result.empty()]
+    valid_results = [result for result in results if not result.empty()]
     
     aggregator = ResultAggregator(
         valid_results,
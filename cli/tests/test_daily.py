@@ -0,0 +1,66 @@
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+from tasks_collector_tools.daily import DAILY_EVENTS_RANGE_MAX_DAYS, get_daily_results
+
+
+class Config:
+    url = 'https://tasks.example.com'
+    user = 'user'
+    password = 'password'
+
+
+def _range_response(url, auth):
+    """What the server answers for one from/to window, refusing long ones"""
+    params = dict(part.split('=') for part in url.split('?')[1].split('&'))
+    start = date.fromisoformat(params['from'])
+    end = date.fromisoformat(params['to'])
+    response = mock.Mock()
+
+    if (end - start).days >= DAILY_EVENTS_RANGE_MAX_DAYS:
+        response.ok = False
+        response.status_code = 400
+        response.json.return_value = {'error': 'range too long'}
+        return response
+
+    response.ok = True
+    response.json.return_value = {
+        'days': [
+            {
+                'date': (start + timedelta(days=offset)).isoformat(),
+                'events': [],
+                'plan': None,
+                'reflection': None,
+            }
+            for offset in range((end - start).days + 1)
+        ],
+    }
+
+    return response
+
+
+class GetDailyResultsTestCase(unittest.TestCase):
+    @mock.patch('tasks_collector_tools.daily.requests.get', side_effect=_range_response)
+    def test_ranges_longer_than_a_year_are_fetched_in_windows(self, get):
+        start, end = date(2023, 1, 1), date(2025, 3, 1)
+
+        results = get_daily_results(Config(), start, end, thread='Weekly')
+
+        self.assertEqual(get.call_count, 3)
+        self.assertIn('thread=Weekly', get.call_args.args[0])
+        self.assertEqual(
+            [result.date for result in results],
+            [start + timedelta(days=offset) for offset in range((end - start).days + 1)],
+        )
+
+    @mock.patch('tasks_collector_tools.daily.requests.get', side_effect=_range_response)
+    def test_a_single_day_is_one_request(self, get):
+        results = get_daily_results(Config(), date(2024, 2, 29), date(2024, 2, 29))
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual([result.date for result in results], [date(2024, 2, 29)])
+
+
+if __name__ == '__main__':
+    unittest.main()
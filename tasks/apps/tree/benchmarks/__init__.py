@@ -0,0 +1,4 @@
+"""
+Benchmarks; see bench_views.py for the views, bench_keywords.py for habit
+keyword matching and bench_commit.py for splitting boards on commit.
+"""
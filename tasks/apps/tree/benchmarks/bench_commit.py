@@ -0,0 +1,57 @@
+"""
+Board commit: one deep copy and cut per thread against the single pass.
+
+Commits random boards of a few thousand tasks both ways, checks that they
+give the same boards and that the single pass is faster by at least
+``MIN_SPEEDUP``.
+"""
+
+import random
+import sys
+import time
+import unittest
+from copy import deepcopy
+
+from ..commit import calculate_changes_per_board
+from ..tests.test_commit import changes_per_board_by_cutting, random_board_state
+
+BOARDS = 5
+
+ITEMS = 400
+
+MIN_SPEEDUP = 2
+
+
+def _count(items):
+    return sum(1 + _count(item["children"]) for item in items)
+
+
+class BoardCommitBenchmark(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+
+        self.boards = [random_board_state(rng, ITEMS, depth=5) for _ in range(BOARDS)]
+
+    def _time(self, changes_per_board):
+        # Copied up front so that only the commit itself is timed
+        boards = deepcopy(self.boards)
+
+        start = time.perf_counter()
+        results = [changes_per_board(state) for state in boards]
+
+        return time.perf_counter() - start, results
+
+    def test_single_pass_is_faster(self):
+        cutting, expected = self._time(changes_per_board_by_cutting)
+        single_pass, results = self._time(calculate_changes_per_board)
+
+        nodes = sum(map(_count, self.boards)) // BOARDS
+
+        sys.stderr.write(
+            f"\n{BOARDS} boards of ~{nodes} tasks: "
+            f"cutting {cutting:.3f}s, single pass {single_pass:.3f}s "
+            f"({cutting / single_pass:.1f}x)\n"
+        )
+
+        self.assertEqual(results, expected)
+        self.assertGreater(cutting / single_pass, MIN_SPEEDUP)
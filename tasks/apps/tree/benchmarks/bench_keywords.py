@@ -0,0 +1,64 @@
+"""
+Habit keyword matching: the linear scan against the prefix trie.
+
+Matches journal-like tokens against a few thousand keywords both ways,
+checks that they agree and that the trie is faster by at least
+``MIN_SPEEDUP``.
+"""
+
+import random
+import sys
+import time
+import unittest
+
+from ..services.journalling.habit_extraction import find_best_keyword_match
+from ..services.journalling.keyword_index import KeywordTrie
+
+KEYWORDS = 3000
+
+TOKENS = 2000
+
+MIN_SPEEDUP = 20
+
+LETTERS = "abcdefghijklmnopqrstuvwxyząęłóśż"
+
+
+class KeywordMatchingBenchmark(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+
+        self.keywords = list(
+            dict.fromkeys(
+                "".join(rng.choice(LETTERS) for _ in range(rng.randrange(3, 14)))
+                for _ in range(KEYWORDS)
+            )
+        )
+        self.tokens = [
+            rng.choice(self.keywords)[: rng.randrange(2, 10)]
+            + " "
+            + "".join(rng.choice(LETTERS) for _ in range(20))
+            for _ in range(TOKENS)
+        ]
+
+    def _time(self, match):
+        start = time.perf_counter()
+        results = [match(token) for token in self.tokens]
+
+        return time.perf_counter() - start, results
+
+    def test_trie_matches_faster(self):
+        trie = KeywordTrie(dict.fromkeys(self.keywords))
+
+        linear, expected = self._time(
+            lambda token: find_best_keyword_match(token, self.keywords)[1:]
+        )
+        indexed, results = self._time(trie.best_match)
+
+        sys.stderr.write(
+            f"\n{len(self.keywords)} keywords, {TOKENS} tokens: "
+            f"linear {linear:.3f}s, trie {indexed:.4f}s "
+            f"({linear / indexed:.0f}x)\n"
+        )
+
+        self.assertEqual(results, expected)
+        self.assertGreater(linear / indexed, MIN_SPEEDUP)
@@ -0,0 +1,251 @@
+"""
+Query-count and latency budgets for the hot web and API views.
+
+Each benchmark requests a page against the seeded data set once to warm up,
+then records the number of queries and the best wall time of a few runs and
+fails when either exceeds the view's budget. Query budgets do not depend on
+the data volume, so a per-row lookup sneaking into a view fails here long
+before it shows up in production.
+"""
+
+import datetime
+import json
+import os
+import sys
+import time
+import unittest
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from ..models import Observation, ObservationAttached, Story, Thread
+from ..services.synthetic.generator import SyntheticDataset
+
+# Last seeded day; benchmarks request pages around it
+SEED_END = datetime.date(2026, 5, 31)
+
+BenchmarkData = namedtuple(
+    "BenchmarkData", ["user", "token", "thread", "trip", "observation", "end"]
+)
+
+Budget = namedtuple("Budget", ["queries", "seconds"])
+
+BenchmarkResult = namedtuple(
+    "BenchmarkResult", ["name", "queries", "seconds", "budget"]
+)
+
+# Query budgets are what the views run today; a view needing more queries
+# (or more queries on a bigger data set) is a regression.
+BUDGETS = {
+    "today": Budget(queries=13, seconds=0.5),
+    # Renders an edit form per entry; the time goes to the templates. Photo
+    # entries and the trips they belong to take a query each.
+    "journal_archive_month": Budget(queries=13, seconds=4.0),
+    "observation_list": Budget(queries=10, seconds=1.0),
+    "observation_search_pk": Budget(queries=7, seconds=0.3),
+    "observation_search_text": Budget(queries=7, seconds=0.5),
+    "stats": Budget(queries=5, seconds=0.3),
+    "trip_detail": Budget(queries=7, seconds=0.5),
+    # Walks the before/after trees of a year of board commits of every thread
+    "summaries": Budget(queries=4, seconds=6.0),
+    "android_task_today": Budget(queries=6, seconds=0.2),
+    "android_board_items": Budget(queries=3, seconds=0.2),
+    "android_trip_list": Budget(queries=4, seconds=0.2),
+    "android_trip_detail": Budget(queries=5, seconds=0.5),
+}
+
+# Multiplier for the data volumes, e.g. 0.1 for a quick local run
+SCALE = float(os.environ.get("BENCHMARK_SCALE", "1"))
+
+# Multiplier for the time budgets on machines slower than a developer laptop
+TIME_FACTOR = float(os.environ.get("BENCHMARK_TIME_FACTOR", "1"))
+
+# Optional path of a JSON report with the recorded numbers
+REPORT = os.environ.get("BENCHMARK_REPORT")
+
+RUNS = 3
+
+
+class ViewBenchmarks(TestCase):
+    results = []
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="benchmark")
+        SyntheticDataset(user, scale=SCALE, end=SEED_END).generate()
+
+        cls.data = BenchmarkData(
+            user=user,
+            token=Token.objects.create(user=user),
+            thread=Thread.objects.get(name="Daily"),
+            trip=Story.objects.annotate(entry_count=Count("entries"))
+            .order_by("-entry_count", "pk")
+            .first(),
+            observation=Observation.objects.filter(
+                event_stream_id__in=ObservationAttached.objects.values(
+                    "event_stream_id"
+                )
+            )
+            .order_by("pk")
+            .first(),
+            end=SEED_END,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        rows = [result._asdict() for result in cls.results]
+
+        for row in rows:
+            row["budget"] = row["budget"]._asdict()
+
+        if REPORT:
+            with open(REPORT, "w") as report:
+                json.dump(rows, report, indent=2)
+
+        for row in rows:
+            sys.stderr.write(
+                "{name:<28} {queries:>4} queries {seconds:>8.3f}s\n".format(**row)
+            )
+
+    def setUp(self):
+        self.web = APIClient()
+        self.web.force_login(self.data.user)
+
+        self.android = APIClient()
+        self.android.credentials(HTTP_AUTHORIZATION=f"Token {self.data.token.key}")
+
+    def _measure(self, name, client, url, params=None):
+        budget = BUDGETS[name]
+
+        response = client.get(url, params)
+        self.assertEqual(response.status_code, 200, name)
+
+        with CaptureQueriesContext(connection) as context:
+            client.get(url, params)
+
+        # Read before the next request resets the connection's query log
+        queries = [query["sql"] for query in context.captured_queries]
+
+        timings = []
+
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            response = client.get(url, params)
+            timings.append(time.perf_counter() - start)
+
+        result = BenchmarkResult(name, len(queries), min(timings), budget)
+        self.results.append(result)
+
+        self.assertLessEqual(
+            result.queries,
+            budget.queries,
+            "{} ran {} queries:\n{}".format(
+                name,
+                result.queries,
+                "\n".join(queries),
+            ),
+        )
+        self.assertLessEqual(
+            result.seconds,
+            budget.seconds * TIME_FACTOR,
+            f"{name} took {result.seconds:.3f}s",
+        )
+
+        return response
+
+    def test_today(self):
+        self._measure(
+            "today",
+            self.web,
+            reverse("public-today"),
+            {"date": self.data.end.isoformat(), "thread": self.data.thread.name},
+        )
+
+    def test_journal_archive_month(self):
+        self._measure(
+            "journal_archive_month",
+            self.web,
+            reverse(
+                "public-diary-archive-month",
+                args=[self.data.end.year, self.data.end.month],
+            ),
+        )
+
+    def test_observation_list(self):
+        self._measure(
+            "observation_list", self.web, reverse("public-observation-list-all")
+        )
+
+    def test_observation_search_by_pk(self):
+        self._measure(
+            "observation_search_pk",
+            self.web,
+            reverse("public-observation-search"),
+            {
+                "q": f"#{str(self.data.observation.pk)[0]}",
+                "observation": self.data.observation.pk,
+            },
+        )
+
+    @unittest.skipUnless(
+        connection.vendor == "postgresql", "full-text search requires PostgreSQL"
+    )
+    def test_observation_search_by_text(self):
+        self._measure(
+            "observation_search_text",
+            self.web,
+            reverse("public-observation-search"),
+            {"q": "coffee", "observation": self.data.observation.pk},
+        )
+
+    def test_stats(self):
+        self._measure("stats", self.web, reverse("stats"))
+
+    def test_trip_detail(self):
+        self._measure(
+            "trip_detail", self.web, reverse("trip-detail", args=[self.data.trip.pk])
+        )
+
+    def test_summaries(self):
+        self._measure(
+            "summaries",
+            self.web,
+            reverse("summaries"),
+            {
+                "from": (self.data.end - datetime.timedelta(days=365)).isoformat(),
+                "to": (self.data.end + datetime.timedelta(days=1)).isoformat(),
+            },
+        )
+
+    def test_android_task_today(self):
+        self._measure(
+            "android_task_today",
+            self.android,
+            reverse("android-task-today"),
+            {"date": self.data.end.isoformat()},
+        )
+
+    def test_android_board_items(self):
+        self._measure(
+            "android_board_items", self.android, reverse("android-board-items")
+        )
+
+    def test_android_trip_list(self):
+        self._measure("android_trip_list", self.android, reverse("android-trip-list"))
+
+    def test_android_trip_detail(self):
+        self._measure(
+            "android_trip_detail",
+            self.android,
+            reverse("android-trip-detail", args=[self.data.trip.pk]),
+        )
@@ -1,8 +1,10 @@
 import uuid
 
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 
 from .models import Board, Thread
+from .services.boards.versions import retry_on_conflict, save_if_unchanged
 
 
 def create_task_item(text):
@@ -29,12 +31,14 @@ def create_task_item(text):
     }
 
 
+@retry_on_conflict
+@transaction.atomic
 def add_task_to_board(text, thread_name):
     """Helper function to add a task to a board"""
     thread = get_object_or_404(Thread, name=thread_name)
     board = Board.objects.filter(thread=thread).order_by("-date_started").first()
     if board:
         board.state.append(create_task_item(text))
-        board.save()
+        save_if_unchanged(board, ["state"])
         return board
     return None
@@ -1,6 +1,4 @@
 import uuid
-from collections import OrderedDict
-from copy import deepcopy
 from functools import reduce
 
 
@@ -249,23 +247,24 @@ def merge(a, b):
     Returns:
         list: Merged list where:
               - Items with same text have their children merged recursively
-              - Items unique to b are appended to the result
+              - Items unique to b are appended to the result, in b's order
               - Original order from a is preserved, b items added at end
     """
-    names_a = OrderedDict((item["data"]["text"], index) for index, item in enumerate(a))
-    names_b = OrderedDict((item["data"]["text"], index) for index, item in enumerate(b))
+    # With repeated texts the last item of each text is the one merged
+    items_a = {item["data"]["text"]: item for item in a}
+    items_b = {item["data"]["text"]: item for item in b}
 
-    common = set(names_a.keys()).intersection(names_b.keys())
+    appended = []
 
-    in_b = set(names_b.keys()).difference(names_a.keys())
+    for text, item_b in items_b.items():
+        item_a = items_a.get(text)
 
-    for key in common:
-        item_a = a[names_a[key]]
-        item_b = b[names_b[key]]
+        if item_a is None:
+            appended.append(item_b)
+        else:
+            item_a["children"] = merge(item_a["children"], item_b["children"])
 
-        item_a["children"] = merge(item_a["children"], item_b["children"])
-
-    return a + [b[names_b[key]] for key in in_b]
+    return a + appended
 
 
 def pprint(board_state, level=0):
@@ -284,6 +283,48 @@ def pprint(board_state, level=0):
         pprint(item["children"], level + 1)
 
 
+def partition_by_thread(board_state, names, implied=False):
+    """
+    Split transitioned board items between the threads they are destined for.
+
+    Gives the same boards as ``cut_leaves`` run once per thread, in a single
+    walk and without copying the tree: every item is placed on the board of
+    its inherited transition, or of its own when it inherits none, and in
+    addition on every board one of its descendants goes to. An item on one
+    board is reused as is; one on several boards is shallow-copied per extra
+    board, sharing its data. Transition markers are removed in place.
+
+    Args:
+        board_state (list): Items as returned by transition_data_between_boards
+        names (set): Collects every transition found, None for items without
+        implied (str or bool): Transition inherited from the parent items
+
+    Returns:
+        dict: Mapping of thread names to the items placed on their boards
+    """
+    boards = {}
+
+    for item in board_state:
+        # None or string
+        item_thread_name = item["data"]["meaningfulMarkers"].pop("transition", None)
+        names.add(item_thread_name)
+
+        children = partition_by_thread(
+            item["children"], names, implied=item_thread_name or implied
+        )
+
+        destinations = dict.fromkeys(children)
+        destinations[implied or item_thread_name] = None
+
+        for index, name in enumerate(destinations):
+            node = item if index == 0 else {**item}
+            node["children"] = children.get(name, [])
+
+            boards.setdefault(name, []).append(node)
+
+    return boards
+
+
 def calculate_changes_per_board(state):
     """
     Calculate board transitions by distributing items to their target threads.
@@ -293,18 +334,15 @@ def calculate_changes_per_board(state):
 
     Returns:
         dict: Mapping of thread names to their respective board states where:
-              - Keys are thread names referenced in transition markers
+              - Keys are thread names referenced in transition markers, and
+                None if any item has no transition
               - Values are board states with items destined for each thread
-              - Items are deep-copied and have transition markers removed
+              - Items have transition markers removed
               - All meaningful markers are updated for the transition
     """
     new_state = transition_data_between_boards(state)
 
-    # recursively find all boards referenced by "transition fields"
-    thread_names = recursively(
-        new_state,
-        lambda item: item["data"]["meaningfulMarkers"].get("transition"),
-        unionize_sets,
-    )
+    names = set()
+    boards = partition_by_thread(new_state, names)
 
-    return {name: cut_leaves(deepcopy(new_state), name) for name in thread_names}
+    return {name: boards.get(name, []) for name in names}
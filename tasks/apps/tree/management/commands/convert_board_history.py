@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from ...services.boards import FULL, NODES, convert_board_history
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite the board trees of every BoardCommitted event in the given "
+        "storage format: 'nodes' stores them in the content-addressed "
+        "BoardNode store, sharing unchanged subtrees between commits; 'full' "
+        "restores full JSON copies. Set BOARD_COMMITTED_STORAGE to the same "
+        "format for new commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("storage", choices=[NODES, FULL])
+        parser.add_argument("--chunk-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Converting board commits to {options['storage']}...")
+
+        rewritten = convert_board_history(
+            options["storage"], chunk_size=options["chunk_size"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully rewrote {rewritten:,} board commits")
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ...services.observations.attachments import rebuild_attachment_projections
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the observation attachment projection by replaying every "
+        "ObservationAttached/ObservationDetached event. The projection is "
+        "otherwise kept current as the events are written."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Replaying attach/detach events...")
+
+        rows = rebuild_attachment_projections()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully rebuilt {rows:,} observation streams")
+        )
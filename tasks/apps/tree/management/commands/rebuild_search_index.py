@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ...services.search.documents import rebuild_search_documents
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the full-text search documents of every observation, closed "
+        "observation, insight and journal entry. The documents are otherwise "
+        "kept current as the objects are saved."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Indexing observations, insights and journal entries...")
+
+        rows = rebuild_search_documents()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully indexed {rows:,} search documents")
+        )
@@ -0,0 +1,58 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from ...services.synthetic.generator import SyntheticDataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generate years of synthetic journal, habit, observation, board "
+        "and trip history for performance work. The same seed, scale and end "
+        "date always generate the same data. Signals are bypassed; the read "
+        "models they maintain are rebuilt at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username",
+            default="synthetic",
+            help="Owner of the generated data, created if missing",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiplier for the rows per day; 1.0 is about 5,000 events a year",
+        )
+        parser.add_argument("--years", type=float, default=3)
+        parser.add_argument(
+            "--end",
+            type=datetime.date.fromisoformat,
+            help="Last generated day (YYYY-MM-DD), today by default",
+        )
+
+    def handle(self, *args, **options):
+        user, _ = get_user_model().objects.get_or_create(username=options["username"])
+
+        self.stdout.write(
+            f"Generating {options['years']:g} years at scale {options['scale']:g} "
+            f"for {user.username}..."
+        )
+
+        counts = SyntheticDataset(
+            user,
+            seed=options["seed"],
+            scale=options["scale"],
+            years=options["years"],
+            end=options["end"],
+        ).generate()
+
+        for name, count in sorted(counts.items()):
+            self.stdout.write(f"{name}: {count:,}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully generated {sum(counts.values()):,} rows")
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from ...services.boards import backfill_board_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Store the task counts shown on the summaries of BoardCommitted events "
+        "committed before they were stored. New commits store them on save."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recount every committed board, not only those missing counts",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Counting tasks of committed boards...")
+
+        updated = backfill_board_metrics(force=options["all"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully counted {updated:,} committed boards")
+        )
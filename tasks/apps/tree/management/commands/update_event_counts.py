@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ...utils.statistics import rebuild_event_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the monthly event count rollup behind the stats pages from "
+        "the full event history. The rollup is otherwise kept current on "
+        "every event save and delete."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Counting events per month and type...")
+
+        rows = rebuild_event_counts()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully rebuilt {rows:,} monthly event counts")
+        )
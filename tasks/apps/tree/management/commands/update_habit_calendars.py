@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ...utils.habit_calendar import rebuild_habit_day_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily habit count rollup behind the habit calendars from "
+        "the full HabitTracked history. The rollup is otherwise kept current "
+        "on every HabitTracked save and delete."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Counting tracked habits per day...")
+
+        rows = rebuild_habit_day_counts()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully rebuilt {rows:,} habit day counts")
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ...utils.event_streams import rebuild_stream_heads
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the latest event publication time of every event stream from "
+        "the full event history. The stream heads are otherwise kept current "
+        "on every event save and delete."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Finding the latest event of every stream...")
+
+        rows = rebuild_stream_heads()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully rebuilt {rows:,} event stream heads")
+        )
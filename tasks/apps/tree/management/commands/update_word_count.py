@@ -7,17 +7,27 @@ from ...utils.statistics import (
 
 
 class Command(BaseCommand):
-    help = "Update word count statistics for all events and all years"
+    help = (
+        "Update word count statistics for all events and all years. "
+        "Statistics are kept current on every save; this re-sums the stored "
+        "per-row counts, and --rebuild recounts them from the text first."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
             "--year", type=int, help="Calculate word count for a specific year only"
         )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recount words of every event and plan before summing",
+        )
 
     def handle(self, *args, **options):
         year = options.get("year")
+        rebuild = options.get("rebuild")
 
-        if year:
+        if year and not rebuild:
             # Update specific year only
             self.stdout.write(f"Calculating word count for {year}...")
             total_words = update_word_count_statistic(year=year)
@@ -26,47 +36,41 @@ class Command(BaseCommand):
                     f"Successfully updated word count for {year}: {total_words:,} words"
                 )
             )
-        else:
-            # Update all years and overall total
-            from django.utils import timezone
-
-            current_year = timezone.now().year
-            previous_year = current_year - 1
+            return
 
+        if rebuild:
+            self.stdout.write("Recounting words of every event and plan...")
+        else:
             self.stdout.write("Calculating word count statistics...")
-            self.stdout.write(
-                f"Will update: current year ({current_year}) and previous year ({previous_year})"
-            )
-            self.stdout.write("Will create missing statistics for other years")
 
-            results = update_all_word_count_statistics()
+        results = update_all_word_count_statistics(rebuild=rebuild)
 
-            # Display overall total
+        if rebuild:
             self.stdout.write(
-                self.style.SUCCESS(
-                    f'Successfully updated total word count: {results["total"]:,} words'
-                )
+                f'Recounted {results["recounted"]:,} rows with stale word counts'
             )
 
-            # Display each year with indication of whether it was updated or created
-            years = list(results["years"].keys())
-            self.stdout.write(f"Processed {len(years)} years: {sorted(years)}")
+        # Display overall total
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Successfully updated total word count: {results["total"]:,} words'
+            )
+        )
 
-            for year in sorted(years):
-                year_words = results["years"][year]
-                if year in [current_year, previous_year]:
-                    action = "updated"
-                else:
-                    action = "ensured"
+        years = sorted(results["years"].keys())
+        self.stdout.write(f"Processed {len(years)} years: {years}")
 
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f"Successfully {action} word count for {year}: {year_words:,} words"
-                    )
-                )
+        for year in years:
+            year_words = results["years"][year]
 
             self.stdout.write(
                 self.style.SUCCESS(
-                    f"Completed processing word counts for all {len(years)} years plus overall total"
+                    f"Successfully updated word count for {year}: {year_words:,} words"
                 )
             )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Completed processing word counts for all {len(years)} years plus overall total"
+            )
+        )
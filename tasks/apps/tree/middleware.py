@@ -0,0 +1,29 @@
+import logging
+
+from .services.photos import storage
+
+logger = logging.getLogger(__name__)
+
+
+class PhotoStorageCountsMiddleware:
+    """Log the S3 clients built and calls made while serving a request.
+
+    Logged at DEBUG level, for requests that touched photo storage at all.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with storage.counting() as counts:
+            response = self.get_response(request)
+
+        if counts:
+            logger.debug(
+                "%s %s: photo storage %s",
+                request.method,
+                request.path,
+                ", ".join(f"{name}={count}" for name, count in sorted(counts.items())),
+            )
+
+        return response
@@ -0,0 +1,89 @@
+import re
+
+from django.db import migrations, models
+
+# Frozen copy of utils.statistics.fields / count_words_in_text, so the
+# backfill does not change meaning when the live helpers evolve.
+TEXT_FIELDS = (
+    "comment",
+    "note",
+    "situation",
+    "interpretation",
+    "approach",
+    "description",
+    "name",
+    "success_criteria",
+)
+
+CHUNK_SIZE = 2000
+
+
+def count_words_in_text(text):
+    if not text:
+        return 0
+    return len([word for word in re.split(r"\s+", text.strip()) if word])
+
+
+def fill_word_counts(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    Event = apps.get_model("tree", "Event")
+    Plan = apps.get_model("tree", "Plan")
+
+    counts = {}
+
+    for model in apps.get_app_config("tree").get_models():
+        if not issubclass(model, Event) or model is Event:
+            continue
+
+        text_fields = [
+            field.name
+            for field in model._meta.get_fields(include_parents=False)
+            if field.name in TEXT_FIELDS and field.concrete
+        ]
+
+        if not text_fields:
+            continue
+
+        rows = model.objects.using(db_alias).values_list("pk", *text_fields)
+
+        for pk, *texts in rows.iterator(chunk_size=CHUNK_SIZE):
+            counts[pk] = counts.get(pk, 0) + sum(map(count_words_in_text, texts))
+
+    Event.objects.using(db_alias).bulk_update(
+        [Event(pk=pk, word_count=count) for pk, count in counts.items() if count],
+        ["word_count"],
+        batch_size=CHUNK_SIZE,
+    )
+
+    Plan.objects.using(db_alias).bulk_update(
+        [
+            Plan(pk=pk, word_count=count_words_in_text(focus))
+            for pk, focus in Plan.objects.using(db_alias)
+            .values_list("pk", "focus")
+            .iterator(chunk_size=CHUNK_SIZE)
+            if focus
+        ],
+        ["word_count"],
+        batch_size=CHUNK_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tree", "0074_weight_habit"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="word_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="plan",
+            name="word_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_word_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def fill_monthly_event_counts(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    Event = apps.get_model("tree", "Event")
+    MonthlyEventCount = apps.get_model("tree", "MonthlyEventCount")
+
+    rows = (
+        Event.objects.using(db_alias)
+        .order_by()
+        .values(
+            "polymorphic_ctype_id",
+            year=ExtractYear("published"),
+            month=ExtractMonth("published"),
+        )
+        .annotate(count=Count("pk"))
+    )
+
+    MonthlyEventCount.objects.using(db_alias).bulk_create(
+        [
+            MonthlyEventCount(
+                year=row["year"],
+                month=row["month"],
+                content_type_id=row["polymorphic_ctype_id"],
+                count=row["count"],
+            )
+            for row in rows
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("tree", "0075_word_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyEventCount",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("year", "month"),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="monthlyeventcount",
+            constraint=models.UniqueConstraint(
+                fields=("year", "month", "content_type"),
+                name="monthly_event_count_unique",
+            ),
+        ),
+        migrations.RunPython(fill_monthly_event_counts, migrations.RunPython.noop),
+    ]
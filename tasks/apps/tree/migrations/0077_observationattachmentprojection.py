@@ -0,0 +1,72 @@
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def fill_attachment_projections(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    ObservationAttached = apps.get_model("tree", "ObservationAttached")
+    ObservationDetached = apps.get_model("tree", "ObservationDetached")
+    Projection = apps.get_model("tree", "ObservationAttachmentProjection")
+
+    changes = defaultdict(list)
+
+    # (published, is_detach) sorts attaches before detaches at equal times
+    for model, is_detach in ((ObservationAttached, False), (ObservationDetached, True)):
+        for stream_id, published, other in (
+            model.objects.using(db_alias)
+            .values_list("event_stream_id", "published", "other_event_stream_id")
+            .iterator()
+        ):
+            changes[stream_id].append((published, is_detach, str(other)))
+
+    projections = []
+
+    for stream_id, stream_changes in changes.items():
+        attached = set()
+
+        for _published, is_detach, other in sorted(stream_changes, key=lambda c: c[:2]):
+            if is_detach:
+                attached.discard(other)
+            else:
+                attached.add(other)
+
+        projections.append(
+            Projection(
+                event_stream_id=stream_id,
+                attached_stream_ids=sorted(attached),
+                attached_count=len(attached),
+                last_event_published=max(c[0] for c in stream_changes),
+            )
+        )
+
+    Projection.objects.using(db_alias).bulk_create(projections, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tree", "0076_monthlyeventcount"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ObservationAttachmentProjection",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("event_stream_id", models.UUIDField(unique=True)),
+                ("attached_stream_ids", models.JSONField(default=list)),
+                ("attached_count", models.PositiveIntegerField(default=0)),
+                ("last_event_published", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(fill_attachment_projections, migrations.RunPython.noop),
+    ]
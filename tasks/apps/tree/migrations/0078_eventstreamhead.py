@@ -0,0 +1,53 @@
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def fill_stream_heads(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    Event = apps.get_model("tree", "Event")
+    EventStreamHead = apps.get_model("tree", "EventStreamHead")
+
+    rows = (
+        Event.objects.using(db_alias)
+        .order_by()
+        .values("event_stream_id")
+        .annotate(published=Max("published"))
+    )
+
+    EventStreamHead.objects.using(db_alias).bulk_create(
+        [
+            EventStreamHead(
+                event_stream_id=row["event_stream_id"],
+                last_event_published=row["published"],
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tree", "0077_observationattachmentprojection"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventStreamHead",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("event_stream_id", models.UUIDField(unique=True)),
+                ("last_event_published", models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.RunPython(fill_stream_heads, migrations.RunPython.noop),
+    ]
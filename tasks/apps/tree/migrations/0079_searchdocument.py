@@ -0,0 +1,161 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.utils import timezone
+
+SEARCH_DOCUMENT_GIN = django.contrib.postgres.indexes.GinIndex(
+    fields=["document"], name="search_document_gin"
+)
+
+
+def _join(*parts):
+    return "\n".join(part for part in parts if part)
+
+
+def fill_search_documents(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    SearchDocument = apps.get_model("tree", "SearchDocument")
+
+    def rows(model_name):
+        return apps.get_model("tree", model_name).objects.using(db_alias).iterator()
+
+    documents = []
+
+    for observation in rows("Observation"):
+        documents.append(
+            SearchDocument(
+                kind="observation",
+                object_id=observation.pk,
+                event_stream_id=observation.event_stream_id,
+                pub_date=observation.pub_date,
+                title=observation.situation or "",
+                text=_join(observation.interpretation, observation.approach),
+            )
+        )
+
+    for closed in rows("ObservationClosed"):
+        documents.append(
+            SearchDocument(
+                kind="observation_closed",
+                object_id=closed.pk,
+                event_stream_id=closed.event_stream_id,
+                pub_date=timezone.localdate(closed.published),
+                title=closed.situation or "",
+                text=_join(closed.interpretation, closed.approach),
+            )
+        )
+
+    for insight in rows("InsightRefined"):
+        documents.append(
+            SearchDocument(
+                kind="insight",
+                object_id=insight.pk,
+                event_stream_id=insight.event_stream_id,
+                pub_date=timezone.localdate(insight.published),
+                title=insight.situation or "",
+                text=insight.approach or "",
+            )
+        )
+
+    # Includes photo entries, which extend tree_journaladded
+    for journal in rows("JournalAdded"):
+        documents.append(
+            SearchDocument(
+                kind="journal",
+                object_id=journal.pk,
+                event_stream_id=journal.event_stream_id,
+                pub_date=timezone.localdate(journal.published),
+                title=journal.comment or "",
+            )
+        )
+
+    SearchDocument.objects.using(db_alias).bulk_create(documents, batch_size=1000)
+
+    if schema_editor.connection.vendor == "postgresql":
+        SearchDocument.objects.using(db_alias).update(
+            document=SearchVector("title", weight="A")
+            + SearchVector("text", weight="B")
+        )
+
+
+def create_gin_index(apps, schema_editor):
+    # GIN indexes only exist on PostgreSQL; elsewhere the index is state only
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    SearchDocument = apps.get_model("tree", "SearchDocument")
+    schema_editor.add_index(SearchDocument, SEARCH_DOCUMENT_GIN)
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    SearchDocument = apps.get_model("tree", "SearchDocument")
+    schema_editor.remove_index(SearchDocument, SEARCH_DOCUMENT_GIN)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tree", "0078_eventstreamhead"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("observation", "Observation"),
+                            ("observation_closed", "Closed observation"),
+                            ("insight", "Insight"),
+                            ("journal", "Journal entry"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField()),
+                ("event_stream_id", models.UUIDField()),
+                ("pub_date", models.DateField()),
+                ("title", models.TextField(blank=True)),
+                ("text", models.TextField(blank=True)),
+                (
+                    "document",
+                    django.contrib.postgres.search.SearchVectorField(
+                        editable=False, null=True
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="searchdocument",
+            constraint=models.UniqueConstraint(
+                fields=("kind", "object_id"), name="search_document_unique"
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="searchdocument",
+                    index=SEARCH_DOCUMENT_GIN,
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_gin_index, drop_gin_index),
+            ],
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+    ]
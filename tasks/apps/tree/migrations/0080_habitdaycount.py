@@ -0,0 +1,77 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+
+def fill_habit_day_counts(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    HabitTracked = apps.get_model("tree", "HabitTracked")
+    HabitDayCount = apps.get_model("tree", "HabitDayCount")
+
+    rows = (
+        HabitTracked.objects.using(db_alias)
+        .order_by()
+        .values("habit_id", day=TruncDate("published"))
+        .annotate(
+            occurred=Count("pk", filter=Q(occured=True)),
+            skipped=Count("pk", filter=Q(occured=False)),
+        )
+    )
+
+    HabitDayCount.objects.using(db_alias).bulk_create(
+        [
+            HabitDayCount(
+                habit_id=row["habit_id"],
+                date=row["day"],
+                occurred=row["occurred"],
+                skipped=row["skipped"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tree", "0079_searchdocument"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HabitDayCount",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("occurred", models.IntegerField(default=0)),
+                ("skipped", models.IntegerField(default=0)),
+                (
+                    "habit",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="tree.habit",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("habit", "date"),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="habitdaycount",
+            constraint=models.UniqueConstraint(
+                fields=("habit", "date"), name="habit_day_count_unique"
+            ),
+        ),
+        migrations.RunPython(fill_habit_day_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+from django.db import migrations, models
+
+import tasks.apps.tree.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tree", "0080_habitdaycount"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BoardNode",
+            fields=[
+                (
+                    "digest",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("content", models.TextField()),
+            ],
+        ),
+        # The trees are read through properties now; the columns stay
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name="boardcommitted",
+                    old_name="before",
+                    new_name="before_data",
+                ),
+                migrations.RenameField(
+                    model_name="boardcommitted",
+                    old_name="after",
+                    new_name="after_data",
+                ),
+                migrations.RenameField(
+                    model_name="boardcommitted",
+                    old_name="transitions",
+                    new_name="transitions_data",
+                ),
+                migrations.AlterField(
+                    model_name="boardcommitted",
+                    name="before_data",
+                    field=models.JSONField(
+                        db_column="before",
+                        default=tasks.apps.tree.models.default_state,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="boardcommitted",
+                    name="after_data",
+                    field=models.JSONField(
+                        db_column="after",
+                        default=tasks.apps.tree.models.default_state,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="boardcommitted",
+                    name="transitions_data",
+                    field=models.JSONField(
+                        db_column="transitions",
+                        default=tasks.apps.tree.models.empty_dict,
+                    ),
+                ),
+            ],
+        ),
+    ]
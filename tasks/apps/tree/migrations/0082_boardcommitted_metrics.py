@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+import tasks.apps.tree.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tree", "0081_boardnode"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="boardcommitted",
+            name="metrics",
+            field=models.JSONField(
+                blank=True, default=tasks.apps.tree.models.empty_dict
+            ),
+        ),
+    ]
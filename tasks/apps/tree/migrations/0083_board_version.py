@@ -0,0 +1,18 @@
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tree", "0082_boardcommitted_metrics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="board",
+            name="version",
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
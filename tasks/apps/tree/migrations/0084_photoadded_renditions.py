@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+import tasks.apps.tree.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tree", "0083_board_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="photoadded",
+            name="renditions",
+            field=models.JSONField(
+                blank=True, default=tasks.apps.tree.models.empty_dict
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tree", "0084_photoadded_renditions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="journaladded",
+            name="processing_pending",
+            field=models.BooleanField(default=False),
+        ),
+    ]
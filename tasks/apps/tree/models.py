@@ -2,13 +2,18 @@ import uuid
 from decimal import Decimal
 
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import Truncator, slugify
 from django.utils.translation import gettext_lazy as _
 
+from polymorphic.managers import PolymorphicManager
 from polymorphic.models import PolymorphicModel
+from polymorphic.query import PolymorphicQuerySet
 
 from .utils.datetime import aware_from_date
 from .utils.strings import coalesce
@@ -49,6 +54,11 @@ class Event(PolymorphicModel):
     # event-creating endpoint can opt in — not just trip notes/photos.
     idempotency_key = models.CharField(max_length=64, null=True, blank=True)
 
+    # Words in the event's text fields, recomputed on every save so the
+    # word-count Statistics rows can be kept current with deltas instead of
+    # re-tokenising the whole table (see utils/statistics.py).
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         indexes = [
             models.Index(fields=["published"]),
@@ -75,24 +85,86 @@ class Event(PolymorphicModel):
         )
 
 
+class BoardCommittedQuerySet(PolymorphicQuerySet):
+    def _fetch_all(self):
+        fetching = self._result_cache is None
+
+        super()._fetch_all()
+
+        if fetching:
+            # Import here to avoid circular imports
+            from .services.boards.snapshots import prefetch_board_trees
+
+            prefetch_board_trees(self._result_cache)
+
+
+def board_tree(field_name):
+    """Read and write a stored board tree, reconstructing it on first read.
+
+    The field holds the tree either in full or as references into the
+    BoardNode store (see services.boards.snapshots); the property always
+    gives the full tree.
+    """
+    cache_name = f"_{field_name}_tree"
+
+    def get_tree(self):
+        if cache_name not in self.__dict__:
+            from .services.boards.snapshots import expand_tree
+
+            self.__dict__[cache_name] = expand_tree(getattr(self, field_name))
+
+        return self.__dict__[cache_name]
+
+    def set_tree(self, value):
+        self.__dict__[cache_name] = value
+        setattr(self, field_name, value)
+
+    return property(get_tree, set_tree)
+
+
 class BoardCommitted(Event):
     # thread set manually from board
     # event_stream_id <- thread
 
     focus = models.CharField(max_length=255)
 
-    before = models.JSONField(default=default_state)
-    after = models.JSONField(default=default_state)
+    # Read and written through before, after and transitions
+    before_data = models.JSONField(default=default_state, db_column="before")
+    after_data = models.JSONField(default=default_state, db_column="after")
 
-    transitions = models.JSONField(default=empty_dict)
+    transitions_data = models.JSONField(default=empty_dict, db_column="transitions")
 
     date_started = models.DateTimeField(default=timezone.now)
 
+    # Task counts of the before tree, see services.boards.metrics
+    metrics = models.JSONField(default=empty_dict, blank=True)
+
+    objects = PolymorphicManager.from_queryset(BoardCommittedQuerySet)()
+
+    before = board_tree("before_data")
+    after = board_tree("after_data")
+    transitions = board_tree("transitions_data")
+
     @property
     def date_closed(self):
         return self.published
 
 
+class BoardNode(models.Model):
+    """One task of a committed board, stored once however many commits hold it.
+
+    ``content`` is the task's canonical JSON with its children replaced by
+    their digests, and ``digest`` its SHA-256, so identical subtrees of
+    different commits share their rows.
+    """
+
+    digest = models.CharField(max_length=64, primary_key=True)
+    content = models.TextField()
+
+    def __str__(self):
+        return self.digest
+
+
 class Habit(models.Model):
     # Display name
     name = models.CharField(max_length=255)
@@ -115,7 +187,7 @@ class Habit(models.Model):
 
     def get_keywords(self):
         """Get all keywords for this habit as a set"""
-        return set(self.keywords.values_list("keyword", flat=True))
+        return {keyword.keyword for keyword in self.keywords.all()}
 
 
 class HabitKeyword(models.Model):
@@ -154,6 +226,10 @@ class Board(models.Model):
 
     thread = models.ForeignKey(Thread, on_delete=models.CASCADE, null=True)
 
+    # Replaced on every save; keys caches derived from state. A random
+    # token, so one saved by a rolled back transaction never comes back.
+    version = models.UUIDField(default=uuid.uuid4, editable=False)
+
     class Meta:
         ordering = ("-date_started",)
 
@@ -163,6 +239,14 @@ class Board(models.Model):
 
         return "{} {}".format(self.focus, self.thread)
 
+    def save(self, *args, update_fields=None, **kwargs):
+        self.version = uuid.uuid4()
+
+        if update_fields is not None:
+            update_fields = {*update_fields, "version"}
+
+        super().save(*args, update_fields=update_fields, **kwargs)
+
     @property
     def event_stream_id(self):
         return board_event_stream_id(self)
@@ -205,6 +289,9 @@ class Plan(models.Model):
         help_text=_("What is your primary focus?"), null=True, blank=True
     )
 
+    # See Event.word_count
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ("-pub_date",)
 
@@ -227,14 +314,17 @@ class ObservationType(models.Model):
 
 class ObservationQuerySet(models.QuerySet):
     def with_last_event_published(self):
-        """Annotate queryset with the last event published date"""
+        """
+        Annotate queryset with the last event published date.
+
+        Read from the EventStreamHead row of the stream, so each row costs a
+        unique-index lookup instead of a sorted scan of its events.
+        """
         from django.db.models import OuterRef, Subquery
 
-        last_event_subquery = (
-            Event.objects.filter(event_stream_id=OuterRef("event_stream_id"))
-            .order_by("-published")
-            .values("published")[:1]
-        )
+        last_event_subquery = EventStreamHead.objects.filter(
+            event_stream_id=OuterRef("event_stream_id")
+        ).values("last_event_published")[:1]
 
         return self.annotate(last_event_published=Subquery(last_event_subquery))
 
@@ -243,42 +333,18 @@ class ObservationQuerySet(models.QuerySet):
         Annotate each observation with ``attached_count``: the number of
         observations currently attached to it (i.e. how "complex" it is).
 
-        Mirrors ComplexPresenter's latest-event-wins replay in SQL: an
-        ObservationAttached row represents a currently-attached pair only when
-        no later attach and no later-or-equal detach exist for the same
-        (event_stream_id, other_event_stream_id) pair. Counting the distinct
-        surviving pairs in one correlated subquery avoids a per-row presenter.
+        Read from the ObservationAttachmentProjection row of the stream, kept
+        current as attach/detach events are written, so the list pages do a
+        unique-index lookup per row instead of replaying the events.
         """
-        from django.db.models import Count, Exists, OuterRef, Subquery
+        from django.db.models import OuterRef, Subquery
         from django.db.models.functions import Coalesce
 
-        later_attach = ObservationAttached.objects.filter(
-            event_stream_id=OuterRef("event_stream_id"),
-            other_event_stream_id=OuterRef("other_event_stream_id"),
-            published__gt=OuterRef("published"),
-        )
-        later_or_equal_detach = ObservationDetached.objects.filter(
-            event_stream_id=OuterRef("event_stream_id"),
-            other_event_stream_id=OuterRef("other_event_stream_id"),
-            published__gte=OuterRef("published"),
-        )
-
-        currently_attached = (
-            ObservationAttached.objects.filter(
-                event_stream_id=OuterRef("event_stream_id")
-            )
-            .annotate(
-                superseded_by_attach=Exists(later_attach),
-                superseded_by_detach=Exists(later_or_equal_detach),
-            )
-            .filter(superseded_by_attach=False, superseded_by_detach=False)
-            .order_by()
-            .values("event_stream_id")
-            .annotate(count=Count("other_event_stream_id", distinct=True))
-            .values("count")
-        )
+        attached_count = ObservationAttachmentProjection.objects.filter(
+            event_stream_id=OuterRef("event_stream_id")
+        ).values("attached_count")[:1]
 
-        return self.annotate(attached_count=Coalesce(Subquery(currently_attached), 0))
+        return self.annotate(attached_count=Coalesce(Subquery(attached_count), 0))
 
 
 class ObservationManager(models.Manager):
@@ -357,19 +423,49 @@ class ObservationPropertyEventMixin:
 
 
 class ObservationEventMixin:
-    def url(self):
+    # Event lists resolve the lookups below in bulk and attach the results as
+    # _prefetched_observation and _prefetched_situation_history, the stream's
+    # (published, situation) pairs in order (see services/events/prefetch.py).
+
+    def stream_observation(self):
+        """The Observation of the event's stream, or None once it is closed."""
+        if hasattr(self, "_prefetched_observation"):
+            return self._prefetched_observation
+
         try:
-            observation = Observation.objects.get(event_stream_id=self.event_stream_id)
-            return observation.get_absolute_url()
+            return Observation.objects.get(event_stream_id=self.event_stream_id)
         except Observation.DoesNotExist:
-            return reverse(
-                "public-observation-closed-detail",
-                kwargs={"event_stream_id": self.event_stream_id},
-            )
+            return None
+
+    def url(self):
+        observation = self.stream_observation()
+
+        if observation is not None:
+            return observation.get_absolute_url()
+
+        return reverse(
+            "public-observation-closed-detail",
+            kwargs={"event_stream_id": self.event_stream_id},
+        )
+
+    def _prefetched_situation(self, published=None):
+        history = [
+            situation
+            for situation_published, situation in self._prefetched_situation_history
+            if published is None or situation_published <= published
+        ]
+
+        if not history:
+            raise Observation.DoesNotExist
+
+        return history[-1]
 
     def situation(self):
         ### XXX Situation at the time of the event or current?
         ### For now, current is implemented here
+        if hasattr(self, "_prefetched_situation_history"):
+            return self._prefetched_situation()
+
         event = (
             Event.objects.instance_of(ObservationMade, ObservationRecontextualized)
             .filter(event_stream_id=self.event_stream_id)
@@ -383,6 +479,9 @@ class ObservationEventMixin:
         return event.situation
 
     def situation_at_creation(self):
+        if hasattr(self, "_prefetched_situation_history"):
+            return self._prefetched_situation(self.published)
+
         event = (
             Event.objects.instance_of(ObservationMade, ObservationRecontextualized)
             .filter(event_stream_id=self.event_stream_id, published__lte=self.published)
@@ -573,6 +672,10 @@ observation_event_types = (
 class JournalAdded(Event):
     comment = models.TextField(help_text=_("Update"))
 
+    # Set while the reflections and habits of the entry wait for the
+    # process_journal_entry_task worker; cleared when it processes them.
+    processing_pending = models.BooleanField(default=False)
+
     template = "tree/events/journal_added.html"
 
     # Lets templates branch on plain vs. photo entries without isinstance.
@@ -590,7 +693,9 @@ class PhotoAdded(JournalAdded):
     ``process_journal_entry`` unchanged (habit/POI extraction) and the
     event is picked up by the existing trip ``get_detail`` query. The
     original is uploaded directly to S3 by the client; ``thumbnail_key``
-    stays null until the Celery thumbnail task fills it.
+    stays null until the Celery thumbnail task fills it, together with
+    ``renditions``: ``{name: {"key", "width", "height"}}`` for every size
+    in ``PHOTO_RENDITIONS`` (the thumbnail is the "thumb" one).
     """
 
     original_key = models.CharField(max_length=512)
@@ -598,6 +703,7 @@ class PhotoAdded(JournalAdded):
     content_type = models.CharField(max_length=100)
     width = models.PositiveIntegerField(null=True, blank=True)
     height = models.PositiveIntegerField(null=True, blank=True)
+    renditions = models.JSONField(default=empty_dict, blank=True)
 
     template = "tree/events/journal_added.html"
 
@@ -824,7 +930,22 @@ class ProjectedOutcomeEvolved(Event, ProjectedOutcomeEventMixin):
         )
 
 
-class ObservationAttached(Event, ObservationEventMixin):
+class OtherObservationMixin:
+    def other_observation(self):
+        """The attached/detached Observation, or None if it no longer exists.
+
+        Event lists attach it in bulk as _prefetched_other_observation.
+        """
+        if hasattr(self, "_prefetched_other_observation"):
+            return self._prefetched_other_observation
+
+        try:
+            return Observation.objects.get(event_stream_id=self.other_event_stream_id)
+        except Observation.DoesNotExist:
+            return None
+
+
+class ObservationAttached(Event, ObservationEventMixin, OtherObservationMixin):
     observation = models.ForeignKey(
         Observation, on_delete=models.SET_NULL, null=True, blank=True
     )
@@ -835,16 +956,15 @@ class ObservationAttached(Event, ObservationEventMixin):
     template = "tree/events/observation_attached.html"
 
     def __str__(self):
-        try:
-            attached_observation = Observation.objects.get(
-                event_stream_id=self.other_event_stream_id
-            )
-            return f"Attached to: {attached_observation.situation_truncated()}"
-        except Observation.DoesNotExist:
+        attached_observation = self.other_observation()
+
+        if attached_observation is None:
             return f"Attached observation (stream: {self.other_event_stream_id})"
 
+        return f"Attached to: {attached_observation.situation_truncated()}"
+
 
-class ObservationDetached(Event, ObservationEventMixin):
+class ObservationDetached(Event, ObservationEventMixin, OtherObservationMixin):
     other_event_stream_id = models.UUIDField(
         help_text="Event stream ID of the observation being detached"
     )
@@ -852,14 +972,87 @@ class ObservationDetached(Event, ObservationEventMixin):
     template = "tree/events/observation_detached.html"
 
     def __str__(self):
-        try:
-            detached_observation = Observation.objects.get(
-                event_stream_id=self.other_event_stream_id
-            )
-            return f"Detached from: {detached_observation.situation_truncated()}"
-        except Observation.DoesNotExist:
+        detached_observation = self.other_observation()
+
+        if detached_observation is None:
             return f"Detached observation (stream: {self.other_event_stream_id})"
 
+        return f"Detached from: {detached_observation.situation_truncated()}"
+
+
+class ObservationAttachmentProjection(models.Model):
+    """Currently attached observation streams of one (complex) observation.
+
+    A read model of the stream's ObservationAttached/ObservationDetached
+    events, updated in the same transaction as each event is written (see
+    services/observations/attachments.py). ``last_event_published`` is the
+    newest event folded in; older events arriving later trigger a replay.
+    """
+
+    event_stream_id = models.UUIDField(unique=True)
+
+    attached_stream_ids = models.JSONField(default=list)
+    attached_count = models.PositiveIntegerField(default=0)
+
+    last_event_published = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.event_stream_id}: {self.attached_count} attached"
+
+
+class EventStreamHead(models.Model):
+    """Publication time of the newest event in an event stream.
+
+    Kept current by signals on every event save and delete, and by the bulk
+    re-keying of habit streams, so lists can sort observations by recency
+    without scanning tree_event for every row.
+    """
+
+    event_stream_id = models.UUIDField(unique=True)
+    last_event_published = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.event_stream_id}: {self.last_event_published}"
+
+
+class SearchDocument(models.Model):
+    """Full-text search entry for an observation, insight or journal entry.
+
+    One row per searchable object, written by signals whenever the object is
+    saved (see services/search/documents.py). ``title`` is weighted above
+    ``text`` in ``document``, the stored tsvector the search endpoints match
+    against through a GIN index instead of vectorising every row per query.
+    """
+
+    class Kind(models.TextChoices):
+        OBSERVATION = "observation", _("Observation")
+        OBSERVATION_CLOSED = "observation_closed", _("Closed observation")
+        INSIGHT = "insight", _("Insight")
+        JOURNAL = "journal", _("Journal entry")
+
+    kind = models.CharField(max_length=32, choices=Kind.choices)
+    object_id = models.PositiveIntegerField()
+    event_stream_id = models.UUIDField()
+    pub_date = models.DateField()
+
+    title = models.TextField(blank=True)
+    text = models.TextField(blank=True)
+
+    document = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"], name="search_document_unique"
+            ),
+        ]
+        indexes = [
+            GinIndex(fields=["document"], name="search_document_gin"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id}"
+
 
 class Statistics(models.Model):
     key = models.CharField(max_length=255, unique=True)
@@ -874,6 +1067,63 @@ class Statistics(models.Model):
         return f"{self.key}: {self.value}"
 
 
+class MonthlyEventCount(models.Model):
+    """Number of events of one concrete type published in a month.
+
+    A rollup of tree_event maintained by signals on every event save and
+    delete, so the stats pages read counts from a handful of rows instead
+    of running a polymorphic COUNT(*) per event type.
+    """
+
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ("year", "month")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["year", "month", "content_type"],
+                name="monthly_event_count_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d} {self.content_type}: {self.count}"
+
+
+class HabitDayCount(models.Model):
+    """Number of times a habit was tracked and skipped on one day.
+
+    A rollup of tree_habittracked maintained by signals on every
+    HabitTracked save and delete, so habit calendars of any length read one
+    row per tracked day instead of every event.
+    """
+
+    habit = models.ForeignKey(Habit, on_delete=models.CASCADE)
+    date = models.DateField()
+    occurred = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ("habit", "date")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["habit", "date"],
+                name="habit_day_count_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.habit} {self.date}: {self.count}"
+
+    @property
+    def count(self):
+        """Count shown in calendars: -1 if skipped that day at all."""
+        return -1 if self.skipped else self.occurred
+
+
 class Profile(models.Model):
     class MapProvider(models.TextChoices):
         OPENSTREETMAP = "osm", _("OpenStreetMap")
@@ -1,6 +1,5 @@
-from django.db.models import Q
-
-from .models import Event, Observation, ObservationAttached, ObservationDetached
+from .models import Event, Observation
+from .services.observations.attachments import get_attached_stream_ids
 
 
 class ObservationEventPresenter:
@@ -15,34 +14,20 @@ class ObservationEventPresenter:
 
 
 class ComplexPresenter:
-    """Presenter class that can replay Attached/Detached events and provide complex observation information"""
+    """Presenter class that provides complex observation information from the attachment projection"""
 
     def __init__(self, observation_event_stream_id):
         self.observation_event_stream_id = observation_event_stream_id
         self._attached_stream_ids = None
 
     def _get_attached_stream_ids(self):
-        """Replay attach/detach events to get currently attached observation stream IDs"""
+        """Currently attached observation stream IDs, read from the attachment projection"""
         if self._attached_stream_ids is not None:
             return self._attached_stream_ids
 
-        # Get all attach/detach events for this observation in chronological order
-        attach_detach_events = (
-            Event.objects.instance_of(ObservationAttached, ObservationDetached)
-            .filter(event_stream_id=self.observation_event_stream_id)
-            .order_by("published")
+        self._attached_stream_ids = get_attached_stream_ids(
+            self.observation_event_stream_id
         )
-
-        # Build a set of currently attached stream IDs by replaying events
-        attached_ids = set()
-
-        for event in attach_detach_events:
-            if isinstance(event, ObservationAttached):
-                attached_ids.add(event.other_event_stream_id)
-            elif isinstance(event, ObservationDetached):
-                attached_ids.discard(event.other_event_stream_id)
-
-        self._attached_stream_ids = attached_ids
         return self._attached_stream_ids
 
     def open_observations_count(self):
@@ -1,16 +1,28 @@
-from functools import partial
+from functools import cached_property
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import models, transaction
 from django.utils import timezone
 
 from rest_framework import serializers
 from rest_polymorphic.serializers import PolymorphicSerializer
 
 from .models import *
+from .services.boards.metrics import (
+    EISENHOWER,
+    MOSCOW,
+    board_metrics,
+    is_finished,
+    is_postponed,
+    is_removed,
+)
+from .services.boards.patches import ADD, MOVE, OPERATIONS, RENAME, SET_STATE
+from .services.boards.versions import save_if_unchanged
+from .services.events.prefetch import load_events, prefetch_event_relations
 from .services.observations.event_creation import create_observation_change_events
 from .templatetags.model_presenters import first_line
+from .utils.trees import tree_iterator
 
 
 class AbsoluteURLSerializerMixin:
@@ -74,7 +86,46 @@ class BoardSerializer(serializers.HyperlinkedModelSerializer):
 
     class Meta:
         model = Board
-        fields = ["id", "date_started", "state", "focus", "thread"]
+        fields = ["id", "date_started", "state", "focus", "thread", "version"]
+
+    def update(self, instance, validated_data):
+        # Raises BoardVersionConflict if the board was saved since it was read
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+
+        save_if_unchanged(instance, list(validated_data))
+
+        return instance
+
+
+class BoardOperationSerializer(serializers.Serializer):
+    REQUIRED = {
+        ADD: ["text"],
+        RENAME: ["id", "text"],
+        MOVE: ["id"],
+        SET_STATE: ["id", "state"],
+    }
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    id = serializers.CharField(max_length=255, required=False)
+    text = serializers.CharField(required=False)
+    parent = serializers.CharField(max_length=255, required=False, allow_null=True)
+    index = serializers.IntegerField(min_value=0, required=False, allow_null=True)
+    state = serializers.ChoiceField(choices=["open", "done"], required=False)
+
+    def validate(self, data):
+        missing = [name for name in self.REQUIRED[data["op"]] if name not in data]
+
+        if missing:
+            raise serializers.ValidationError(
+                {name: f"This field is required for {data['op']}." for name in missing}
+            )
+
+        return data
+
+
+class BoardOperationsSerializer(serializers.Serializer):
+    operations = BoardOperationSerializer(many=True, allow_empty=False, max_length=500)
 
 
 class JournalTagSerializer(serializers.HyperlinkedModelSerializer):
@@ -325,7 +376,19 @@ class InsightRefinedSerializer(AbsoluteURLSerializerMixin, BaseTypeThreadSeriali
         ]
 
 
+class EventListSerializer(serializers.ListSerializer):
+    """Serializes a list of events after loading their relations in bulk."""
+
+    def to_representation(self, data):
+        events = load_events(data.all() if isinstance(data, models.Manager) else data)
+
+        return super().to_representation(prefetch_event_relations(events))
+
+
 class ObservationEventSerializer(PolymorphicSerializer):
+    class Meta:
+        list_serializer_class = EventListSerializer
+
     model_serializer_mapping = {
         ObservationMade: ObservationMadeSerializer,
         ObservationRecontextualized: ObservationRecontextualizedSerializer,
@@ -351,6 +414,24 @@ class TrackHabitAPISerializer(serializers.Serializer):
     note = serializers.CharField(required=False, allow_blank=True, default="")
 
 
+class TrackHabitBatchAPISerializer(serializers.Serializer):
+    records = TrackHabitAPISerializer(many=True, allow_empty=False, max_length=1000)
+
+
+class HabitQuerySerializer(serializers.Serializer):
+    habit = serializers.ListField(
+        child=serializers.SlugField(max_length=255), required=False
+    )
+
+
+class HabitCalendarQuerySerializer(HabitQuerySerializer):
+    year = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=9999),
+        required=False,
+        max_length=20,
+    )
+
+
 class ProjectedOutcomeMadeSerializer(serializers.ModelSerializer):
     thread = serializers.SlugRelatedField(
         queryset=Thread.objects.all(), slug_field="name"
@@ -522,7 +603,26 @@ class ObservationDetachedSerializer(serializers.ModelSerializer):
         ]
 
 
+class SearchDocumentSerializer(serializers.ModelSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = SearchDocument
+        fields = [
+            "kind",
+            "object_id",
+            "event_stream_id",
+            "pub_date",
+            "title",
+            "text",
+            "rank",
+        ]
+
+
 class EventSerializer(PolymorphicSerializer):
+    class Meta:
+        list_serializer_class = EventListSerializer
+
     model_serializer_mapping = {
         ObservationMade: ObservationMadeSerializer,
         ObservationRecontextualized: ObservationRecontextualizedSerializer,
@@ -545,110 +645,48 @@ class EventSerializer(PolymorphicSerializer):
     }
 
 
-class tree_iterator:
-    """Preorder traversal tree iterator"""
-
-    def __init__(self, tree, key="children"):
-        self.key = key
-
-        # Internally this iterator requires top-level list,
-        # so if given a valid node (that has children key)
-        # wrap it in a list
-        if key in tree:
-            tree = [tree]
-
-        self.iterators = [iter(tree)]
-
-    def __iter__(self):
-        return self
-
-    def _find_next_path(self):
-        try:
-            value = next(self.iterators[-1])
-        except StopIteration:
-            # If there are no leaves to process
-            # remove last iterator and rerun the process.
-            # This is how it traverses upwards.
-            #
-            # Recursion handles for us multi-level jumps.
-            #
-            # Last pop is handled in __next__()
-            self.iterators.pop()
-            return self._find_next_path()
-
-        # Before returning a value,
-        # setup iterator-path to a node's children for future
-        # iterations. That's how it traverses deeper.
-        if self.key in value and len(value[self.key]) > 0:
-            self.iterators.append(iter(value[self.key]))
-
-        return value
-
-    def __next__(self):
-        try:
-            return self._find_next_path()
-        except IndexError:
-            # We have popped out of self.iterators to use
-            raise StopIteration
-
-
-def _state(key, default, item):
-    return item.get("state", {}).get(key, default)
-
-
-def state(key, default=None):
-    return partial(_state, key, default)
-
-
-def _marker(key, default, item):
-    return item.get("data", {}).get("meaningfulMarkers", {}).get(key, default)
-
-
-def marker(key, default=None):
-    return partial(_marker, key, default)
-
-
-def ilen(iter):
-    return sum(1 for _ in iter)
-
-
 class BoardSummary(object):
     def __init__(self, board):
         self.board = board
 
+    @cached_property
+    def metrics(self):
+        # Boards committed before metrics were stored are counted on read
+        return self.board.metrics or board_metrics(self.board.before)
+
     def filter_tree(self, pred):
         return filter(pred, tree_iterator(self.board.before))
 
     def finished(self):
-        return self.filter_tree(state("checked"))
+        return self.filter_tree(is_finished)
 
     def postponed(self):
-        return self.filter_tree(marker("postponedFor"))
+        return self.filter_tree(is_postponed)
 
     def removed(self):
-        weeks_in_list = marker("weeksInList")
-        checked = state("checked")
-        postponed_for = marker("postponedFor")
-        made_progress = marker("madeProgress")
-
-        return self.filter_tree(
-            lambda item: weeks_in_list(item) >= 5
-            and not checked(item)
-            and postponed_for(item) == 0
-            and not made_progress(item)
-        )
+        return self.filter_tree(is_removed)
 
     def finished_count(self):
-        return ilen(self.finished())
+        return self.metrics["finished"]
 
     def postponed_count(self):
-        return ilen(self.postponed())
+        return self.metrics["postponed"]
 
     def removed_count(self):
-        return ilen(self.removed())
+        return self.metrics["removed"]
 
     def task_count(self):
-        return ilen(tree_iterator(self.board.before))
+        return self.metrics["tasks"]
+
+    def eisenhower(self):
+        counts = self.metrics["eisenhower"]
+
+        return [(quadrant, counts.get(quadrant, 0)) for quadrant in EISENHOWER]
+
+    def moscow(self):
+        counts = self.metrics["moscow"]
+
+        return [(priority, counts.get(priority, 0)) for priority in MOSCOW]
 
     def days(self):
         return (self.board.published - self.board.date_started).days
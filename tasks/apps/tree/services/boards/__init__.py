@@ -0,0 +1,28 @@
+from .metrics import backfill_board_metrics, board_metrics
+from .patches import BoardOperationError, apply_operations, patch_board
+from .snapshots import (
+    FULL,
+    NODES,
+    compact_tree,
+    convert_board_history,
+    expand_tree,
+    store_board_trees,
+)
+from .versions import BoardVersionConflict, retry_on_conflict, save_if_unchanged
+
+__all__ = [
+    "FULL",
+    "NODES",
+    "BoardOperationError",
+    "BoardVersionConflict",
+    "apply_operations",
+    "backfill_board_metrics",
+    "board_metrics",
+    "compact_tree",
+    "convert_board_history",
+    "expand_tree",
+    "patch_board",
+    "retry_on_conflict",
+    "save_if_unchanged",
+    "store_board_trees",
+]
@@ -0,0 +1,113 @@
+"""
+Task counts of committed boards, stored on the BoardCommitted event.
+
+The summaries list years of commits; counting the tasks of every board on
+each render meant walking every tree several times. The counts are taken
+in one walk when the event is saved and read back from ``metrics``.
+"""
+
+from collections import Counter
+
+from ...models import BoardCommitted
+from ...utils.trees import marker, state, tree_iterator
+
+EISENHOWER = [
+    "urgent-important",
+    "not-urgent-important",
+    "urgent-not-important",
+    "not-urgent-not-important",
+]
+
+MOSCOW = ["must", "should", "could", "wont"]
+
+checked = state("checked")
+postponed_for = marker("postponedFor")
+weeks_in_list = marker("weeksInList")
+made_progress = marker("madeProgress")
+eisenhower = marker("eisenhower")
+moscow = marker("moscow")
+
+
+def is_finished(item):
+    return bool(checked(item))
+
+
+def is_postponed(item):
+    return bool(postponed_for(item))
+
+
+def is_removed(item):
+    """Whether committing dropped the task for staying five weeks untouched"""
+    return (
+        (weeks_in_list(item) or 0) >= 5
+        and not checked(item)
+        and postponed_for(item) == 0
+        and not made_progress(item)
+    )
+
+
+def board_metrics(tree):
+    """
+    Count the tasks of a board tree in one walk.
+
+    Returns:
+        Dict with the number of ``tasks`` and of ``finished``, ``postponed``
+        and ``removed`` ones, and ``eisenhower`` and ``moscow`` dicts
+        counting the tasks per marker value (unmarked tasks left out).
+    """
+    counts = Counter()
+    quadrants = Counter()
+    priorities = Counter()
+
+    for item in tree_iterator(tree):
+        counts["tasks"] += 1
+        counts["finished"] += is_finished(item)
+        counts["postponed"] += is_postponed(item)
+        counts["removed"] += is_removed(item)
+
+        if quadrant := eisenhower(item):
+            quadrants[quadrant] += 1
+
+        if priority := moscow(item):
+            priorities[priority] += 1
+
+    return {
+        **{key: counts[key] for key in ["tasks", "finished", "postponed", "removed"]},
+        "eisenhower": dict(quadrants),
+        "moscow": dict(priorities),
+    }
+
+
+def backfill_board_metrics(chunk_size=100, force=False):
+    """
+    Store the metrics of BoardCommitted events committed without them.
+
+    Args:
+        chunk_size: Events read and written per batch.
+        force: Recompute the metrics of every event.
+
+    Returns:
+        int: Number of events updated.
+    """
+    boards = BoardCommitted.objects.non_polymorphic().order_by("pk")
+
+    if not force:
+        boards = boards.filter(metrics={})
+
+    pks = list(boards.values_list("pk", flat=True))
+    updated = 0
+
+    for start in range(0, len(pks), chunk_size):
+        chunk = list(
+            BoardCommitted.objects.non_polymorphic()
+            .filter(pk__in=pks[start : start + chunk_size])
+            .only("pk", "before_data", "metrics")
+        )
+
+        for board in chunk:
+            board.metrics = board_metrics(board.before)
+
+        BoardCommitted.objects.bulk_update(chunk, ["metrics"])
+        updated += len(chunk)
+
+    return updated
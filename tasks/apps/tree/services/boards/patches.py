@@ -0,0 +1,162 @@
+"""
+Operations on single tasks of a Board, merged into its current state.
+
+Clients that send whole boards overwrite each other's edits. Clients that
+send operations on task ids instead (add, rename, move, set_state) can
+edit the same board at once: each batch is applied to the board as
+currently stored and saved with compare-and-swap, and is applied again on
+the fresh board when another write got in between.
+
+An operation fails only when it cannot apply to the current board (its
+task was removed, or a task would move below itself). Adding a task with
+an id already on the board is taken as a retry and changes nothing.
+"""
+
+from django.db import transaction
+
+from ... import board_operations
+from ...models import Board
+from ..today import board_tree
+from .versions import retry_on_conflict, save_if_unchanged
+
+ADD = "add"
+RENAME = "rename"
+MOVE = "move"
+SET_STATE = "set_state"
+
+OPERATIONS = [ADD, RENAME, MOVE, SET_STATE]
+
+
+class BoardOperationError(Exception):
+    """An operation does not apply to the current board."""
+
+    def __init__(self, position, message):
+        super().__init__(f"Operation {position}: {message}")
+        self.position = position
+        self.message = message
+
+
+def _locate(state):
+    """Map task ids to (containing list, task) for the whole tree"""
+    located = {}
+
+    def walk(nodes):
+        for node in nodes:
+            located[node.get("id")] = (nodes, node)
+            walk(node.get("children") or [])
+
+    walk(state)
+
+    return located
+
+
+def _children(located, state, parent_id, position):
+    if parent_id is None:
+        return state
+
+    if parent_id not in located:
+        raise BoardOperationError(position, f"no task {parent_id}")
+
+    return located[parent_id][1].setdefault("children", [])
+
+
+def _insert(nodes, node, index):
+    if index is None or index > len(nodes):
+        index = len(nodes)
+
+    nodes.insert(index, node)
+
+
+def _contains(node, task_id):
+    return any(
+        child.get("id") == task_id or _contains(child, task_id)
+        for child in node.get("children") or []
+    )
+
+
+def apply_operations(state, operations):
+    """
+    Apply operations to a board state in place.
+
+    Args:
+        state: The Board.state tree.
+        operations: List of operation dicts, as validated by
+            ``BoardOperationSerializer``.
+
+    Returns:
+        List with the id of the task each operation applied to.
+
+    Raises:
+        BoardOperationError: An operation does not apply to the state.
+    """
+    located = _locate(state)
+    ids = []
+
+    for position, operation in enumerate(operations):
+        op = operation["op"]
+        task_id = operation.get("id")
+
+        if op == ADD:
+            if task_id not in located:
+                node = board_operations.create_task_item(operation["text"])
+
+                if task_id is not None:
+                    node["id"] = task_id
+
+                parent = _children(located, state, operation.get("parent"), position)
+                _insert(parent, node, operation.get("index"))
+                located[node["id"]] = (parent, node)
+                task_id = node["id"]
+
+            ids.append(task_id)
+            continue
+
+        if task_id not in located:
+            raise BoardOperationError(position, f"no task {task_id}")
+
+        nodes, node = located[task_id]
+
+        if op == RENAME:
+            board_tree.rename(node, operation["text"])
+        elif op == SET_STATE:
+            board_tree.set_state(node, operation["state"])
+        elif op == MOVE:
+            parent_id = operation.get("parent")
+
+            if parent_id == task_id or (
+                parent_id is not None and _contains(node, parent_id)
+            ):
+                raise BoardOperationError(position, "cannot move a task below itself")
+
+            parent = _children(located, state, parent_id, position)
+
+            del nodes[next(i for i, other in enumerate(nodes) if other is node)]
+            _insert(parent, node, operation.get("index"))
+            located[task_id] = (parent, node)
+
+        ids.append(task_id)
+
+    return ids
+
+
+@retry_on_conflict
+@transaction.atomic
+def patch_board(board_id, operations):
+    """
+    Apply operations to the stored board, merging with concurrent writes.
+
+    Returns:
+        Tuple of the saved Board and the ids returned by
+        ``apply_operations``.
+
+    Raises:
+        Board.DoesNotExist: No board with that id.
+        BoardOperationError: An operation does not apply to the board.
+        BoardVersionConflict: Other writes kept getting in between.
+    """
+    board = Board.objects.get(pk=board_id)
+
+    ids = apply_operations(board.state, operations)
+    save_if_unchanged(board, ["state"])
+
+    return board, ids
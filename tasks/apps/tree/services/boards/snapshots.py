@@ -0,0 +1,249 @@
+"""
+Content-addressed storage of committed board trees.
+
+Every task of a tree is stored once as a BoardNode, keyed by the SHA-256 of
+its canonical JSON in which the children are replaced by their digests. A
+subtree left unchanged between two commits therefore hashes the same and
+is stored once; a BoardCommitted in the "nodes" format keeps only the root
+digests of its trees.
+
+Nodes never change once written, so every process keeps the nodes it has
+read in memory and reconstructs trees without asking the database again.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+
+from ...models import BoardCommitted, BoardNode
+
+NODES_KEY = "board_nodes"
+
+FULL = "full"
+NODES = "nodes"
+
+TREE_FIELDS = ["before_data", "after_data", "transitions_data"]
+
+MAX_CACHED_NODES = 100_000
+
+_nodes = {}
+
+
+def is_compact(value):
+    """Whether a stored tree holds references into the BoardNode store"""
+    return isinstance(value, dict) and list(value) == [NODES_KEY]
+
+
+def _store_items(items, nodes):
+    digests = []
+
+    for item in items:
+        content = json.dumps(
+            {**item, "children": _store_items(item.get("children", []), nodes)},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        digest = hashlib.sha256(content.encode()).hexdigest()
+
+        nodes[digest] = content
+        digests.append(digest)
+
+    return digests
+
+
+def compact_tree(value):
+    """
+    Store a board tree in the BoardNode store.
+
+    Args:
+        value: List of board items, or a dict mapping thread names to lists
+            of board items (like ``BoardCommitted.transitions``).
+
+    Returns:
+        The value to store instead, referencing the root nodes.
+    """
+    if is_compact(value):
+        return value
+
+    nodes = {}
+
+    if isinstance(value, dict):
+        roots = {name: _store_items(items, nodes) for name, items in value.items()}
+    else:
+        roots = _store_items(value, nodes)
+
+    BoardNode.objects.bulk_create(
+        [
+            BoardNode(digest=digest, content=content)
+            for digest, content in nodes.items()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+    _remember(nodes)
+
+    return {NODES_KEY: roots}
+
+
+def _remember(nodes):
+    if len(_nodes) + len(nodes) > MAX_CACHED_NODES:
+        _nodes.clear()
+
+    _nodes.update(nodes)
+
+
+def _root_digests(value):
+    roots = value[NODES_KEY]
+
+    if isinstance(roots, dict):
+        return [digest for digests in roots.values() for digest in digests]
+
+    return roots
+
+
+def load_nodes(digests):
+    """
+    Read the nodes below the given digests that are not in memory yet.
+
+    Runs one query per tree level still missing, however many trees the
+    digests belong to.
+    """
+    missing = set(digests).difference(_nodes)
+
+    while missing:
+        found = dict(
+            BoardNode.objects.filter(digest__in=missing).values_list(
+                "digest", "content"
+            )
+        )
+
+        if len(found) < len(missing):
+            raise BoardNode.DoesNotExist(
+                f"Missing board nodes: {sorted(missing.difference(found))}"
+            )
+
+        _remember(found)
+
+        missing = {
+            child
+            for content in found.values()
+            for child in json.loads(content)["children"]
+        }.difference(_nodes)
+
+
+def _build(digests):
+    items = []
+
+    for digest in digests:
+        item = json.loads(_nodes[digest])
+        item["children"] = _build(item["children"])
+        items.append(item)
+
+    return items
+
+
+def expand_tree(value):
+    """
+    Reconstruct a stored board tree.
+
+    Returns full trees unchanged; trees in the BoardNode store are rebuilt
+    from fresh dicts, so they can be modified freely.
+    """
+    if not is_compact(value):
+        return value
+
+    load_nodes(_root_digests(value))
+
+    roots = value[NODES_KEY]
+
+    if isinstance(roots, dict):
+        return {name: _build(digests) for name, digests in roots.items()}
+
+    return _build(roots)
+
+
+def prefetch_board_trees(boards):
+    """
+    Load the nodes of several BoardCommitted events together.
+
+    Called for every evaluated BoardCommitted queryset, so reading the trees
+    of a page of commits costs one query per tree level. Deferred fields
+    are left alone.
+    """
+    digests = [
+        digest
+        for board in boards
+        if isinstance(board, BoardCommitted)
+        for name in TREE_FIELDS
+        if is_compact(board.__dict__.get(name))
+        for digest in _root_digests(board.__dict__[name])
+    ]
+
+    load_nodes(digests)
+
+
+def store_board_trees(board):
+    """
+    Write a BoardCommitted's trees in the configured storage format.
+
+    Trees that were read (or assigned) are written back in the
+    ``BOARD_COMMITTED_STORAGE`` format; ones never read are left as stored.
+    """
+    for name in TREE_FIELDS:
+        tree = board.__dict__.get(f"_{name}_tree")
+
+        if tree is None:
+            continue
+
+        if settings.BOARD_COMMITTED_STORAGE == NODES:
+            setattr(board, name, compact_tree(tree))
+        else:
+            setattr(board, name, tree)
+
+
+def convert_board_history(storage, chunk_size=100):
+    """
+    Rewrite the trees of every BoardCommitted in the given storage format.
+
+    Args:
+        storage: FULL or NODES.
+        chunk_size: Events read and written per batch.
+
+    Returns:
+        int: Number of events rewritten.
+    """
+    convert = compact_tree if storage == NODES else expand_tree
+
+    pks = list(
+        BoardCommitted.objects.non_polymorphic()
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    rewritten = 0
+
+    for start in range(0, len(pks), chunk_size):
+        boards = list(
+            BoardCommitted.objects.non_polymorphic()
+            .filter(pk__in=pks[start : start + chunk_size])
+            .only("pk", *TREE_FIELDS)
+        )
+
+        changed = []
+
+        for board in boards:
+            values = [getattr(board, name) for name in TREE_FIELDS]
+            converted = [convert(value) for value in values]
+
+            if converted != values:
+                for name, value in zip(TREE_FIELDS, converted):
+                    setattr(board, name, value)
+
+                changed.append(board)
+
+        BoardCommitted.objects.bulk_update(changed, TREE_FIELDS)
+        rewritten += len(changed)
+
+    return rewritten
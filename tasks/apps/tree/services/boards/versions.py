@@ -0,0 +1,74 @@
+"""
+Compare-and-swap writes of Board rows.
+
+Every save gives a Board a new ``version``. Writers that read a board,
+change it and write it back save with ``save_if_unchanged``, which only
+writes if the version is still the one they read, so two clients editing
+the same board cannot silently overwrite each other: the second one gets
+a BoardVersionConflict and retries on the fresh board.
+"""
+
+import uuid
+from functools import wraps
+
+from ...models import Board
+
+ATTEMPTS = 3
+
+
+class BoardVersionConflict(Exception):
+    """The board was saved by someone else since it was read."""
+
+    def __init__(self, board_id):
+        super().__init__(f"Board #{board_id} changed since it was read")
+        self.board_id = board_id
+
+
+def save_if_unchanged(board, fields):
+    """
+    Save fields of a board unless it was saved since it was read.
+
+    Args:
+        board: Board instance, as read (its ``version`` is the one expected).
+        fields: Names of the fields to write.
+
+    Raises:
+        BoardVersionConflict: The stored version is no longer the board's.
+    """
+    if board.pk is None:
+        board.save()
+        return
+
+    version = uuid.uuid4()
+
+    updated = Board.objects.filter(pk=board.pk, version=board.version).update(
+        version=version, **{name: getattr(board, name) for name in fields}
+    )
+
+    if not updated:
+        raise BoardVersionConflict(board.pk)
+
+    board.version = version
+
+
+def retry_on_conflict(func):
+    """
+    Run a read-modify-write of boards again when it hits a conflict.
+
+    The function must read the boards it changes itself, so each attempt
+    starts from their current state; wrap it in ``transaction.atomic``
+    inside this decorator so a failed attempt leaves nothing behind. The
+    last attempt's BoardVersionConflict is raised.
+    """
+
+    @wraps(func)
+    def wrapped(*args, **kwargs):
+        for _ in range(ATTEMPTS - 1):
+            try:
+                return func(*args, **kwargs)
+            except BoardVersionConflict:
+                pass
+
+        return func(*args, **kwargs)
+
+    return wrapped
@@ -0,0 +1,145 @@
+"""
+Bulk loading of what event serializers and templates read per event.
+
+Serializing a mixed list of events used to cost several queries per row:
+the thread, type and habit foreign keys, journal tags, the stream's
+Observation behind ``url()``, the situation history behind
+``situation_at_creation()`` and the other Observation named by attach/detach
+events. ``prefetch_event_relations`` resolves all of them for a whole list
+with a fixed number of queries.
+"""
+
+from collections import defaultdict
+
+from django.db.models import prefetch_related_objects
+
+from polymorphic.query import PolymorphicQuerySet
+
+from ...models import (
+    Observation,
+    ObservationEventMixin,
+    ObservationMade,
+    ObservationRecontextualized,
+    OtherObservationMixin,
+)
+
+# Relations read by the event serializers, prefetched per event class
+EVENT_RELATIONS = {
+    "type": ["type"],
+    "habit": ["habit", "habit__keywords"],
+    "tags": ["tags"],
+}
+
+
+def _observations_by_stream(event_stream_ids):
+    return {
+        observation.event_stream_id: observation
+        for observation in Observation.objects.filter(
+            event_stream_id__in=event_stream_ids
+        )
+    }
+
+
+def _situation_histories(event_stream_ids):
+    """(published, situation) pairs of every stream, oldest first."""
+    histories = defaultdict(list)
+
+    for model in (ObservationMade, ObservationRecontextualized):
+        for event_stream_id, published, situation in (
+            model.objects.non_polymorphic()
+            .filter(event_stream_id__in=event_stream_ids)
+            .values_list("event_stream_id", "published", "situation")
+        ):
+            histories[event_stream_id].append((published, situation))
+
+    for history in histories.values():
+        history.sort(key=lambda pair: pair[0])
+
+    return histories
+
+
+def _prefetch_relations(events):
+    prefetch_related_objects(events, "thread")
+
+    events_by_class = defaultdict(list)
+
+    for event in events:
+        events_by_class[type(event)].append(event)
+
+    for model, instances in events_by_class.items():
+        lookups = [
+            lookup
+            for field in model._meta.get_fields()
+            if field.is_relation and field.name in EVENT_RELATIONS
+            for lookup in EVENT_RELATIONS[field.name]
+        ]
+
+        if lookups:
+            prefetch_related_objects(instances, *lookups)
+
+
+def _prefetch_observations(events):
+    stream_events = [
+        e
+        for e in events
+        if isinstance(e, ObservationEventMixin)
+        and not hasattr(e, "_prefetched_observation")
+    ]
+    other_events = [
+        e
+        for e in events
+        if isinstance(e, OtherObservationMixin)
+        and not hasattr(e, "_prefetched_other_observation")
+    ]
+
+    if not stream_events and not other_events:
+        return
+
+    stream_ids = {event.event_stream_id for event in stream_events}
+    observations = _observations_by_stream(
+        stream_ids | {event.other_event_stream_id for event in other_events}
+    )
+    histories = _situation_histories(stream_ids) if stream_ids else {}
+
+    for event in stream_events:
+        event._prefetched_observation = observations.get(event.event_stream_id)
+        event._prefetched_situation_history = histories.get(event.event_stream_id, [])
+
+    for event in other_events:
+        event._prefetched_other_observation = observations.get(
+            event.other_event_stream_id
+        )
+
+
+def load_events(events):
+    """
+    Evaluate events into a list of real-class instances.
+
+    django-polymorphic resolves a queryset's rows to their subclasses in
+    chunks of 100, with a query per event class and chunk; here the base rows
+    are read once and resolved with a single query per event class.
+    """
+    if isinstance(events, PolymorphicQuerySet):
+        return events.get_real_instances(list(events.non_polymorphic()))
+
+    return list(events)
+
+
+def prefetch_event_relations(events):
+    """
+    Load everything serializing the given events reads, in bulk.
+
+    Events loaded by an earlier call are skipped, so a list can be prefetched
+    once and then serialized in parts without further queries.
+
+    Args:
+        events: List of (polymorphic, real class) Event instances.
+
+    Returns:
+        The same list, for chaining.
+    """
+    if events:
+        _prefetch_relations(events)
+        _prefetch_observations(events)
+
+    return events
@@ -0,0 +1,13 @@
+from .analytics import HabitStats, compute_habit_stats, habit_stats
+from .tracking import CREATED, UNKNOWN_KEYWORD, UPDATED, aware_midday, track_habits
+
+__all__ = [
+    "CREATED",
+    "UNKNOWN_KEYWORD",
+    "UPDATED",
+    "HabitStats",
+    "aware_midday",
+    "compute_habit_stats",
+    "habit_stats",
+    "track_habits",
+]
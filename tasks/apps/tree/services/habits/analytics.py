@@ -0,0 +1,159 @@
+"""
+Streaks and frequencies of tracked habits.
+
+Statistics are computed from the HabitDayCount rollup: each habit's history
+becomes a bytearray with one byte per day, set where the habit occurred
+and was not skipped, and streaks and frequencies are read off it with
+bytes operations (split, rstrip, count) that run in C rather than looping
+over days in Python.
+
+Results are cached per habit for the day, under the version token of the
+habit's rollup rows, so tracking a habit makes the next read recompute
+that habit only.
+"""
+
+import datetime
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from ...utils.datetime import adjust_start_date_to_monday
+from ...utils.habit_calendar import habit_day_counts, habit_days_versions
+
+WEEKS = 52
+
+HabitStats = namedtuple(
+    "HabitStats",
+    [
+        "current_streak",
+        "longest_streak",
+        "longest_streak_end",
+        "last_tracked",
+        "days_tracked",
+        "days_skipped",
+        "last_7_days",
+        "last_30_days",
+        "last_365_days",
+        "weekly",
+    ],
+)
+
+
+def _tracked_days(days, start, end):
+    tracked = bytearray((end - start).days + 1)
+
+    for day, count in days.items():
+        if count > 0 and start <= day <= end:
+            tracked[(day - start).days] = 1
+
+    return tracked
+
+
+def compute_habit_stats(days, today):
+    """
+    Compute the HabitStats of one habit.
+
+    Streaks count consecutive days the habit occurred; a skipped or
+    untracked day ends them. While today is neither tracked nor skipped,
+    the current streak is the one ending yesterday. ``last_*_days`` count
+    the days the habit occurred in the windows ending today, and ``weekly``
+    lists (monday, days occurred) for the last 52 weeks, oldest first.
+
+    Args:
+        days: Dict mapping dates to calendar counts, as returned by
+            ``habit_day_counts`` (-1 on skipped days).
+        today: The last day to consider.
+
+    Returns:
+        A HabitStats.
+    """
+    window_start = adjust_start_date_to_monday(
+        today - datetime.timedelta(weeks=WEEKS - 1)
+    )
+    start = min([window_start, *days])
+    tracked = _tracked_days(days, start, today)
+
+    runs = bytes(tracked).split(b"\0")
+    longest = max(map(len, runs))
+    longest_end = None
+
+    if longest:
+        end_index = tracked.rfind(b"\1" * longest) + longest - 1
+        longest_end = start + datetime.timedelta(days=end_index)
+
+    # Today does not end the streak until it has been tracked or skipped
+    current = tracked if tracked[-1] or today in days else tracked[:-1]
+    current_streak = len(current) - len(current.rstrip(b"\1"))
+
+    last_tracked = max((day for day, count in days.items() if count > 0), default=None)
+
+    window = tracked[(window_start - start).days :]
+
+    return HabitStats(
+        current_streak=current_streak,
+        longest_streak=longest,
+        longest_streak_end=longest_end,
+        last_tracked=last_tracked,
+        days_tracked=tracked.count(1),
+        days_skipped=sum(1 for count in days.values() if count < 0),
+        last_7_days=tracked[-7:].count(1),
+        last_30_days=tracked[-30:].count(1),
+        last_365_days=tracked[-365:].count(1),
+        weekly=[
+            (
+                window_start + datetime.timedelta(days=offset),
+                window[offset : offset + 7].count(1),
+            )
+            for offset in range(0, len(window), 7)
+        ],
+    )
+
+
+def _cache_key(version, today, habit_id):
+    return f"habit-stats:{version}:{today.isoformat()}:{habit_id}"
+
+
+def habit_stats(habits, today=None):
+    """
+    Get the HabitStats of several habits.
+
+    Costs one query for the habits' version tokens and a cache lookup; the
+    days of habits missing from the cache are read in one more query.
+
+    Args:
+        habits: Iterable of Habit instances.
+        today: Last day to consider, the current local date by default.
+
+    Returns:
+        Dict mapping each habit's pk to its HabitStats.
+    """
+    today = today or timezone.localdate()
+    versions = habit_days_versions(habit.pk for habit in habits)
+
+    keys = {
+        habit_id: _cache_key(version, today, habit_id)
+        for habit_id, version in versions.items()
+    }
+    cached = cache.get_many(keys.values())
+
+    stats = {habit_id: cached[key] for habit_id, key in keys.items() if key in cached}
+
+    missing = [habit_id for habit_id in keys if habit_id not in stats]
+
+    if missing:
+        calendars = habit_day_counts(missing, datetime.date.min, today)
+
+        computed = {
+            habit_id: compute_habit_stats(days, today)
+            for habit_id, days in calendars.items()
+        }
+
+        cache.set_many(
+            {keys[habit_id]: value for habit_id, value in computed.items()},
+            timeout=60 * 60 * 24,
+        )
+
+        stats.update(computed)
+
+    return stats
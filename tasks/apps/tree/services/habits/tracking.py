@@ -0,0 +1,94 @@
+"""
+Recording habits tracked by date, as the mobile clients send them.
+
+A record names a habit by one of its keywords and a day. Tracking a habit
+on a day it was already tracked on updates that event instead of adding
+another one.
+"""
+
+import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from ...models import HabitKeyword, HabitTracked
+from ...utils.statistics import bulk_create_events, bulk_update_events
+from ...uuid_generators import habit_event_stream_id
+
+CREATED = "created"
+UPDATED = "updated"
+UNKNOWN_KEYWORD = "unknown_keyword"
+
+
+def aware_midday(date: datetime.date):
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time(12, 0)))
+
+
+@transaction.atomic
+def track_habits(records, thread):
+    """
+    Create or update the HabitTracked events of many records at once.
+
+    Keywords and the events already stored for the records' days are loaded
+    in one query each; new events are bulk-inserted and existing ones
+    bulk-updated. Records are applied in order, so a later record for the
+    same habit and day updates the event of an earlier one.
+
+    Args:
+        records: Iterable of dicts with ``keyword``, ``date`` and ``note``.
+        thread: Thread the events are recorded in.
+
+    Returns:
+        List of CREATED, UPDATED or UNKNOWN_KEYWORD, one per record.
+    """
+    records = list(records)
+
+    habits = {
+        habit_keyword.keyword: habit_keyword.habit
+        for habit_keyword in HabitKeyword.objects.select_related("habit").filter(
+            keyword__in={record["keyword"] for record in records}
+        )
+    }
+
+    events = {}
+
+    # Ordered by published, so the first event of a day is the one updated
+    for event in HabitTracked.objects.filter(
+        habit__in={habit.pk for habit in habits.values()},
+        published__date__in={record["date"] for record in records},
+    ):
+        events.setdefault((event.habit_id, timezone.localdate(event.published)), event)
+
+    created, updated, statuses = [], {}, []
+
+    for record in records:
+        habit = habits.get(record["keyword"])
+
+        if habit is None:
+            statuses.append(UNKNOWN_KEYWORD)
+            continue
+
+        event = events.get((habit.pk, record["date"]))
+
+        if event is None:
+            event = events[habit.pk, record["date"]] = HabitTracked(habit=habit)
+            event.event_stream_id = habit_event_stream_id(event)
+            created.append(event)
+            statuses.append(CREATED)
+        else:
+            if event.pk is not None:
+                updated[event.pk] = event
+
+            statuses.append(UPDATED)
+
+        event.note = record["note"]
+        event.occured = True
+        event.thread = thread
+        event.published = aware_midday(record["date"])
+
+    bulk_create_events(HabitTracked, created)
+    bulk_update_events(
+        HabitTracked, list(updated.values()), ["note", "occured", "thread", "published"]
+    )
+
+    return statuses
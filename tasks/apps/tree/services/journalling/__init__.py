@@ -12,7 +12,13 @@ Exported functions:
         - Extract reflection items ([x], [~], [^]) and add them to Reflections
         - Parse habit markers (#habit, !habit) and create HabitTracked entries
 
-        Used by: JournalAddedViewSet, journal_add view
+        Used by: submit_journal_entry, process_journal_entry_task
+
+    submit_journal_entry(journal_added, skip_habits=False, story=None)
+        Process a journal entry in the current transaction or, with
+        JOURNAL_PROCESSING_ASYNC enabled, in a Celery worker after commit.
+
+        Used by: JournalAddedViewSet, journal_add view, trip notes and photos
 
     habits_line_to_habits_tracked(line, habits=None)
         Parse a text line and return matched habit tracking tuples.
@@ -23,9 +29,10 @@ Exported functions:
 """
 
 from .habit_extraction import habits_line_to_habits_tracked
-from .journal_processing import process_journal_entry
+from .journal_processing import process_journal_entry, submit_journal_entry
 
 __all__ = [
     "habits_line_to_habits_tracked",
     "process_journal_entry",
+    "submit_journal_entry",
 ]
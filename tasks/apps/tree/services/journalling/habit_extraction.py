@@ -7,7 +7,7 @@ and matching them to Habit instances.
 
 import re
 
-from ...models import Habit
+from .keyword_index import KeywordTrie, keyword_trie
 
 PATTERN = re.compile(r"(?<=\s)(?=[#!])", re.MULTILINE)
 
@@ -29,6 +29,9 @@ def find_best_keyword_match(string, keywords):
     """
     Find the best matching keyword for a string based on prefix matching.
 
+    Compares the string with every keyword; ``KeywordTrie.best_match`` is
+    the indexed equivalent used for matching habit tokens.
+
     Args:
         string: The string to match against keywords.
         keywords: Iterable of keyword strings to match.
@@ -66,13 +69,13 @@ def parse_habit_tokens(line):
     return [x.strip() for x in items if x.strip().startswith(("!", "#"))]
 
 
-def match_token_to_habit(token, habits_from_keywords):
+def match_token_to_habit(token, keywords):
     """
     Match a single token to a habit.
 
     Args:
         token: String starting with # (occurred) or ! (skipped).
-        habits_from_keywords: Dict mapping keywords to Habit instances.
+        keywords: KeywordTrie of the keywords to match.
 
     Returns:
         Tuple of (occurred, habit, note) or None if no match.
@@ -82,41 +85,39 @@ def match_token_to_habit(token, habits_from_keywords):
     """
     occurred = token[0] == "#"
 
-    index, length, keyword = find_best_keyword_match(
-        token[1:], habits_from_keywords.keys()
-    )
+    length, keyword = keywords.best_match(token[1:])
 
-    if index is None or length < 3:
+    if keyword is None or length < 3:
         raise ValueError(f"Match failed on {token}")
 
-    habit = habits_from_keywords[keyword]
+    habit = keywords.habits[keyword]
     note = token.split("\n")[0]
 
     return (occurred, habit, note)
 
 
-def match_token_to_habit_or_none(token, habits_from_keywords):
+def match_token_to_habit_or_none(token, keywords):
     """Match a token to a habit, returning None on failure."""
     try:
-        return match_token_to_habit(token, habits_from_keywords)
+        return match_token_to_habit(token, keywords)
     except ValueError:
         return None
 
 
-def match_tokens_to_habits(tokens, habits_from_keywords):
+def match_tokens_to_habits(tokens, keywords):
     """
     Match a list of tokens to habits.
 
     Args:
         tokens: List of habit tokens (# or ! prefixed).
-        habits_from_keywords: Dict mapping keywords to Habit instances.
+        keywords: KeywordTrie of the keywords to match.
 
     Returns:
         List of (occurred, habit, note) tuples for matched tokens.
     """
     return [
         m
-        for m in (match_token_to_habit_or_none(t, habits_from_keywords) for t in tokens)
+        for m in (match_token_to_habit_or_none(t, keywords) for t in tokens)
         if m is not None
     ]
 
@@ -144,7 +145,7 @@ def habits_line_to_habits_tracked(line, habits=None):
     Args:
         line: Text line containing habit markers (# or !).
         habits: Optional iterable of Habit instances. If not provided,
-            fetches all habits from the database.
+            matches against the cached trie of all habit keywords.
 
     Returns:
         List of (occurred, habit, note) tuples for each matched habit.
@@ -155,8 +156,8 @@ def habits_line_to_habits_tracked(line, habits=None):
         return []
 
     if habits is None:
-        habits = Habit.objects.all()
-
-    habits_from_keywords = build_keyword_to_habit_map(habits)
+        keywords = keyword_trie()
+    else:
+        keywords = KeywordTrie(build_keyword_to_habit_map(habits))
 
-    return match_tokens_to_habits(tokens, habits_from_keywords)
+    return match_tokens_to_habits(tokens, keywords)
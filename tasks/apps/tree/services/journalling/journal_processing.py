@@ -7,13 +7,19 @@ including reflection extraction and habit tracking.
 
 import re
 
+from django.conf import settings
+from django.db import transaction
+
+from ...uuid_generators import habit_event_stream_id
 from .habit_extraction import habits_line_to_habits_tracked
 from .reflection_extraction import add_reflection_items
 
 QUOTED_LINE_RE = re.compile(r"^[ \t]*>.*(?:\n|$)", re.MULTILINE)
 
 
-def process_journal_entry(journal_added, skip_habits=False, story=None):
+def process_journal_entry(
+    journal_added, skip_habits=False, story=None, link_entry=True
+):
     """
     Process a journal entry after it has been saved.
 
@@ -21,35 +27,94 @@ def process_journal_entry(journal_added, skip_habits=False, story=None):
     based on the journal content. Markdown blockquote lines (starting
     with `>`) are stripped before parsing so quoted content is ignored.
 
+    The HabitTracked and StoryEvent rows are bulk-inserted, so an entry
+    costs the same number of queries however many habits it tracks.
+
     Args:
         journal_added: A saved JournalAdded instance.
         skip_habits: If True, skip habit extraction (used for reflection-only entries).
         story: Optional Story instance. When provided, the JournalAdded itself
             and every HabitTracked extracted from hashtags get linked to the
             story via a StoryEvent row.
+        link_entry: If False, the JournalAdded is already linked to the story
+            and only the extracted events are.
     """
     # Import here to avoid circular imports
     from ...models import HabitTracked, StoryEvent, Thread
+    from ...utils.statistics import bulk_create_events
 
     comment = QUOTED_LINE_RE.sub("", journal_added.comment)
 
     add_reflection_items(journal_added, comment=comment)
 
+    events = [journal_added] if link_entry else []
+
+    triplets = [] if skip_habits else habits_line_to_habits_tracked(comment)
+
+    if triplets:
+        if journal_added.thread.name == "Daily":
+            daily = journal_added.thread
+        else:
+            daily = Thread.objects.get(name="Daily")
+
+        habits_tracked = [
+            HabitTracked(
+                occured=occured,
+                habit=habit,
+                note=note,
+                published=journal_added.published,
+                thread=daily,
+            )
+            for occured, habit, note in triplets
+        ]
+
+        for habit_tracked in habits_tracked:
+            habit_tracked.event_stream_id = habit_event_stream_id(habit_tracked)
+
+        events += bulk_create_events(HabitTracked, habits_tracked)
+
+    if story is not None and events:
+        StoryEvent.objects.bulk_create(
+            StoryEvent(story=story, event=event) for event in events
+        )
+
+
+def submit_journal_entry(journal_added, skip_habits=False, story=None):
+    """
+    Process a journal entry now, or after commit in a Celery worker.
+
+    With ``JOURNAL_PROCESSING_ASYNC`` enabled, the entry is linked to its
+    story right away and marked ``processing_pending``; the request then
+    only schedules ``process_journal_entry_task`` for after its transaction
+    commits, and reflections and HabitTracked rows appear once the worker
+    has run. Otherwise the entry is processed in the current transaction.
+
+    Args:
+        journal_added: A saved JournalAdded instance.
+        skip_habits: If True, skip habit extraction.
+        story: Optional Story instance to link the entry and the derived
+            events to.
+    """
+    if not settings.JOURNAL_PROCESSING_ASYNC:
+        process_journal_entry(journal_added, skip_habits=skip_habits, story=story)
+        return
+
+    # Import here to avoid circular imports and importing celery tasks at
+    # module load.
+    from ...models import JournalAdded, StoryEvent
+    from ...tasks import process_journal_entry_task
+
     if story is not None:
         StoryEvent.objects.create(story=story, event=journal_added)
 
-    if skip_habits:
-        return
+    JournalAdded.objects.filter(pk=journal_added.pk).update(processing_pending=True)
+    journal_added.processing_pending = True
 
-    triplets = habits_line_to_habits_tracked(comment)
+    journal_added_id = journal_added.pk
+    story_id = story.pk if story is not None else None
 
-    for occured, habit, note in triplets:
-        habit_tracked = HabitTracked.objects.create(
-            occured=occured,
-            habit=habit,
-            note=note,
-            published=journal_added.published,
-            thread=Thread.objects.get(name="Daily"),
+    transaction.on_commit(
+        lambda: process_journal_entry_task.delay(
+            journal_added_id, skip_habits=skip_habits, story_id=story_id
         )
-        if story is not None:
-            StoryEvent.objects.create(story=story, event=habit_tracked)
+    )
@@ -0,0 +1,136 @@
+"""
+Prefix trie of habit keywords.
+
+Matching a ``#token`` against the keywords walks the trie once along the
+token instead of comparing it with every keyword. The trie of all
+HabitKeywords is cached in the process and rebuilt when the version token
+stored in Statistics changes; the Habit and HabitKeyword signals replace the
+token, so every process rebuilds after a change is committed.
+"""
+
+import uuid
+
+from ...models import HabitKeyword, Statistics
+
+VERSION_KEY = "habit_keyword_index"
+
+
+class KeywordTrie:
+    """
+    Prefix trie mapping keywords to habits.
+
+    Args:
+        habits_from_keywords: Dict mapping keywords to Habit instances. On a
+            tie, ``best_match`` prefers the keyword that comes first.
+    """
+
+    __slots__ = ("habits", "root")
+
+    def __init__(self, habits_from_keywords):
+        self.habits = habits_from_keywords
+        self.root = _Node()
+
+        for keyword in habits_from_keywords:
+            node = self.root
+
+            for char in keyword:
+                node = node.children.setdefault(char, _Node())
+
+                if node.keyword is None:
+                    node.keyword = keyword
+
+    def best_match(self, string):
+        """
+        Find the keyword sharing the longest prefix with a string.
+
+        Gives the same result as ``find_best_keyword_match`` over the
+        keywords in order, in time proportional to the prefix length.
+
+        Returns:
+            Tuple of (length, keyword), or (0, None) if no keyword starts
+            with the first character of the string.
+        """
+        node = self.root
+        length = 0
+
+        for char in string:
+            child = node.children.get(char)
+
+            if child is None:
+                break
+
+            node = child
+            length += 1
+
+        return length, node.keyword
+
+
+class _Node:
+    # keyword is the first keyword inserted below this node
+    __slots__ = ("children", "keyword")
+
+    def __init__(self):
+        self.children = {}
+        self.keyword = None
+
+
+def load_keyword_to_habit_map():
+    """
+    Build the mapping from keywords to habits for all habits in one query.
+
+    Returns:
+        Dict mapping each keyword to its Habit.
+    """
+    return {
+        habit_keyword.keyword: habit_keyword.habit
+        for habit_keyword in HabitKeyword.objects.select_related("habit")
+    }
+
+
+_cached = None
+
+
+def keyword_trie():
+    """
+    The KeywordTrie of all HabitKeywords, rebuilt after they change.
+
+    Costs one query for the version token while the cached trie is current.
+    """
+    global _cached
+
+    version = (
+        Statistics.objects.filter(key=VERSION_KEY)
+        .values_list("value", flat=True)
+        .first()
+    )
+
+    if version is None:
+        version = invalidate_keyword_trie()
+
+    cached = _cached
+
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    trie = KeywordTrie(load_keyword_to_habit_map())
+    _cached = (version, trie)
+
+    return trie
+
+
+def invalidate_keyword_trie():
+    """
+    Make every process rebuild its KeywordTrie on the next match.
+
+    Stores a new random version token rather than a counter: a token written
+    by a rolled back transaction is never reused, so a trie built from its
+    uncommitted keywords is never mistaken for a current one.
+
+    Returns:
+        The new version token.
+    """
+    version = uuid.uuid4().hex
+
+    Statistics.objects.update_or_create(key=VERSION_KEY, defaults={"value": version})
+
+    return version
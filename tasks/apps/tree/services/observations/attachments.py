@@ -0,0 +1,168 @@
+"""
+Attachment projection for complex Observations.
+
+Folds ObservationAttached/ObservationDetached events into one
+ObservationAttachmentProjection row per observation stream as they are
+written, so readers get the currently attached streams without replaying
+the stream's whole history.
+"""
+
+import uuid
+from collections import defaultdict
+
+from django.db import transaction
+
+from ...models import (
+    ObservationAttached,
+    ObservationAttachmentProjection,
+    ObservationDetached,
+)
+
+# Replay sort key: at equal timestamps attaches are applied before detaches,
+# so a detach published at the same instant wins (as it always has in the
+# correlated SQL this projection replaced).
+ATTACH, DETACH = False, True
+
+
+def _stream_id(value):
+    """Normalise a stream id (UUID or string from request data) to a string."""
+    return str(uuid.UUID(str(value)))
+
+
+def replay_attachments(changes):
+    """
+    Replay attach/detach changes into the set of attached stream ids.
+
+    Args:
+        changes: Iterable of (published, kind, other_event_stream_id) tuples,
+            where kind is ATTACH or DETACH. Need not be sorted.
+
+    Returns:
+        Set of attached stream ids as strings.
+    """
+    attached = set()
+
+    for _published, kind, other in sorted(changes, key=lambda c: c[:2]):
+        if kind == DETACH:
+            attached.discard(_stream_id(other))
+        else:
+            attached.add(_stream_id(other))
+
+    return attached
+
+
+def _changes(event_stream_id=None):
+    """Yield (event_stream_id, (published, kind, other)) for attach/detach events."""
+    for model, kind in ((ObservationAttached, ATTACH), (ObservationDetached, DETACH)):
+        events = model.objects.non_polymorphic()
+
+        if event_stream_id is not None:
+            events = events.filter(event_stream_id=event_stream_id)
+
+        for stream_id, published, other in events.values_list(
+            "event_stream_id", "published", "other_event_stream_id"
+        ).iterator():
+            yield stream_id, (published, kind, other)
+
+
+def _projection_from_changes(event_stream_id, changes):
+    attached = replay_attachments(changes)
+
+    return ObservationAttachmentProjection(
+        event_stream_id=event_stream_id,
+        attached_stream_ids=sorted(attached),
+        attached_count=len(attached),
+        last_event_published=max((c[0] for c in changes), default=None),
+    )
+
+
+def refresh_attachment_projection(event_stream_id):
+    """Recompute one stream's projection by replaying its events."""
+    changes = [change for _stream, change in _changes(event_stream_id)]
+    projection = _projection_from_changes(event_stream_id, changes)
+
+    ObservationAttachmentProjection.objects.update_or_create(
+        event_stream_id=event_stream_id,
+        defaults={
+            "attached_stream_ids": projection.attached_stream_ids,
+            "attached_count": projection.attached_count,
+            "last_event_published": projection.last_event_published,
+        },
+    )
+
+
+def apply_attachment_event(event):
+    """
+    Fold a newly written ObservationAttached/ObservationDetached event into
+    its stream's projection.
+
+    The projection row is locked for the update. An event published no later
+    than the newest one already applied is out of order, so the stream is
+    replayed instead.
+    """
+    with transaction.atomic():
+        (
+            projection,
+            _,
+        ) = ObservationAttachmentProjection.objects.select_for_update().get_or_create(
+            event_stream_id=event.event_stream_id
+        )
+
+        last = projection.last_event_published
+
+        if last is not None and event.published <= last:
+            refresh_attachment_projection(event.event_stream_id)
+            return
+
+        attached = set(projection.attached_stream_ids)
+        other = _stream_id(event.other_event_stream_id)
+
+        if isinstance(event, ObservationDetached):
+            attached.discard(other)
+        else:
+            attached.add(other)
+
+        projection.attached_stream_ids = sorted(attached)
+        projection.attached_count = len(attached)
+        projection.last_event_published = event.published
+        projection.save()
+
+
+def rebuild_attachment_projections():
+    """
+    Rebuild the projection of every stream from its events.
+
+    Reads all attach/detach events with two flat queries and replaces the
+    projection table.
+
+    Returns:
+        Number of projection rows written.
+    """
+    changes_by_stream = defaultdict(list)
+
+    for event_stream_id, change in _changes():
+        changes_by_stream[event_stream_id].append(change)
+
+    projections = [
+        _projection_from_changes(event_stream_id, changes)
+        for event_stream_id, changes in changes_by_stream.items()
+    ]
+
+    with transaction.atomic():
+        ObservationAttachmentProjection.objects.all().delete()
+        ObservationAttachmentProjection.objects.bulk_create(
+            projections, batch_size=1000
+        )
+
+    return len(projections)
+
+
+def get_attached_stream_ids(event_stream_id):
+    """Return the set of stream ids (UUIDs) currently attached to a stream."""
+    attached = (
+        ObservationAttachmentProjection.objects.filter(event_stream_id=event_stream_id)
+        .values_list("attached_stream_ids", flat=True)
+        .first()
+    )
+
+    return {uuid.UUID(stream_id) for stream_id in attached or ()}
@@ -12,9 +12,11 @@ from .keys import (
     original_key,
     photo_key,
     photo_key_belongs_to,
+    rendition_key_for,
+    story_prefix,
     thumbnail_key_for,
 )
-from .metadata import read_capture_datetime
+from .metadata import read_capture_datetime, read_capture_datetime_ranged
 from .standalone import add_standalone_photo, presign_standalone_photo
 
 __all__ = [
@@ -29,8 +31,11 @@ __all__ = [
     "original_key",
     "photo_key",
     "photo_key_belongs_to",
+    "rendition_key_for",
+    "story_prefix",
     "thumbnail_key_for",
     "read_capture_datetime",
+    "read_capture_datetime_ranged",
     "add_standalone_photo",
     "presign_standalone_photo",
 ]
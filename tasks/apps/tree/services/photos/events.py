@@ -7,7 +7,7 @@ module — which would create a ``trips`` <-> ``photos`` circular import.
 """
 
 from . import storage as photo_storage
-from .metadata import read_capture_datetime
+from .metadata import read_capture_datetime_ranged
 
 
 class PhotoObjectMissingError(Exception):
@@ -39,12 +39,17 @@ def existing_event(model, idempotency_key):
 def capture_datetime_from_storage(key):
     """Best-effort EXIF capture time of the just-uploaded original.
 
+    Reads only the image header by ranged GETs, downloading the whole original
+    just for formats whose header can't be read that way.
+
     Returns None on any failure (download error, non-image, no EXIF date) so a
     missing or unreadable timestamp never blocks the confirm — the caller then
     falls back to the client-supplied ``published``.
     """
     try:
-        raw = photo_storage.download_bytes(key)
+        return read_capture_datetime_ranged(
+            lambda start, end: photo_storage.download_range(key, start, end),
+            lambda: photo_storage.download_bytes(key),
+        )
     except Exception:  # noqa: BLE001 - storage hiccups must not fail confirm
         return None
-    return read_capture_datetime(raw)
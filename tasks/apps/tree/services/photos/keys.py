@@ -25,10 +25,15 @@ def ext_for_content_type(content_type):
         raise ValueError(f"unsupported content type: {content_type!r}") from e
 
 
+def story_prefix(user_id, story_id):
+    """Prefix of the S3 keys of a story's photos."""
+    return f"trips/{user_id}/{story_id}/"
+
+
 def original_key(user_id, story_id, content_type):
     """Allocate a fresh S3 key for an original photo upload."""
     ext = ext_for_content_type(content_type)
-    return f"trips/{user_id}/{story_id}/{uuid.uuid4()}.{ext}"
+    return f"{story_prefix(user_id, story_id)}{uuid.uuid4()}.{ext}"
 
 
 def photo_key(user_id, content_type):
@@ -37,15 +42,20 @@ def photo_key(user_id, content_type):
     return f"photos/{user_id}/{uuid.uuid4()}.{ext}"
 
 
+def rendition_key_for(original, name):
+    """Deterministic WebP key of a named rendition of an original key."""
+    base = original.rsplit(".", 1)[0]
+    return f"{base}_{name}.webp"
+
+
 def thumbnail_key_for(original):
     """Deterministic WebP thumbnail key derived from an original key."""
-    base = original.rsplit(".", 1)[0]
-    return f"{base}_thumb.webp"
+    return rendition_key_for(original, "thumb")
 
 
 def key_belongs_to(key, user_id, story_id):
     """Guard: a confirmed key must live under this user's/story's prefix."""
-    return key.startswith(f"trips/{user_id}/{story_id}/")
+    return key.startswith(story_prefix(user_id, story_id))
 
 
 def photo_key_belongs_to(key, user_id):
@@ -5,9 +5,16 @@ were uploaded. The Android client sends its best guess (the gallery's
 DATE_TAKEN); on confirm the backend re-derives the timestamp from the
 original's EXIF and overrides it when present, so EXIF DateTimeOriginal is the
 authoritative source regardless of client.
+
+On confirm the EXIF is read from the head of the stored object by ranged
+reads (``read_capture_datetime_ranged``): for JPEG the APP1 segment, for
+HEIC/HEIF the ``meta`` box and the Exif item it points to, usually within the
+first few kilobytes. Other formats, and headers that run past
+``HEADER_LIMIT``, fall back to downloading the whole original.
 """
 
 import io
+import struct
 from datetime import datetime, timedelta
 from datetime import timezone as dt_timezone
 
@@ -21,6 +28,11 @@ _DATETIME_ORIGINAL = 0x9003  # in the Exif sub-IFD: "YYYY:MM:DD HH:MM:SS"
 _OFFSET_TIME_ORIGINAL = 0x9011  # in the Exif sub-IFD: "+02:00"
 _DATETIME = 0x0132  # in the main IFD; fallback when no DateTimeOriginal
 
+# Ranged reads: the first request, and how far into an object headers are
+# followed before falling back to a full download.
+HEADER_CHUNK = 64 * 1024
+HEADER_LIMIT = 1024 * 1024
+
 
 def _parse_offset(value):
     """Parse an EXIF offset string like ``+02:00`` into a tzinfo, or None."""
@@ -50,6 +62,11 @@ def read_capture_datetime(raw):
         exif = Image.open(io.BytesIO(raw)).getexif()
     except Exception:  # noqa: BLE001 - a bad image must never raise here
         return None
+    return capture_datetime_from_exif(exif)
+
+
+def capture_datetime_from_exif(exif):
+    """Like ``read_capture_datetime``, for the EXIF of an already opened image."""
     if not exif:
         return None
 
@@ -71,3 +88,218 @@ def read_capture_datetime(raw):
     if tz is not None:
         return naive.replace(tzinfo=tz)
     return timezone.make_aware(naive)
+
+
+class _Unreadable(Exception):
+    """The header cannot be read by ranges; download the whole object."""
+
+
+class _RangedObject:
+    """Bytes of a stored object, fetched by ranges as a parser asks for them.
+
+    The head of the object is kept as one buffer that grows (doubling) up to
+    ``HEADER_LIMIT``; anything further is never followed.
+    """
+
+    def __init__(self, read_range):
+        self.read_range = read_range
+        self.head = b""
+        self.complete = False
+
+    def read(self, start, length):
+        end = start + length
+
+        if end > HEADER_LIMIT:
+            raise _Unreadable(f"header runs past {HEADER_LIMIT} bytes")
+
+        if end > len(self.head) and not self.complete:
+            wanted = min(max(end, 2 * len(self.head), HEADER_CHUNK), HEADER_LIMIT)
+            chunk = self.read_range(len(self.head), wanted - 1)
+            self.complete = len(self.head) + len(chunk) < wanted
+            self.head += chunk
+
+        return self.head[start:end]
+
+
+def _jpeg_exif(data):
+    """TIFF bytes of the APP1 Exif segment of a JPEG, or None."""
+    position = 2
+
+    while True:
+        header = data.read(position, 4)
+        if len(header) < 4 or header[0] != 0xFF:
+            return None
+
+        marker = header[1]
+        if marker == 0xFF:  # fill byte before a marker
+            position += 1
+            continue
+        if marker in (0xD9, 0xDA):  # end of image, start of scan
+            return None
+
+        (length,) = struct.unpack(">H", header[2:])
+        if marker == 0xE1:
+            payload = data.read(position + 4, length - 2)
+            if payload.startswith(b"Exif\x00\x00"):
+                return payload[6:]
+
+        position += 2 + length
+
+
+def _boxes(data, start, end):
+    """Yield (type, payload start, box end) of the ISO BMFF boxes in a range."""
+    position = start
+
+    while end is None or position + 8 <= end:
+        header = data.read(position, 8)
+        if len(header) < 8:
+            return
+
+        size, kind = struct.unpack(">I4s", header)
+        offset = 8
+
+        if size == 1:
+            (size,) = struct.unpack(">Q", data.read(position + 8, 8))
+            offset = 16
+        elif size == 0:  # runs to the end of the file
+            return
+
+        if size < offset:
+            return
+
+        yield kind, position + offset, position + size
+        position += size
+
+
+def _heif_exif_item(data, start, end):
+    """Id of the Exif item listed in the ``iinf`` box of a ``meta`` box"""
+    for kind, payload, box_end in _boxes(data, start, end):
+        if kind != b"iinf":
+            continue
+
+        version = data.read(payload, 1)[0]
+        entries = payload + (6 if version == 0 else 8)
+
+        for entry, entry_payload, _ in _boxes(data, entries, box_end):
+            if entry != b"infe":
+                continue
+
+            version = data.read(entry_payload, 1)[0]
+            if version < 2:
+                continue
+
+            id_size = 2 if version == 2 else 4
+            fields = data.read(entry_payload + 4, id_size + 6)
+            item_id = int.from_bytes(fields[:id_size], "big")
+
+            if fields[id_size + 2 :] == b"Exif":
+                return item_id
+
+    return None
+
+
+def _heif_item_extents(data, start, end, item_id):
+    """(offset, length) file extents of an item, from the ``iloc`` box"""
+    for kind, payload, _ in _boxes(data, start, end):
+        if kind != b"iloc":
+            continue
+
+        version = data.read(payload, 1)[0]
+        sizes = data.read(payload + 4, 2)
+        offset_size, length_size = sizes[0] >> 4, sizes[0] & 0x0F
+        base_offset_size = sizes[1] >> 4
+        index_size = sizes[1] & 0x0F if version else 0
+        id_size = 4 if version == 2 else 2
+
+        position = payload + 6
+        count = int.from_bytes(data.read(position, id_size), "big")
+        position += id_size
+
+        def number(size):
+            nonlocal position
+            value = int.from_bytes(data.read(position, size), "big")
+            position += size
+            return value
+
+        for _ in range(count):
+            current_id = number(id_size)
+            method = number(2) & 0x0F if version else 0
+            number(2)  # data_reference_index
+            base_offset = number(base_offset_size)
+            extents = []
+
+            for _ in range(number(2)):
+                number(index_size)
+                extents.append((base_offset + number(offset_size), number(length_size)))
+
+            if current_id == item_id:
+                if method != 0:
+                    raise _Unreadable("Exif item not stored at a file offset")
+                return extents
+
+    return None
+
+
+def _heif_exif(data):
+    """TIFF bytes of the Exif item of a HEIC/HEIF file, or None."""
+    for kind, payload, end in _boxes(data, 0, None):
+        if kind == b"mdat":
+            raise _Unreadable("no meta box before the media data")
+        if kind != b"meta":
+            continue
+
+        # ``meta`` is a full box: skip its version and flags.
+        item_id = _heif_exif_item(data, payload + 4, end)
+        if item_id is None:
+            return None
+
+        extents = _heif_item_extents(data, payload + 4, end, item_id)
+        if not extents:
+            return None
+
+        item = b"".join(data.read(offset, length) for offset, length in extents)
+        (tiff_offset,) = struct.unpack(">I", item[:4])
+        tiff = item[4 + tiff_offset :]
+
+        return tiff[6:] if tiff.startswith(b"Exif\x00\x00") else tiff
+
+    return None
+
+
+def _exif_from_header(data):
+    signature = data.read(0, 12)
+
+    if signature[:2] == b"\xff\xd8":
+        return _jpeg_exif(data)
+    if signature[4:8] == b"ftyp":
+        return _heif_exif(data)
+
+    raise _Unreadable("not a JPEG or HEIF file")
+
+
+def read_capture_datetime_ranged(read_range, read_all):
+    """Like ``read_capture_datetime``, reading only the header of the image.
+
+    Args:
+        read_range: Callable ``(start, end)`` returning those bytes of the
+            image (``end`` inclusive), or fewer past its end.
+        read_all: Callable returning the whole image, used when the header
+            cannot be read by ranges.
+    """
+    data = _RangedObject(read_range)
+
+    try:
+        tiff = _exif_from_header(data)
+    except (_Unreadable, struct.error, IndexError):
+        return read_capture_datetime(read_all())
+
+    if not tiff:
+        return None
+
+    try:
+        exif = Image.Exif()
+        exif.load(tiff)
+    except Exception:  # noqa: BLE001 - a bad image must never raise here
+        return None
+
+    return capture_datetime_from_exif(exif)
@@ -0,0 +1,89 @@
+"""Encode every rendition of a photo original from a single download.
+
+The thumbnail task fetches each original once and derives everything from
+that buffer: the EXIF capture time and one WebP per ``PHOTO_RENDITIONS``
+size. JPEG originals are decoded straight at a reduced scale
+(``Image.draft``) just large enough for the biggest rendition, instead of
+decoding all of a phone photo's pixels, and each smaller rendition is
+scaled down from the one before it.
+"""
+
+import io
+
+from PIL import Image, ImageOps
+
+from .keys import rendition_key_for
+from .metadata import capture_datetime_from_exif
+
+TINY = "tiny"
+THUMB = "thumb"
+DISPLAY = "display"
+
+WEBP_QUALITY = 80
+
+
+def _decode(raw, max_edge):
+    img = Image.open(io.BytesIO(raw))
+
+    try:
+        captured = capture_datetime_from_exif(img.getexif())
+    except Exception:  # noqa: BLE001 - unreadable EXIF must not stop thumbnails
+        captured = None
+
+    width, height = img.size
+    scale = max_edge / max(width, height)
+
+    if scale < 1:
+        # No-op for formats other than JPEG.
+        img.draft("RGB", (max(1, int(width * scale)), max(1, int(height * scale))))
+
+    return captured, ImageOps.exif_transpose(img).convert("RGB")
+
+
+def render_renditions(raw, sizes):
+    """
+    Decode an original once and encode a WebP for every requested size.
+
+    Args:
+        raw: Bytes of the original.
+        sizes: Dict of rendition name -> longest edge in pixels. Images are
+            never scaled up.
+
+    Returns:
+        Tuple of the EXIF capture time (or None) and a dict of rendition
+        name -> (WebP bytes, width, height).
+    """
+    captured, img = _decode(raw, max(sizes.values()))
+    rendered = {}
+
+    for name, edge in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        img.thumbnail((edge, edge))
+
+        buf = io.BytesIO()
+        img.save(buf, "WEBP", quality=WEBP_QUALITY)
+        rendered[name] = (buf.getvalue(), img.width, img.height)
+
+    return captured, rendered
+
+
+def upload_renditions(storage, original, rendered):
+    """Upload rendered renditions next to the original.
+
+    Returns the ``PhotoAdded.renditions`` value describing them.
+    """
+    renditions = {}
+
+    for name, (data, width, height) in rendered.items():
+        key = rendition_key_for(original, name)
+        storage.upload_bytes(key, data, "image/webp")
+        renditions[name] = {"key": key, "width": width, "height": height}
+
+    return renditions
+
+
+def rendition_key(photo, name):
+    """Key of a photo's rendition, or None when it was not generated."""
+    if name == THUMB and photo.thumbnail_key:
+        return photo.thumbnail_key
+
+    return (photo.renditions or {}).get(name, {}).get("key")
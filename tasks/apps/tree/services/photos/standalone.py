@@ -18,7 +18,7 @@ from django.db import IntegrityError, transaction
 from django.utils import timezone
 
 from ...models import PhotoAdded
-from ..journalling import process_journal_entry
+from ..journalling import submit_journal_entry
 from . import storage as photo_storage
 from .events import PhotoObjectMissingError, daily_thread, existing_event
 from .keys import photo_key, photo_key_belongs_to
@@ -76,7 +76,7 @@ def add_standalone_photo(
                 published=published or timezone.now(),
                 idempotency_key=idempotency_key,
             )
-            process_journal_entry(photo, story=None)
+            submit_journal_entry(photo, story=None)
     except IntegrityError:
         existing = existing_event(PhotoAdded, idempotency_key)
         if existing is not None:
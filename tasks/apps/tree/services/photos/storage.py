@@ -8,32 +8,149 @@ device-reachable host).
 
 This module is deliberately tiny — it is the seam that tests monkeypatch
 to avoid talking to a real bucket.
+
+Clients are built once per endpoint and process, and shared by all threads
+(botocore clients are thread-safe; building one is not cheap). Each keeps a
+pool of up to ``AWS_S3_MAX_POOL_CONNECTIONS`` connections. ``counts`` holds
+the process-wide number of clients built and of calls made by operation;
+``counting()`` collects them for one request or task.
+
+Presigned GET URLs are signed as of the start of a time bucket of
+``PHOTO_PRESIGN_GET_TTL - PHOTO_PRESIGN_GET_MARGIN`` seconds, so every
+render within a bucket hands out the same URL for an object (which the
+browser can cache), still valid for at least the margin. They are kept in
+a local cache until their bucket ends, so the pages listing many photos
+don't sign each one on every render.
 """
 
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
 from django.conf import settings
 
 import boto3
+import botocore.auth
+from botocore.auth import SIGV4_TIMESTAMP, S3SigV4QueryAuth
 from botocore.client import Config
 from botocore.exceptions import ClientError
 
+# Signature version of the clients signing bucketed GET URLs; botocore
+# looks up its presigning class under the "-query" suffixed name.
+BUCKETED = "s3v4-bucketed"
+
+URL_CACHE_SIZE = 10000
+
+counts = Counter()
+
+_current_counts = ContextVar("photo_storage_counts", default=None)
+
+_counts_lock = threading.Lock()
+
+_clients = {}
+
+_clients_lock = threading.Lock()
+
+_urls = {}
+
+_urls_lock = threading.Lock()
+
+
+def _count(name):
+    with _counts_lock:
+        counts[name] += 1
+
+    current = _current_counts.get()
+    if current is not None:
+        current[name] += 1
+
+
+@contextmanager
+def counting():
+    """Count the clients built and calls made in this block.
 
-def _config():
+    Yields a Counter keyed like ``counts``.
+    """
+    current = Counter()
+    token = _current_counts.set(current)
+    try:
+        yield current
+    finally:
+        _current_counts.reset(token)
+
+
+def _signing_bucket():
+    """Index and length in seconds of the current signing bucket"""
+    length = max(1, settings.PHOTO_PRESIGN_GET_TTL - settings.PHOTO_PRESIGN_GET_MARGIN)
+    return int(time.time() // length), length
+
+
+class _BucketedQueryAuth(S3SigV4QueryAuth):
+    """Query string SigV4 signing dated to the start of the signing bucket"""
+
+    def _modify_request_before_signing(self, request):
+        bucket, length = _signing_bucket()
+        signed_at = datetime.fromtimestamp(bucket * length, dt_timezone.utc)
+        request.context["timestamp"] = signed_at.strftime(SIGV4_TIMESTAMP)
+
+        super()._modify_request_before_signing(request)
+
+
+botocore.auth.AUTH_TYPE_MAPS[f"{BUCKETED}-query"] = _BucketedQueryAuth
+
+
+def _config(signature_version):
     return Config(
-        signature_version="s3v4",
+        signature_version=signature_version,
         s3={"addressing_style": settings.AWS_S3_ADDRESSING_STYLE},
+        max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS,
     )
 
 
-def _client(endpoint_url):
-    return boto3.client(
-        "s3",
-        endpoint_url=endpoint_url or None,
-        region_name=settings.AWS_S3_REGION_NAME,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        config=_config(),
+def _client(endpoint_url, signature_version="s3v4"):
+    key = (
+        endpoint_url or None,
+        signature_version,
+        settings.AWS_S3_REGION_NAME,
+        settings.AWS_ACCESS_KEY_ID,
+        settings.AWS_SECRET_ACCESS_KEY,
+        settings.AWS_S3_ADDRESSING_STYLE,
+        settings.AWS_S3_MAX_POOL_CONNECTIONS,
     )
 
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        if key not in _clients:
+            # A session per client: the default boto3 session isn't safe to
+            # build clients from concurrently.
+            _clients[key] = boto3.session.Session().client(
+                "s3",
+                endpoint_url=endpoint_url or None,
+                region_name=settings.AWS_S3_REGION_NAME,
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                config=_config(signature_version),
+            )
+            _count("clients")
+
+        return _clients[key]
+
+
+def reset_clients():
+    """Drop the cached clients and URLs, e.g. after changing credentials."""
+    with _clients_lock:
+        _clients.clear()
+
+    with _urls_lock:
+        _urls.clear()
+
 
 def _internal_client():
     return _client(settings.AWS_S3_ENDPOINT_URL)
@@ -50,6 +167,7 @@ def _web_client():
 def presign_put(key, content_type, expires=None):
     """Presigned PUT URL the client uses to upload the original directly."""
     expires = expires if expires is not None else settings.PHOTO_PRESIGN_PUT_TTL
+    _count("presign_put")
     return _public_client().generate_presigned_url(
         "put_object",
         Params={
@@ -71,6 +189,7 @@ def presign_put_web(key, content_type, expires=None):
     real bucket host, so the two functions produce equivalent URLs.
     """
     expires = expires if expires is not None else settings.PHOTO_PRESIGN_PUT_TTL
+    _count("presign_put")
     return _web_client().generate_presigned_url(
         "put_object",
         Params={
@@ -82,15 +201,45 @@ def presign_put_web(key, content_type, expires=None):
     )
 
 
-def presign_get(key, expires=None):
-    """Short-lived presigned GET URL for displaying an object."""
-    expires = expires if expires is not None else settings.PHOTO_PRESIGN_GET_TTL
-    return _public_client().generate_presigned_url(
-        "get_object",
-        Params={"Bucket": settings.AWS_S3_BUCKET, "Key": key},
-        ExpiresIn=expires,
+def _presign_get(endpoint_url, key, expires):
+    params = {"Bucket": settings.AWS_S3_BUCKET, "Key": key}
+
+    if expires is not None:
+        _count("presign_get")
+        return _client(endpoint_url).generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=expires
+        )
+
+    bucket, _ = _signing_bucket()
+    cache_key = (endpoint_url or None, key)
+    cached = _urls.get(cache_key)
+
+    if cached is not None and cached[0] >= bucket:
+        _count("presign_get_cached")
+        return cached[1]
+
+    _count("presign_get")
+    url = _client(endpoint_url, BUCKETED).generate_presigned_url(
+        "get_object", Params=params, ExpiresIn=settings.PHOTO_PRESIGN_GET_TTL
     )
 
+    with _urls_lock:
+        if len(_urls) >= URL_CACHE_SIZE:
+            _urls.clear()
+
+        _urls[cache_key] = (bucket, url)
+
+    return url
+
+
+def presign_get(key, expires=None):
+    """Short-lived presigned GET URL for displaying an object.
+
+    Without ``expires`` the URL is the bucketed one (see above), valid for at
+    least ``PHOTO_PRESIGN_GET_MARGIN`` seconds.
+    """
+    return _presign_get(settings.AWS_S3_PUBLIC_ENDPOINT_URL, key, expires)
+
 
 def presign_get_web(key, expires=None):
     """Presigned GET URL whose signed host is reachable from a desktop browser.
@@ -101,16 +250,12 @@ def presign_get_web(key, expires=None):
     the URL cannot be rewritten after signing. In prod both endpoints are the
     real bucket host, so the two functions produce equivalent URLs.
     """
-    expires = expires if expires is not None else settings.PHOTO_PRESIGN_GET_TTL
-    return _web_client().generate_presigned_url(
-        "get_object",
-        Params={"Bucket": settings.AWS_S3_BUCKET, "Key": key},
-        ExpiresIn=expires,
-    )
+    return _presign_get(settings.AWS_S3_WEB_ENDPOINT_URL, key, expires)
 
 
 def object_exists(key):
     """True if the object exists in the bucket."""
+    _count("head_object")
     try:
         _internal_client().head_object(Bucket=settings.AWS_S3_BUCKET, Key=key)
         return True
@@ -120,12 +265,44 @@ def object_exists(key):
         raise
 
 
+def list_keys(prefix):
+    """Keys of every object under a prefix (one call per 1000 objects)."""
+    paginator = _internal_client().get_paginator("list_objects_v2")
+    keys = set()
+
+    for page in paginator.paginate(Bucket=settings.AWS_S3_BUCKET, Prefix=prefix):
+        _count("list_objects")
+        keys.update(obj["Key"] for obj in page.get("Contents", []))
+
+    return keys
+
+
 def download_bytes(key):
+    _count("get_object")
     obj = _internal_client().get_object(Bucket=settings.AWS_S3_BUCKET, Key=key)
     return obj["Body"].read()
 
 
+def download_range(key, start, end):
+    """Bytes ``start`` to ``end`` (inclusive) of an object.
+
+    Fewer bytes come back when the object ends before ``end``, none when it
+    ends before ``start``.
+    """
+    _count("get_object")
+    try:
+        obj = _internal_client().get_object(
+            Bucket=settings.AWS_S3_BUCKET, Key=key, Range=f"bytes={start}-{end}"
+        )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "InvalidRange":
+            return b""
+        raise
+    return obj["Body"].read()
+
+
 def upload_bytes(key, data, content_type):
+    _count("put_object")
     _internal_client().put_object(
         Bucket=settings.AWS_S3_BUCKET,
         Key=key,
@@ -0,0 +1,169 @@
+"""
+Full-text search documents for observations, insights and journal entries.
+
+Every searchable object has one SearchDocument row, rewritten when the object
+is saved. On PostgreSQL the row's tsvector is stored alongside it, so queries
+match against a GIN index instead of vectorising the source tables.
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ...models import (
+    InsightRefined,
+    JournalAdded,
+    Observation,
+    ObservationClosed,
+    SearchDocument,
+)
+
+SEARCHABLE_MODELS = {
+    Observation: SearchDocument.Kind.OBSERVATION,
+    ObservationClosed: SearchDocument.Kind.OBSERVATION_CLOSED,
+    InsightRefined: SearchDocument.Kind.INSIGHT,
+    JournalAdded: SearchDocument.Kind.JOURNAL,
+}
+
+
+def _join(*parts):
+    return "\n".join(part for part in parts if part)
+
+
+def document_kind(instance):
+    """Return the SearchDocument kind of an instance, or None if not searchable."""
+    for model, kind in SEARCHABLE_MODELS.items():
+        if isinstance(instance, model):
+            return kind
+
+    return None
+
+
+def build_document(instance):
+    """
+    Build the unsaved SearchDocument of a searchable instance.
+
+    Situations and journal comments make up the title, which ranks above the
+    remaining text.
+    """
+    kind = document_kind(instance)
+
+    if kind == SearchDocument.Kind.OBSERVATION:
+        pub_date = instance.pub_date
+    else:
+        pub_date = timezone.localdate(instance.published)
+
+    if kind == SearchDocument.Kind.JOURNAL:
+        title, text = instance.comment, ""
+    elif kind == SearchDocument.Kind.INSIGHT:
+        title, text = instance.situation, instance.approach
+    else:
+        title = instance.situation
+        text = _join(instance.interpretation, instance.approach)
+
+    return SearchDocument(
+        kind=kind,
+        object_id=instance.pk,
+        event_stream_id=instance.event_stream_id,
+        pub_date=pub_date,
+        title=title or "",
+        text=text or "",
+    )
+
+
+def vectorize_documents(documents):
+    """
+    Store the tsvector of the given SearchDocument queryset.
+
+    The stored vector is PostgreSQL-only; on other databases the rows keep
+    their text and no vector.
+    """
+    if connection.vendor != "postgresql":
+        return
+
+    documents.update(
+        document=SearchVector("title", weight="A") + SearchVector("text", weight="B")
+    )
+
+
+def index_document(instance):
+    """Write (or rewrite) the SearchDocument of a saved searchable instance."""
+    document = build_document(instance)
+
+    with transaction.atomic():
+        document, _ = SearchDocument.objects.update_or_create(
+            kind=document.kind,
+            object_id=document.object_id,
+            defaults={
+                "event_stream_id": document.event_stream_id,
+                "pub_date": document.pub_date,
+                "title": document.title,
+                "text": document.text,
+            },
+        )
+
+        vectorize_documents(SearchDocument.objects.filter(pk=document.pk))
+
+
+def index_new_documents(instances):
+    """Write the SearchDocuments of bulk-created searchable instances."""
+    documents = [build_document(instance) for instance in instances]
+
+    with transaction.atomic():
+        documents = SearchDocument.objects.bulk_create(documents, batch_size=1000)
+        vectorize_documents(
+            SearchDocument.objects.filter(
+                pk__in=[document.pk for document in documents]
+            )
+        )
+
+
+def remove_document(instance):
+    """Delete the SearchDocument of a deleted searchable instance."""
+    SearchDocument.objects.filter(
+        kind=document_kind(instance), object_id=instance.pk
+    ).delete()
+
+
+def rebuild_search_documents():
+    """
+    Rebuild every SearchDocument from the searchable tables.
+
+    Returns:
+        Number of documents written.
+    """
+    documents = [
+        build_document(instance)
+        for model in SEARCHABLE_MODELS
+        for instance in model.objects.all().iterator()
+    ]
+
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        SearchDocument.objects.bulk_create(documents, batch_size=1000)
+        vectorize_documents(SearchDocument.objects.all())
+
+    return len(documents)
+
+
+def search_documents(query, kinds=None):
+    """
+    Return SearchDocuments matching a query, best first.
+
+    Each document is annotated with ``rank``. PostgreSQL only.
+
+    Args:
+        query: The user's search text.
+        kinds: Optional iterable of SearchDocument.Kind values to restrict to.
+    """
+    search_query = SearchQuery(query)
+
+    documents = SearchDocument.objects.filter(document=search_query)
+
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+
+    return documents.annotate(rank=SearchRank(F("document"), search_query)).order_by(
+        "-rank", "-pub_date"
+    )
@@ -0,0 +1,605 @@
+"""
+Bulk generation of synthetic data shaped like a long-lived installation.
+
+Generates years of journal entries with ``[x]``/``#habit`` lines and the
+HabitTracked events and reflections their processing would create, plans,
+observation streams with recontextualizations and attach/detach churn,
+closed observations and insights, boards with deeply nested state and their
+weekly commits, and trips with notes and photos.
+
+Rows are written with bulk inserts instead of save(), so no signals run.
+Everything the signals would set on a row (event_stream_id, word_count,
+polymorphic_ctype) is set here, and the read models maintained by signals
+are rebuilt once at the end. The same seed, scale and end date always
+generate the same data.
+
+Days that already have a plan or a reflection keep them: running again over
+the same dates adds events, but never a second Plan or Reflection of a day.
+"""
+
+import datetime
+import random
+import uuid
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from ...board_operations import create_task_item
+from ...models import (
+    Board,
+    BoardCommitted,
+    Habit,
+    HabitKeyword,
+    HabitTracked,
+    InsightRefined,
+    JournalAdded,
+    JournalTag,
+    Observation,
+    ObservationAttached,
+    ObservationClosed,
+    ObservationDetached,
+    ObservationMade,
+    ObservationRecontextualized,
+    ObservationReflectedUpon,
+    ObservationReinterpreted,
+    ObservationType,
+    ObservationUpdated,
+    PhotoAdded,
+    Plan,
+    Profile,
+    Reflection,
+    Story,
+    StoryEvent,
+    Thread,
+)
+from ...utils.db import bulk_create_inherited
+from ...utils.event_streams import rebuild_stream_heads
+from ...utils.habit_calendar import rebuild_habit_day_counts
+from ...utils.statistics import (
+    count_words,
+    rebuild_event_counts,
+    update_all_word_count_statistics,
+)
+from ...uuid_generators import (
+    board_event_stream_id_from_thread,
+    journal_added_event_stream_id,
+)
+from ..boards.metrics import board_metrics
+from ..journalling.habit_extraction import habits_line_to_habits_tracked
+from ..journalling.reflection_extraction import extract_reflection_lines
+from ..observations.attachments import rebuild_attachment_projections
+from ..photos.keys import thumbnail_key_for
+from ..search.documents import rebuild_search_documents
+
+WORDS = (
+    "morning walk coffee meeting review plan write code read book call family "
+    "focus tired energy rain garden train project deadline idea notes gym run "
+    "dinner friends quiet evening sleep early late habit progress blocked "
+    "release bug email lunch music doctor weekend trip city beach mountain"
+).split()
+
+THREADS = ["Daily", "Weekly", "big-picture"]
+
+TAGS = ["work", "family", "health", "ideas", "travel", "money", "books", "people"]
+
+OBSERVATION_TYPES = ["observation", "feeling", "pattern", "trigger"]
+
+# (name, keyword) of the generated habits
+HABITS = [
+    ("Running", "running"),
+    ("Meditation", "meditation"),
+    ("Reading", "reading"),
+    ("Journaling", "journaling"),
+    ("Stretching", "stretching"),
+    ("Cold shower", "coldshower"),
+    ("Walking", "walking"),
+    ("Swimming", "swimming"),
+    ("Guitar", "guitar"),
+    ("Language", "language"),
+    ("Cooking", "cooking"),
+    ("Gym", "gym"),
+    ("Sweets", "sweets"),
+    ("Smoking", "smoking"),
+    ("Sleep early", "sleepearly"),
+    ("Water", "water"),
+]
+
+# Expected number of rows per day at scale 1
+DAILY_JOURNALS = 5
+OTHER_JOURNALS = 1
+OBSERVATIONS = 0.4
+TRIPS = 4
+
+# Pending events are inserted once there are this many
+FLUSH_EVERY = 20000
+
+
+class SyntheticDataset:
+    """
+    Generator of one user's synthetic history.
+
+    Args:
+        user: Owner of the observations and trips.
+        seed: Seed of the random generator.
+        scale: Multiplier for the number of rows per day; 1.0 gives about
+            five thousand events a year.
+        years: Length of the generated history.
+        end: Last generated day, today by default.
+    """
+
+    def __init__(self, user, seed=0, scale=1.0, years=3, end=None):
+        self.rng = random.Random(seed)
+        self.user = user
+        self.scale = scale
+        self.end = end or timezone.localdate()
+        self.days = [
+            self.end - datetime.timedelta(days=offset)
+            for offset in reversed(range(int(365 * years)))
+        ]
+
+        self.counts = Counter()
+        self.pending = defaultdict(list)
+        self.pending_tags = []
+        self.pending_story_events = []
+
+    # Randomness
+
+    def _uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _scaled(self, mean):
+        """A whole number of rows averaging ``mean * scale``."""
+        expected = mean * self.scale
+        whole = int(expected)
+
+        return whole + (self.rng.random() < expected - whole)
+
+    def _sentence(self, words=12):
+        text = " ".join(self.rng.choice(WORDS) for _ in range(words))
+
+        return text.capitalize() + "."
+
+    def _at(self, day):
+        return timezone.make_aware(
+            datetime.datetime.combine(day, datetime.time(self.rng.randrange(6, 24)))
+            + datetime.timedelta(minutes=self.rng.randrange(60))
+        )
+
+    def _later(self, published, days=30):
+        return published + datetime.timedelta(
+            minutes=self.rng.randrange(1, days * 24 * 60)
+        )
+
+    # Writing
+
+    def _add(self, event):
+        event.word_count = count_words(event)
+        self.pending[type(event)].append(event)
+
+        if sum(map(len, self.pending.values())) >= FLUSH_EVERY:
+            self.flush()
+
+        return event
+
+    def flush(self):
+        """Insert the pending events and the rows that link to them."""
+        for model, events in self.pending.items():
+            bulk_create_inherited(model, events)
+            self.counts[model.__name__] += len(events)
+
+        self.pending.clear()
+
+        JournalTag.journals.through.objects.bulk_create(
+            JournalTag.journals.through(journaltag=tag, journaladded=journal)
+            for journal, tag in self.pending_tags
+        )
+        StoryEvent.objects.bulk_create(
+            StoryEvent(story=story, event=event)
+            for story, event in self.pending_story_events
+        )
+
+        self.pending_tags.clear()
+        self.pending_story_events.clear()
+
+    # Fixtures shared by all generated rows
+
+    def _setup(self):
+        self.threads = {
+            name: Thread.objects.get_or_create(name=name)[0] for name in THREADS
+        }
+        self.daily = self.threads["Daily"]
+
+        Profile.objects.get_or_create(
+            user=self.user, defaults={"default_board_thread": self.daily}
+        )
+
+        self.tags = [
+            JournalTag.objects.get_or_create(
+                slug=slug, defaults={"name": slug.capitalize()}
+            )[0]
+            for slug in TAGS
+        ]
+        self.types = [
+            ObservationType.objects.get_or_create(
+                slug=slug, defaults={"name": slug.capitalize()}
+            )[0]
+            for slug in OBSERVATION_TYPES
+        ]
+
+        for name, keyword in HABITS:
+            habit, _ = Habit.objects.get_or_create(
+                slug=keyword,
+                defaults={"name": name, "event_stream_id": self._uuid()},
+            )
+            HabitKeyword.objects.get_or_create(habit=habit, keyword=keyword)
+
+        self.habits = list(Habit.objects.prefetch_related("keywords"))
+        self.keywords = [keyword for _, keyword in HABITS]
+
+    # Journal, habits, plans and reflections
+
+    def _journal_comment(self):
+        lines = [self._sentence(self.rng.randrange(5, 40))]
+
+        if self.rng.random() < 0.5:
+            lines.append(
+                " ".join(
+                    self.rng.choice("#!") + keyword + " " + self._sentence(2)
+                    for keyword in self.rng.sample(
+                        self.keywords, self.rng.randrange(1, 4)
+                    )
+                )
+            )
+
+        for prefix in ("[x] ", "[~] ", "[^] "):
+            if self.rng.random() < 0.2:
+                lines.append(prefix + self._sentence(5))
+
+        return "\n".join(lines)
+
+    def _journal(self, day, thread, comment, story=None):
+        journal = self._add(
+            JournalAdded(
+                published=self._at(day),
+                thread=thread,
+                event_stream_id=journal_added_event_stream_id(thread),
+                comment=comment,
+            )
+        )
+
+        if self.rng.random() < 0.3:
+            self.pending_tags.append((journal, self.rng.choice(self.tags)))
+
+        if story is not None:
+            self.pending_story_events.append((story, journal))
+
+        return journal
+
+    def _day(self, day):
+        """Journal entries of a day and what processing them would create."""
+        reflection = defaultdict(list)
+
+        for _ in range(self._scaled(DAILY_JOURNALS)):
+            journal = self._journal(day, self.daily, self._journal_comment())
+
+            for field, line in extract_reflection_lines(journal.comment):
+                reflection[field].append(line)
+
+            for occured, habit, note in habits_line_to_habits_tracked(
+                journal.comment, self.habits
+            ):
+                self._add(
+                    HabitTracked(
+                        published=journal.published,
+                        thread=self.daily,
+                        event_stream_id=habit.event_stream_id,
+                        habit=habit,
+                        occured=occured,
+                        note=note,
+                    )
+                )
+
+        for _ in range(self._scaled(OTHER_JOURNALS)):
+            thread = self.rng.choice(
+                [self.threads["Weekly"], self.threads["big-picture"]]
+            )
+            self._journal(day, thread, self._sentence(self.rng.randrange(10, 80)))
+
+        plan = Plan(pub_date=day, thread=self.daily, focus=self._sentence(6))
+        plan.word_count = count_words(plan)
+
+        return plan, Reflection(
+            pub_date=day,
+            thread=self.daily,
+            **{field: "\n".join(lines) for field, lines in reflection.items()},
+        )
+
+    def _days_with(self, model):
+        return set(
+            model.objects.filter(
+                thread=self.daily, pub_date__range=(self.days[0], self.days[-1])
+            ).values_list("pub_date", flat=True)
+        )
+
+    def generate_journal(self):
+        planned, reflected = self._days_with(Plan), self._days_with(Reflection)
+        plans, reflections = [], []
+
+        for day in self.days:
+            # Drawn for every day so that the draws that follow do not
+            # depend on what the database already holds
+            plan, reflection = self._day(day)
+
+            if day not in planned:
+                plans.append(plan)
+
+            if day not in reflected:
+                reflections.append(reflection)
+
+        Plan.objects.bulk_create(plans, batch_size=1000)
+        Reflection.objects.bulk_create(reflections, batch_size=1000)
+
+        self.counts["Plan"] += len(plans)
+        self.counts["Reflection"] += len(reflections)
+
+    # Observations
+
+    def _observation_stream(self, day):
+        """
+        Events of one observation, from ObservationMade on.
+
+        Returns:
+            Tuple of the unsaved Observation, or None once it is closed, its
+            ObservationUpdated events and the time of its last event.
+        """
+        thread = self.rng.choice([self.daily, self.threads["big-picture"]])
+        observation = Observation(
+            pub_date=day,
+            user=self.user,
+            thread=thread,
+            type=self.rng.choice(self.types),
+            event_stream_id=self._uuid(),
+            situation=self._sentence(),
+            interpretation=self._sentence(),
+            approach=self._sentence(),
+        )
+
+        published = self._at(day)
+        self._add(ObservationMade.from_observation(observation, published))
+
+        changes = [
+            ("situation", ObservationRecontextualized),
+            ("interpretation", ObservationReinterpreted),
+            ("approach", ObservationReflectedUpon),
+        ]
+
+        for _ in range(self.rng.randrange(5)):
+            field, model = self.rng.choice(changes)
+            old = getattr(observation, field)
+            setattr(observation, field, self._sentence())
+            published = self._later(published)
+            self._add(model.from_observation(observation, old, published))
+
+        updates = []
+
+        for _ in range(self.rng.randrange(6)):
+            published = self._later(published, days=10)
+            updates.append(
+                ObservationUpdated(
+                    published=published,
+                    thread=thread,
+                    event_stream_id=observation.event_stream_id,
+                    comment=self._sentence(),
+                )
+            )
+
+        if self.rng.random() < 0.6:
+            return observation, updates, published
+
+        closed = self._add(
+            ObservationClosed.from_observation(
+                observation, self._later(published, days=60)
+            )
+        )
+
+        if self.rng.random() < 0.5:
+            self._add(
+                InsightRefined.from_observation_closed(
+                    closed, published=self._later(closed.published)
+                )
+            )
+
+        # Closing deletes the Observation; its updates stay, unlinked
+        for update in updates:
+            self._add(update)
+
+        return None, updates, closed.published
+
+    def generate_observations(self):
+        streams = [
+            self._observation_stream(day)
+            for day in self.days
+            for _ in range(self._scaled(OBSERVATIONS))
+        ]
+        open_streams = [
+            (observation, updates, published)
+            for observation, updates, published in streams
+            if observation is not None
+        ]
+
+        Observation.objects.bulk_create(
+            [observation for observation, _, _ in open_streams], batch_size=1000
+        )
+        self.counts["Observation"] += len(open_streams)
+
+        for observation, updates, _ in open_streams:
+            for update in updates:
+                update.observation = observation
+                self._add(update)
+
+        self._attachment_churn(
+            [(observation, published) for observation, _, published in open_streams]
+        )
+
+    def _attachment_churn(self, observations):
+        """Complex observations attach others, and detach some again.
+
+        Args:
+            observations: (Observation, time of its last event) pairs.
+        """
+        if len(observations) < 2:
+            return
+
+        for observation, published in self.rng.sample(
+            observations, len(observations) // 5
+        ):
+            others = self.rng.sample(observations, self.rng.randrange(1, 5))
+
+            for other, other_published in others:
+                if other is observation:
+                    continue
+
+                attached = self._later(max(published, other_published))
+                stream = {
+                    "thread": observation.thread,
+                    "event_stream_id": observation.event_stream_id,
+                    "other_event_stream_id": other.event_stream_id,
+                }
+                self._add(ObservationAttached(published=attached, **stream))
+
+                if self.rng.random() < 0.3:
+                    self._add(
+                        ObservationDetached(published=self._later(attached), **stream)
+                    )
+
+    # Boards
+
+    def _task_tree(self, depth):
+        item = create_task_item(self._sentence(self.rng.randrange(2, 8)))
+        markers = item["data"]["meaningfulMarkers"]
+        markers["weeksInList"] = self.rng.randrange(10)
+        markers["important"] = self.rng.random() < 0.1
+        markers["postponedFor"] = self.rng.choice([0, 0, 0, 1, 2, 4])
+        markers["madeProgress"] = self.rng.random() < 0.3
+
+        if self.rng.random() < 0.3:
+            item["data"]["state"] = "checked"
+
+        if depth > 1 and self.rng.random() < 0.3:
+            item["children"] = [
+                self._task_tree(depth - 1) for _ in range(self.rng.randrange(1, 6))
+            ]
+
+        return item
+
+    def _board_state(self):
+        return [self._task_tree(depth=4) for _ in range(self.rng.randrange(30, 60))]
+
+    def generate_boards(self):
+        for thread in self.threads.values():
+            # Drawn even for existing boards so that the draws that follow
+            # do not depend on what the database already holds
+            state = self._board_state()
+
+            if Board.objects.get_or_create(thread=thread, defaults={"state": state})[1]:
+                self.counts["Board"] += 1
+
+            for day in self.days[::7]:
+                before = self._board_state()
+                self._add(
+                    BoardCommitted(
+                        published=self._at(day),
+                        thread=thread,
+                        event_stream_id=board_event_stream_id_from_thread(thread),
+                        focus=self._sentence(3),
+                        before=before,
+                        after=[
+                            item
+                            for item in before
+                            if item["data"]["state"] != "checked"
+                        ],
+                        metrics=board_metrics(before),
+                        date_started=self._at(day - datetime.timedelta(days=7)),
+                    )
+                )
+
+    # Trips
+
+    def _trip_entries(self, story, days):
+        for _ in range(self.rng.randrange(10, 60)):
+            day = self.rng.choice(days)
+
+            if self.rng.random() < 0.3:
+                original = f"trips/{self.user.pk}/{story.pk}/{self._uuid()}.jpg"
+                photo = self._add(
+                    PhotoAdded(
+                        published=self._at(day),
+                        thread=self.daily,
+                        event_stream_id=journal_added_event_stream_id(self.daily),
+                        comment=self._sentence(self.rng.randrange(8)),
+                        original_key=original,
+                        thumbnail_key=thumbnail_key_for(original),
+                        content_type="image/jpeg",
+                        width=4032,
+                        height=3024,
+                    )
+                )
+                self.pending_story_events.append((story, photo))
+            else:
+                self._journal(day, self.daily, self._sentence(20), story=story)
+
+    def generate_trips(self):
+        trips = []
+        count = max(1, round(TRIPS * self.scale * len(self.days) / 365))
+
+        for index in sorted(self.rng.sample(range(len(self.days) - 10), count)):
+            length = self.rng.randrange(2, 10)
+            trips.append(
+                (
+                    Story(
+                        user=self.user,
+                        title=f"Trip {len(trips) + 1}",
+                        started=self._at(self.days[index]),
+                        stopped=self._at(self.days[index + length]),
+                    ),
+                    self.days[index : index + length + 1],
+                )
+            )
+
+        Story.objects.bulk_create([story for story, _ in trips], batch_size=1000)
+        self.counts["Story"] += len(trips)
+
+        for story, days in trips:
+            self._trip_entries(story, days)
+
+    # Read models
+
+    def rebuild_read_models(self):
+        """Rebuild what the signals would have kept current."""
+        update_all_word_count_statistics()
+        rebuild_event_counts()
+        rebuild_stream_heads()
+        rebuild_habit_day_counts()
+        rebuild_attachment_projections()
+        rebuild_search_documents()
+
+    @transaction.atomic
+    def generate(self):
+        """
+        Generate the whole dataset and rebuild the read models.
+
+        Returns:
+            Counter of generated rows by model name.
+        """
+        self._setup()
+
+        self.generate_journal()
+        self.generate_observations()
+        self.generate_boards()
+        self.generate_trips()
+        self.flush()
+
+        self.rebuild_read_models()
+
+        return self.counts
@@ -0,0 +1,117 @@
+"""Text lookups into a Board.state tree through a cached index.
+
+The Android Today endpoints find tasks on the current board by their text.
+Instead of searching the whole tree on every call, each board version gets
+an index mapping every text to the path of indices leading to its first
+node in ``board_tree.find_task_by_text`` order. The index is cached under
+the board's pk and ``version``, which every save replaces, so a write
+through any other path makes the next lookup rebuild it.
+
+Operations that only append tasks or flip their state keep the index
+current and cache it for the version they save; ones that rename or
+remove nodes drop it.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+
+from ..boards.versions import save_if_unchanged
+from . import board_tree
+
+TIMEOUT = 60 * 60 * 24
+
+
+def _cache_key(board):
+    return f"board-task-index:{board.pk}:{board.version}"
+
+
+def build_index(state):
+    """Map every node text to the path of its first node, in search order"""
+    index = {}
+
+    def walk(nodes, path):
+        for position, node in enumerate(nodes):
+            node_path = path + (position,)
+            index.setdefault(board_tree._node_text(node), node_path)
+            walk(node.get("children") or [], node_path)
+
+    walk(state, ())
+
+    return index
+
+
+def _index(board):
+    if "_task_index" not in board.__dict__:
+        index = cache.get(_cache_key(board))
+
+        if index is None:
+            index = build_index(board.state)
+            cache.set(_cache_key(board), index, TIMEOUT)
+
+        board.__dict__["_task_index"] = index
+
+    return board.__dict__["_task_index"]
+
+
+def _resolve(state, path):
+    parent_list = state
+
+    for depth, position in enumerate(path):
+        if position >= len(parent_list):
+            return None
+
+        if depth == len(path) - 1:
+            return parent_list, position, parent_list[position]
+
+        parent_list = parent_list[position].get("children") or []
+
+    return None
+
+
+def find_task(board, text):
+    """Like ``board_tree.find_task_by_text`` on ``board.state``, through the index.
+
+    Returns ``(parent_list, index, node)`` on a hit, ``None`` otherwise.
+    """
+    path = _index(board).get(text)
+
+    if path is None:
+        return None
+
+    hit = _resolve(board.state, path)
+
+    if hit is None or board_tree._node_text(hit[2]) != text:
+        # The tree was changed in memory behind the index's back
+        forget_index(board)
+        return board_tree.find_task_by_text(board.state, text)
+
+    return hit
+
+
+def append_task(board, text):
+    """Append a task at the root of the board and record it in the index"""
+    node = board_tree.append_task_at_root(board.state, text)
+    _index(board).setdefault(text, (len(board.state) - 1,))
+
+    return node
+
+
+def forget_index(board):
+    """Drop the index after moving or renaming nodes of the board"""
+    board.__dict__.pop("_task_index", None)
+
+
+def save_board(board):
+    """Save only the board's state, caching the index for the new version.
+
+    Raises BoardVersionConflict if the board was saved since it was read.
+    The index is cached once the transaction commits, so a rolled back
+    save never leaves one behind.
+    """
+    save_if_unchanged(board, ["state"])
+
+    index = board.__dict__.get("_task_index")
+
+    if index is not None:
+        key = _cache_key(board)
+        transaction.on_commit(lambda: cache.set(key, index, TIMEOUT))
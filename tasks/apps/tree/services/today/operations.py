@@ -2,7 +2,9 @@
 
 Each public operation is wrapped in ``transaction.atomic`` so that the
 multi-record write (Board JSON + Plan.focus + Reflection.good) either all
-commits or none of it does.
+commits or none of it does. Operations that write the board run again
+from the start when the board was saved concurrently (see
+``services.boards.versions``).
 """
 
 from dataclasses import dataclass
@@ -22,8 +24,9 @@ from ...models import (
     StoryEvent,
     Thread,
 )
+from ..boards.versions import retry_on_conflict
 from ..trips.operations import StoryNotFoundError, StoryStoppedError
-from . import board_tree, text_lines
+from . import board_index, board_tree, text_lines
 from .progress import parse_progress, render_progress
 
 
@@ -189,6 +192,7 @@ def list_board_items(user):
     return _flatten_board(board.state, 0, [])
 
 
+@retry_on_conflict
 @transaction.atomic
 def add_task(user, text, today=None):
     """Ensure the task exists on the board (root-level append if missing)
@@ -197,9 +201,9 @@ def add_task(user, text, today=None):
     pub_date = _today(today)
     board = _current_board(user)
 
-    if board_tree.find_task_by_text(board.state, text) is None:
-        board_tree.append_task_at_root(board.state, text)
-        board.save()
+    if board_index.find_task(board, text) is None:
+        board_index.append_task(board, text)
+        board_index.save_board(board)
 
     daily = _daily_thread()
     plan, _created = Plan.objects.get_or_create(pub_date=pub_date, thread=daily)
@@ -209,6 +213,7 @@ def add_task(user, text, today=None):
         plan.save()
 
 
+@retry_on_conflict
 @transaction.atomic
 def set_task_done(
     user, text, done, today=None, note=None, published=None, story_id=None
@@ -241,16 +246,16 @@ def _set_task_done_boolean(user, text, done, today, note, published, story=None)
     board = _current_board(user)
 
     new_node_state = "done" if done else "open"
-    hit = board_tree.find_task_by_text(board.state, text)
+    hit = board_index.find_task(board, text)
     if hit is None:
-        node = board_tree.append_task_at_root(board.state, text)
+        node = board_index.append_task(board, text)
         board_tree.set_state(node, new_node_state)
-        board.save()
+        board_index.save_board(board)
     else:
         _, _, node = hit
         if board_tree.get_state(node) != new_node_state:
             board_tree.set_state(node, new_node_state)
-            board.save()
+            board_index.save_board(board)
 
     daily = _daily_thread()
     reflection, _created = Reflection.objects.get_or_create(
@@ -300,14 +305,15 @@ def _set_task_done_progress(
     done_after = next_current >= progress.total
 
     board = _current_board(user)
-    hit = board_tree.find_task_by_text(board.state, text)
+    hit = board_index.find_task(board, text)
     if hit is None:
-        node = board_tree.append_task_at_root(board.state, new_text)
+        node = board_index.append_task(board, new_text)
     else:
         _, _, node = hit
         board_tree.rename(node, new_text)
+        board_index.forget_index(board)
     board_tree.set_state(node, "done" if done_after else "open")
-    board.save()
+    board_index.save_board(board)
 
     daily = _daily_thread()
     plan, _created = Plan.objects.get_or_create(pub_date=pub_date, thread=daily)
@@ -345,6 +351,7 @@ def _set_task_done_progress(
     _maybe_add_journal(new_text, note, published, daily, done, story)
 
 
+@retry_on_conflict
 @transaction.atomic
 def delete_task(user, text, today=None):
     """Remove the task from the board (only if leaf) and from today's
@@ -353,12 +360,13 @@ def delete_task(user, text, today=None):
     pub_date = _today(today)
     board = _current_board(user)
 
-    hit = board_tree.find_task_by_text(board.state, text)
+    hit = board_index.find_task(board, text)
     if hit is not None:
         parent_list, idx, node = hit
         if not board_tree.has_children(node):
             parent_list.pop(idx)
-            board.save()
+            board_index.forget_index(board)
+            board_index.save_board(board)
 
     daily = _daily_thread()
     plan = Plan.objects.filter(pub_date=pub_date, thread=daily).first()
@@ -1,3 +1,4 @@
+from .batches import add_trip_photos, presign_photo_uploads
 from .operations import (
     PhotoObjectMissingError,
     StoryNotFoundError,
@@ -23,12 +24,14 @@ __all__ = [
     "StoryStoppedError",
     "add_trip_note",
     "add_trip_photo",
+    "add_trip_photos",
     "get_detail",
     "get_shared_story",
     "list_active",
     "list_history",
     "presign_photo_original",
     "presign_photo_upload",
+    "presign_photo_uploads",
     "share_trip",
     "start_trip",
     "stop_trip",
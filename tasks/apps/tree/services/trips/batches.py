@@ -0,0 +1,200 @@
+"""Batch uploads of trip photos.
+
+Uploading a whole trip from the phone at once used to take a presign and a
+confirm request per photo. ``presign_photo_uploads`` allocates the keys and
+upload URLs of a batch in one call, and ``add_trip_photos`` confirms all of
+them together: one ListObjectsV2 of the story's prefix instead of a HEAD
+per photo, one lookup of the idempotency keys, the PhotoAdded and
+StoryEvent rows inserted in bulk and the thumbnails enqueued as a single
+Celery group.
+
+Unlike ``add_trip_photo``, a batch confirm reads EXIF only for photos with
+a comment, whose journal processing dates habits and points of interest by
+the photo. The others keep the client's ``published`` until their thumbnail
+task reads the capture time from the original it downloads anyway.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from ...models import PhotoAdded, StoryEvent
+from ...utils.statistics import bulk_create_events
+from ...uuid_generators import journal_added_event_stream_id
+from ..journalling import submit_journal_entry
+from ..photos import key_belongs_to, original_key
+from ..photos import storage as photo_storage
+from ..photos import story_prefix
+from ..photos.events import capture_datetime_from_storage
+from ..search.documents import index_new_documents
+from .operations import StoryStoppedError, _get_owned_story, _journal_thread_for
+
+MAX_BATCH = 200
+
+
+@transaction.atomic
+def presign_photo_uploads(user, story_id, content_types, web=False):
+    """Allocate S3 keys and presigned PUT URLs for a batch of photo uploads.
+
+    Returns one ``presign_photo_upload`` result per content type, in order.
+
+    Raises ``StoryNotFoundError`` (not owned), ``StoryStoppedError`` (stopped),
+    or ``ValueError`` (an unsupported content type, or too many photos).
+    """
+    if len(content_types) > MAX_BATCH:
+        raise ValueError(f"at most {MAX_BATCH} photos per batch")
+
+    story = _get_owned_story(user, story_id)
+    if story.stopped is not None:
+        raise StoryStoppedError(f"Story #{story_id} is stopped; cannot add photos.")
+
+    keys = [
+        original_key(user.pk, story_id, content_type) for content_type in content_types
+    ]
+    presign = photo_storage.presign_put_web if web else photo_storage.presign_put
+    expires_at = timezone.now() + timedelta(seconds=settings.PHOTO_PRESIGN_PUT_TTL)
+
+    return [
+        {
+            "key": key,
+            "upload_url": presign(key, content_type),
+            "expires_at": expires_at.isoformat(),
+        }
+        for key, content_type in zip(keys, content_types)
+    ]
+
+
+def _existing_photos(items):
+    keys = [item["idempotency_key"] for item in items if item.get("idempotency_key")]
+
+    return {
+        photo.idempotency_key: photo
+        for photo in PhotoAdded.objects.filter(idempotency_key__in=keys)
+    }
+
+
+def _unconfirmed(items, existing):
+    """Items to create: not confirmed yet, each idempotency key and S3 key once"""
+    seen = set(existing)
+    unconfirmed = []
+
+    for item in items:
+        idempotency_key = item.get("idempotency_key")
+
+        if idempotency_key in seen or item["key"] in seen:
+            continue
+
+        seen.update(filter(None, [idempotency_key, item["key"]]))
+        unconfirmed.append(item)
+
+    return unconfirmed
+
+
+def _create_photos(user, story, items):
+    thread = _journal_thread_for(user)
+    photos = []
+
+    for item in items:
+        captured = (
+            capture_datetime_from_storage(item["key"]) if item["comment"] else None
+        )
+
+        photo = PhotoAdded(
+            thread=thread,
+            comment=item["comment"],
+            original_key=item["key"],
+            content_type=item["content_type"],
+            published=captured or item.get("published") or timezone.now(),
+            idempotency_key=item.get("idempotency_key"),
+        )
+        photo.event_stream_id = journal_added_event_stream_id(photo)
+        photos.append(photo)
+
+    bulk_create_events(PhotoAdded, photos)
+    index_new_documents(photos)
+
+    # Photos without a comment have nothing to process but their link to the
+    # story; the rest go through the journalling pipeline one by one.
+    StoryEvent.objects.bulk_create(
+        StoryEvent(story=story, event=photo) for photo in photos if not photo.comment
+    )
+
+    for photo in photos:
+        if photo.comment:
+            submit_journal_entry(photo, story=story)
+
+    return photos
+
+
+@transaction.atomic
+def add_trip_photos(user, story_id, items):
+    """Confirm a batch of uploaded photos of a story.
+
+    Args:
+        user: The story's owner.
+        story_id: Id of the story.
+        items: Dicts with the ``key``, ``content_type``, ``comment`` and
+            optional ``published`` and ``idempotency_key`` of each photo, as
+            ``add_trip_photo`` takes them.
+
+    Returns:
+        A list with, for each item in order, its PhotoAdded (an existing one
+        for an idempotency key already confirmed) or None when the object is
+        not in the bucket or the key is not under this story's prefix.
+
+    Raises ``StoryNotFoundError`` (not owned), ``StoryStoppedError`` (stopped
+    with new photos in the batch) or ``ValueError`` (too many photos).
+    """
+    if len(items) > MAX_BATCH:
+        raise ValueError(f"at most {MAX_BATCH} photos per batch")
+
+    story = _get_owned_story(user, story_id)
+    existing = _existing_photos(items)
+    new = _unconfirmed(items, existing)
+
+    if new and story.stopped is not None:
+        raise StoryStoppedError(f"Story #{story_id} is stopped; cannot add photos.")
+
+    uploaded = (
+        photo_storage.list_keys(story_prefix(user.pk, story_id)) if new else set()
+    )
+    new = [
+        item
+        for item in new
+        if key_belongs_to(item["key"], user.pk, story_id) and item["key"] in uploaded
+    ]
+
+    try:
+        # Nested savepoint so a unique idempotency key collision (a concurrent
+        # retry of the batch) rolls back only these inserts.
+        with transaction.atomic():
+            photos = _create_photos(user, story, new)
+    except IntegrityError:
+        existing = _existing_photos(items)
+        if _unconfirmed(new, existing):
+            raise
+        new, photos = [], []
+
+    # Import here to avoid importing celery tasks at module load.
+    from celery import group
+
+    from ...tasks import generate_photo_thumbnail
+
+    photo_ids = [photo.pk for photo in photos]
+    if photo_ids:
+        transaction.on_commit(
+            lambda: group(generate_photo_thumbnail.s(pk) for pk in photo_ids).delay()
+        )
+
+    for photo in photos:
+        if photo.idempotency_key:
+            existing[photo.idempotency_key] = photo
+
+    by_key = {item["key"]: photo for item, photo in zip(new, photos)}
+
+    return [
+        existing.get(item.get("idempotency_key")) or by_key.get(item["key"])
+        for item in items
+    ]
@@ -12,7 +12,8 @@ from django.db import IntegrityError, transaction
 from django.utils import timezone
 
 from ...models import JournalAdded, PhotoAdded, SharedStory, Story, StoryEvent
-from ..journalling import process_journal_entry
+from ..events.prefetch import load_events
+from ..journalling import submit_journal_entry
 from ..photos import key_belongs_to, original_key, photo_key_belongs_to
 from ..photos import storage as photo_storage
 from ..photos.events import (
@@ -21,6 +22,7 @@ from ..photos.events import (
     daily_thread,
     existing_event,
 )
+from ..photos.renditions import DISPLAY, THUMB, TINY, rendition_key
 from .titles import default_title
 
 # ``PhotoObjectMissingError`` is imported from ``..photos.events`` and re-exported
@@ -150,7 +152,7 @@ def add_trip_note(user, story_id, comment, published=None, idempotency_key=None)
                 published=published or timezone.now(),
                 idempotency_key=idempotency_key,
             )
-            process_journal_entry(journal_added, story=story)
+            submit_journal_entry(journal_added, story=story)
     except IntegrityError:
         existing = existing_event(JournalAdded, idempotency_key)
         if existing is not None:
@@ -188,6 +190,10 @@ def add_trip_photo(
     run it through the journalling pipeline (so a ``#poi`` line in ``comment``
     still creates a HabitTracked). Enqueues the thumbnail task on commit.
 
+    The EXIF capture time is read from the header of the original by ranged
+    GETs, so the confirm does not download the whole photo; the thumbnail
+    task still moves the photo if it finds a different one.
+
     Raises ``StoryStoppedError`` if stopped, ``PhotoObjectMissingError`` if the
     object isn't in the bucket (or the key doesn't belong to this user/story).
 
@@ -227,7 +233,7 @@ def add_trip_photo(
                 published=captured or published or timezone.now(),
                 idempotency_key=idempotency_key,
             )
-            process_journal_entry(photo, story=story)
+            submit_journal_entry(photo, story=story)
     except IntegrityError:
         existing = existing_event(PhotoAdded, idempotency_key)
         if existing is not None:
@@ -287,6 +293,19 @@ def list_history(user, page=1, page_size=20):
     return items, total
 
 
+def story_entries(story):
+    """JournalAdded/PhotoAdded events of a story as real instances, newest
+    first, resolved with one query per event class instead of one per entry."""
+    return load_events(
+        JournalAdded.objects.filter(story_entry__story=story).order_by("-published")
+    )
+
+
+def _presign_rendition(photo, name):
+    key = rendition_key(photo, name)
+    return photo_storage.presign_get(key) if key else None
+
+
 def get_detail(user, story_id):
     """Story + list of JournalAdded events linked to it, newest first.
 
@@ -297,14 +316,8 @@ def get_detail(user, story_id):
     to derive map pins from there.
     """
     story = _get_owned_story(user, story_id)
-    entries = (
-        StoryEvent.objects.filter(story=story, event__journaladded__isnull=False)
-        .select_related("event")
-        .order_by("-event__published")
-    )
     events = []
-    for entry in entries:
-        event = entry.event.get_real_instance()
+    for event in story_entries(story):
         # PhotoAdded is-a JournalAdded, so it must be checked first.
         if isinstance(event, PhotoAdded):
             events.append(
@@ -313,11 +326,11 @@ def get_detail(user, story_id):
                     "type": "photo",
                     "published": event.published,
                     "comment": event.comment,
-                    "thumbnail_url": (
-                        photo_storage.presign_get(event.thumbnail_key)
-                        if event.thumbnail_key
-                        else None
-                    ),
+                    "thumbnail_url": _presign_rendition(event, THUMB),
+                    "placeholder_url": _presign_rendition(event, TINY),
+                    "display_url": _presign_rendition(event, DISPLAY),
+                    "width": event.width,
+                    "height": event.height,
                     "ready": event.thumbnail_key is not None,
                 }
             )
@@ -5,7 +5,8 @@ This module contains Django signal handlers that manage event stream IDs,
 create event-sourcing events, and maintain data consistency across models.
 """
 
-from django.db.models.signals import post_save, pre_save
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from .models import (
@@ -14,9 +15,14 @@ from .models import (
     Habit,
     HabitKeyword,
     HabitTracked,
+    InsightRefined,
     JournalAdded,
     Observation,
+    ObservationAttached,
+    ObservationClosed,
+    ObservationDetached,
     PhotoAdded,
+    Plan,
     Profile,
     ProjectedOutcome,
     ProjectedOutcomeClosed,
@@ -26,8 +32,27 @@ from .models import (
     ProjectedOutcomeRescheduled,
     observation_event_types,
 )
+from .services.boards.metrics import board_metrics
+from .services.boards.snapshots import store_board_trees
 from .services.breakthrough.event_creation import create_projected_outcome_change_events
+from .services.journalling.keyword_index import invalidate_keyword_trie
+from .services.observations.attachments import (
+    apply_attachment_event,
+    refresh_attachment_projection,
+)
+from .services.search.documents import index_document, remove_document
 from .utils.db import field_has_changed
+from .utils.event_streams import advance_stream_head, refresh_stream_heads
+from .utils.habit_calendar import habit_day_deltas, record_habit_days, stored_habit_days
+from .utils.statistics import (
+    STATISTICS_FIELDS,
+    apply_word_count_delta,
+    count_words,
+    move_events_to_thread,
+    record_event_count,
+    stored_row,
+    word_count_scope,
+)
 from .uuid_generators import (
     board_event_stream_id_from_thread,
     habit_event_stream_id,
@@ -43,6 +68,25 @@ def update_board_committed_event_stream_id(sender, instance, *args, **kwargs):
     instance.event_stream_id = board_event_stream_id_from_thread(instance.thread)
 
 
+@receiver(pre_save, sender=BoardCommitted)
+def store_board_committed_trees(sender, instance, raw=False, **kwargs):
+    """Write the board trees in the configured BOARD_COMMITTED_STORAGE format."""
+    if raw:
+        return
+
+    store_board_trees(instance)
+
+
+@receiver(pre_save, sender=BoardCommitted)
+def count_board_committed_tasks(sender, instance, raw=False, **kwargs):
+    """Store the task counts summaries show, unless the tree was left alone."""
+    if raw:
+        return
+
+    if not instance.metrics or "_before_data_tree" in instance.__dict__:
+        instance.metrics = board_metrics(instance.before)
+
+
 # Habits
 
 
@@ -60,6 +104,9 @@ def on_habit_name_change_update_event_stream_id(sender, instance, *args, **kwarg
         event_stream_id=changed.new
     )
 
+    # The bulk update above bypasses the event signals
+    refresh_stream_heads(changed.old, changed.new)
+
 
 @receiver(pre_save, sender=HabitTracked)
 def update_habit_tracked_event_stream_id(sender, instance, *args, **kwargs):
@@ -103,11 +150,32 @@ def on_observation_thread_change_update_events(sender, instance, *args, **kwargs
     if instance.event_stream_id is None:
         return
 
-    Event.objects.filter(event_stream_id=instance.event_stream_id).update(
-        thread=instance.thread
+    move_events_to_thread(
+        Event.objects.filter(event_stream_id=instance.event_stream_id),
+        instance.thread,
     )
 
 
+@receiver(post_save, sender=ObservationAttached)
+@receiver(post_save, sender=ObservationDetached)
+def project_observation_attachment(sender, instance, created, raw=False, **kwargs):
+    """Fold a written attach/detach event into the attachment projection."""
+    if raw:
+        return
+
+    if created:
+        apply_attachment_event(instance)
+    else:
+        refresh_attachment_projection(instance.event_stream_id)
+
+
+@receiver(post_delete, sender=ObservationAttached)
+@receiver(post_delete, sender=ObservationDetached)
+def unproject_observation_attachment(sender, instance, **kwargs):
+    """Replay the attachment projection of a stream that lost an event."""
+    refresh_attachment_projection(instance.event_stream_id)
+
+
 # Journals
 
 
@@ -123,6 +191,227 @@ def update_journal_added_event_stream_id(sender, instance, *args, **kwargs):
     instance.event_stream_id = journal_added_event_stream_id(instance)
 
 
+# Statistics (word counts, monthly event counts and stream heads)
+
+
+def _skips_statistics(raw, update_fields):
+    return raw or (update_fields is not None and not STATISTICS_FIELDS & update_fields)
+
+
+def _store_word_count(instance, update_fields, before):
+    """Write a recounted word_count that update_fields left out of the save"""
+    if update_fields is None or "word_count" in update_fields:
+        return
+
+    if before is not None and before.word_count == instance.word_count:
+        return
+
+    qs = Plan.objects if isinstance(instance, Plan) else Event.objects.non_polymorphic()
+    qs.filter(pk=instance.pk).update(word_count=instance.word_count)
+
+
+def _is_real_instance(event):
+    return event.get_real_instance_class() is type(event)
+
+
+def count_words_before_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Recount the instance's words and remember the row stored before."""
+    if _skips_statistics(raw, update_fields):
+        return
+
+    instance.word_count = count_words(instance)
+    instance._stored_before_save = stored_row(instance)
+
+
+def fold_word_count_into_statistics(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    """Apply the word count change of a saved row to the Statistics rows."""
+    if _skips_statistics(raw, update_fields):
+        return
+
+    scope = word_count_scope(instance)
+    before = getattr(instance, "_stored_before_save", None)
+
+    if before is None:
+        old_count, old_scope = 0, scope
+    else:
+        old_count, old_scope = before.word_count, (before.date.year, before.thread_id)
+
+    if old_scope != scope:
+        apply_word_count_delta(*old_scope, -old_count)
+        old_count = 0
+
+    apply_word_count_delta(*scope, instance.word_count - old_count)
+    _store_word_count(instance, update_fields, before)
+
+
+def remove_word_count_from_statistics(sender, instance, **kwargs):
+    """Subtract a deleted row's word count from the Statistics rows.
+
+    Deleting an Event subclass also sends post_delete for its Event parent
+    row; only the instance of the real class is counted.
+    """
+    if isinstance(instance, Event) and not _is_real_instance(instance):
+        return
+
+    apply_word_count_delta(*word_count_scope(instance), -instance.word_count)
+
+
+def count_event_in_monthly_rollup(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    """Count a new event, or move an edited one to its new month."""
+    if _skips_statistics(raw, update_fields):
+        return
+
+    published = instance.published
+    before = getattr(instance, "_stored_before_save", None)
+
+    if before is not None:
+        if (before.date.year, before.date.month) == (published.year, published.month):
+            return
+
+        record_event_count(
+            before.date.year, before.date.month, instance.polymorphic_ctype_id, -1
+        )
+
+    record_event_count(
+        published.year, published.month, instance.polymorphic_ctype_id, 1
+    )
+
+
+def uncount_event_in_monthly_rollup(sender, instance, **kwargs):
+    """Remove a deleted event from the monthly rollup."""
+    if not _is_real_instance(instance):
+        return
+
+    record_event_count(
+        instance.published.year,
+        instance.published.month,
+        instance.polymorphic_ctype_id,
+        -1,
+    )
+
+
+def advance_event_stream_head(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    """Move the stream head forward, or recompute it if the event moved back."""
+    if _skips_statistics(raw, update_fields):
+        return
+
+    before = getattr(instance, "_stored_before_save", None)
+
+    if before is not None and (
+        before.event_stream_id != instance.event_stream_id
+        or before.date > instance.published
+    ):
+        refresh_stream_heads(before.event_stream_id, instance.event_stream_id)
+        return
+
+    advance_stream_head(instance.event_stream_id, instance.published)
+
+
+@receiver(post_delete, sender=Event)
+def retreat_event_stream_head(sender, instance, **kwargs):
+    """Recompute the head of a deleted event's stream.
+
+    Connected to Event only: its tree_event row is deleted after the rows of
+    any subclass, so the stream no longer contains the event here.
+    """
+    refresh_stream_heads(instance.event_stream_id)
+
+
+for _model in [
+    Plan,
+    *(model for model in apps.get_models() if issubclass(model, Event)),
+]:
+    pre_save.connect(count_words_before_save, sender=_model)
+    post_save.connect(fold_word_count_into_statistics, sender=_model)
+    post_delete.connect(remove_word_count_from_statistics, sender=_model)
+
+    if issubclass(_model, Event):
+        post_save.connect(count_event_in_monthly_rollup, sender=_model)
+        post_delete.connect(uncount_event_in_monthly_rollup, sender=_model)
+        post_save.connect(advance_event_stream_head, sender=_model)
+
+
+# Habit calendars
+
+
+HABIT_DAY_FIELDS = {"habit", "habit_id", "occured", "published"}
+
+
+def _skips_habit_days(raw, update_fields):
+    return raw or (update_fields is not None and not HABIT_DAY_FIELDS & update_fields)
+
+
+@receiver(pre_save, sender=HabitTracked)
+def remember_habit_day_before_save(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    """Remember the habit, day and outcome stored before an edit."""
+    if _skips_habit_days(raw, update_fields) or instance.pk is None:
+        return
+
+    instance._habit_day_before_save = stored_habit_days([instance.pk])
+
+
+@receiver(post_save, sender=HabitTracked)
+def count_habit_day(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Count a tracked habit in its day, moving it out of the old one."""
+    if _skips_habit_days(raw, update_fields):
+        return
+
+    deltas = habit_day_deltas(
+        getattr(instance, "_habit_day_before_save", None) or [], sign=-1
+    )
+
+    record_habit_days(
+        habit_day_deltas(
+            [(instance.habit_id, instance.published, instance.occured)],
+            deltas=deltas,
+        )
+    )
+
+
+@receiver(post_delete, sender=HabitTracked)
+def uncount_habit_day(sender, instance, **kwargs):
+    """Remove a deleted tracked habit from its day."""
+    record_habit_days(
+        habit_day_deltas(
+            [(instance.habit_id, instance.published, instance.occured)], sign=-1
+        )
+    )
+
+
+# Full-text search documents
+
+
+@receiver(post_save, sender=Observation)
+@receiver(post_save, sender=ObservationClosed)
+@receiver(post_save, sender=InsightRefined)
+@receiver(post_save, sender=JournalAdded)
+@receiver(post_save, sender=PhotoAdded)
+def index_search_document(sender, instance, raw=False, **kwargs):
+    """Rewrite the search document of a saved observation, insight or entry."""
+    if raw:
+        return
+
+    index_document(instance)
+
+
+@receiver(post_delete, sender=Observation)
+@receiver(post_delete, sender=ObservationClosed)
+@receiver(post_delete, sender=InsightRefined)
+@receiver(post_delete, sender=JournalAdded)
+@receiver(post_delete, sender=PhotoAdded)
+def remove_search_document(sender, instance, **kwargs):
+    """Drop the search document of a deleted observation, insight or entry."""
+    remove_document(instance)
+
+
 # Breakthroughs and projected outcomes
 
 
@@ -175,3 +464,12 @@ def add_new_habit_keyword_to_all_profiles(sender, instance, created, **kwargs):
         all_profiles = Profile.objects.all()
         for profile in all_profiles:
             profile.habit_keywords.add(instance)
+
+
+@receiver(post_save, sender=Habit)
+@receiver(post_delete, sender=Habit)
+@receiver(post_save, sender=HabitKeyword)
+@receiver(post_delete, sender=HabitKeyword)
+def invalidate_habit_keyword_trie(sender, instance, **kwargs):
+    """Make every process rebuild its trie of habit keywords."""
+    invalidate_keyword_trie()
@@ -1,9 +1,7 @@
-import io
-
 from django.conf import settings
+from django.db import transaction
 
 from celery import shared_task
-from PIL import Image, ImageOps
 from pillow_heif import register_heif_opener
 
 # Teach Pillow to decode the HEIC/HEIF originals phones upload by default.
@@ -12,13 +10,16 @@ register_heif_opener()
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=10)
 def generate_photo_thumbnail(self, photo_added_id):
-    """Generate a WebP thumbnail for a PhotoAdded original and record its key.
+    """Generate the WebP renditions of a PhotoAdded original and record them.
 
-    Idempotent: a no-op once ``thumbnail_key`` is set. Retried on transient
-    failures (e.g. the original not yet visible in the bucket).
+    Downloads the original once, encodes every ``PHOTO_RENDITIONS`` size and,
+    for trip photos, moves the event to the EXIF capture time read from the
+    same bytes. Idempotent: a no-op once ``thumbnail_key`` is set. Retried on
+    transient failures (e.g. the original not yet visible in the bucket).
     """
-    from .models import PhotoAdded
-    from .services.photos import storage, thumbnail_key_for
+    from .models import PhotoAdded, StoryEvent
+    from .services.photos import storage
+    from .services.photos.renditions import THUMB, render_renditions, upload_renditions
 
     try:
         photo = PhotoAdded.objects.get(pk=photo_added_id)
@@ -32,18 +33,70 @@ def generate_photo_thumbnail(self, photo_added_id):
     except Exception as exc:  # noqa: BLE001 - retry any storage hiccup
         raise self.retry(exc=exc)
 
-    img = Image.open(io.BytesIO(raw))
-    img = ImageOps.exif_transpose(img)
-    max_edge = settings.PHOTO_THUMBNAIL_MAX_EDGE
-    img.thumbnail((max_edge, max_edge))
-    img = img.convert("RGB")
+    captured, rendered = render_renditions(raw, settings.PHOTO_RENDITIONS)
+    renditions = upload_renditions(storage, photo.original_key, rendered)
+    thumb = renditions[THUMB]
 
-    buf = io.BytesIO()
-    img.save(buf, "WEBP", quality=80)
+    photo.thumbnail_key = thumb["key"]
+    photo.width = thumb["width"]
+    photo.height = thumb["height"]
+    photo.renditions = renditions
 
-    tkey = thumbnail_key_for(photo.original_key)
-    storage.upload_bytes(tkey, buf.getvalue(), "image/webp")
+    # Trip photos are dated by when they were taken; standalone photos keep
+    # the time they were filed. Saving published moves the event in
+    # statistics; only the fields set here are written, so an edit made to
+    # the entry while the task ran is kept.
+    if (
+        captured is not None
+        and captured != photo.published
+        and StoryEvent.objects.filter(event_id=photo.pk).exists()
+    ):
+        photo.published = captured
+        photo.save(
+            update_fields=[
+                "published",
+                "event_stream_id",
+                "thumbnail_key",
+                "width",
+                "height",
+                "renditions",
+            ]
+        )
+        return
 
     PhotoAdded.objects.filter(pk=photo.pk).update(
-        thumbnail_key=tkey, width=img.width, height=img.height
+        thumbnail_key=photo.thumbnail_key,
+        width=photo.width,
+        height=photo.height,
+        renditions=renditions,
     )
+
+
+@shared_task(autoretry_for=(Exception,), max_retries=3, default_retry_delay=10)
+def process_journal_entry_task(journal_added_id, skip_habits=False, story_id=None):
+    """Run ``process_journal_entry`` for an entry saved with async processing.
+
+    The entry is claimed by clearing its ``processing_pending`` flag in the
+    same transaction as the rows processing writes, so a failed run leaves
+    it pending for the retry and a repeated delivery finds nothing to do.
+    The entry itself was linked to its story when it was submitted.
+    """
+    from .models import JournalAdded, Story
+    from .services.journalling import process_journal_entry
+
+    with transaction.atomic():
+        claimed = JournalAdded.objects.filter(
+            pk=journal_added_id, processing_pending=True
+        ).update(processing_pending=False)
+
+        if not claimed:
+            return
+
+        journal_added = JournalAdded.objects.select_related("thread").get(
+            pk=journal_added_id
+        )
+        story = Story.objects.filter(pk=story_id).first() if story_id else None
+
+        process_journal_entry(
+            journal_added, skip_habits=skip_habits, story=story, link_entry=False
+        )
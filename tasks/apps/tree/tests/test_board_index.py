@@ -0,0 +1,85 @@
+import random
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..board_operations import create_task_item
+from ..models import Board, Profile, Thread
+from ..services.today import add_task, board_index, board_tree, set_task_done
+from ..utils.trees import tree_iterator
+from .test_commit import random_board_state
+
+
+class BoardIndexTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="phone")
+        cls.daily = Thread.objects.create(name="Daily")
+        Profile.objects.create(user=cls.user, default_board_thread=cls.daily)
+
+    def setUp(self):
+        self.rng = random.Random(19)
+        self.board = Board.objects.create(
+            thread=self.daily, state=random_board_state(self.rng, 30)
+        )
+
+    def test_finds_what_the_tree_search_finds(self):
+        texts = {
+            board_tree._node_text(node) for node in tree_iterator(self.board.state)
+        }
+
+        for text in sorted(texts) + ["missing"]:
+            expected = board_tree.find_task_by_text(self.board.state, text)
+            hit = board_index.find_task(self.board, text)
+
+            if expected is None:
+                self.assertIsNone(hit)
+            else:
+                self.assertIs(hit[2], expected[2])
+                self.assertEqual(hit[1], expected[1])
+
+    def test_operations_reuse_the_cached_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            add_task(self.user, "water plants")
+
+        with mock.patch.object(
+            board_index, "build_index", side_effect=AssertionError("rebuilt")
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                set_task_done(self.user, "water plants", True)
+
+            set_task_done(self.user, "water plants", False)
+
+        self.board.refresh_from_db()
+        self.assertEqual(board_tree._node_text(self.board.state[-1]), "water plants")
+        self.assertEqual(board_tree.get_state(self.board.state[-1]), "open")
+
+    def test_saving_elsewhere_replaces_the_version(self):
+        board_index.find_task(self.board, "anything")
+        version = self.board.version
+
+        board = Board.objects.get(pk=self.board.pk)
+        board.state.append(create_task_item("added on the web"))
+        board.save()
+
+        self.assertNotEqual(board.version, version)
+
+        board = Board.objects.get(pk=self.board.pk)
+        self.assertIsNotNone(board_index.find_task(board, "added on the web"))
+
+    def test_saves_only_the_state(self):
+        with CaptureQueriesContext(connection) as queries:
+            set_task_done(self.user, board_tree._node_text(self.board.state[0]), True)
+
+        [update] = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith('UPDATE "tree_board"')
+        ]
+
+        self.assertIn('"state"', update)
+        self.assertIn('"version"', update)
+        self.assertNotIn('"focus"', update)
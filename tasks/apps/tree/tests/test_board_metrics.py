@@ -0,0 +1,99 @@
+import random
+from copy import deepcopy
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import BoardCommitted, Thread
+from ..serializers import BoardSummary
+from ..services.boards import backfill_board_metrics, board_metrics
+from ..services.boards.metrics import EISENHOWER, MOSCOW
+from ..utils.trees import tree_iterator
+from .test_commit import random_board_state
+
+
+def _marked_board_state(rng, items):
+    state = random_board_state(rng, items)
+
+    for item in tree_iterator(state):
+        markers = item["data"]["meaningfulMarkers"]
+
+        if rng.random() < 0.5:
+            markers["eisenhower"] = rng.choice(EISENHOWER)
+
+        if rng.random() < 0.5:
+            markers["moscow"] = rng.choice(MOSCOW)
+
+    return state
+
+
+class BoardMetricsTestCase(TestCase):
+    def setUp(self):
+        self.thread = Thread.objects.create(name="Weekly")
+        self.rng = random.Random(18)
+
+    def test_counts_match_the_summary_lists(self):
+        for _ in range(50):
+            state = _marked_board_state(self.rng, self.rng.randrange(15))
+            board = BoardCommitted(before=state, metrics={})
+            summary = BoardSummary(board)
+
+            metrics = board_metrics(state)
+
+            self.assertEqual(metrics["tasks"], len(list(tree_iterator(state))))
+            self.assertEqual(metrics["finished"], len(list(summary.finished())))
+            self.assertEqual(metrics["postponed"], len(list(summary.postponed())))
+            self.assertEqual(metrics["removed"], len(list(summary.removed())))
+            self.assertEqual(
+                sum(metrics["eisenhower"].values()),
+                sum(
+                    1
+                    for item in tree_iterator(state)
+                    if item["data"]["meaningfulMarkers"].get("eisenhower")
+                ),
+            )
+
+    def test_stored_on_commit_and_backfilled(self):
+        state = _marked_board_state(self.rng, 10)
+        committed = BoardCommitted.objects.create(
+            thread=self.thread, before=deepcopy(state)
+        )
+
+        self.assertEqual(committed.metrics, board_metrics(state))
+
+        BoardCommitted.objects.filter(pk=committed.pk).update(metrics={})
+
+        self.assertEqual(backfill_board_metrics(), 1)
+        self.assertEqual(backfill_board_metrics(), 0)
+        self.assertEqual(
+            BoardCommitted.objects.get(pk=committed.pk).metrics, board_metrics(state)
+        )
+
+    def test_summary_counts_do_not_read_the_tree(self):
+        committed = BoardCommitted.objects.create(
+            thread=self.thread, before=_marked_board_state(self.rng, 10)
+        )
+        board = BoardCommitted.objects.defer("before_data").get(pk=committed.pk)
+        summary = BoardSummary(board)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(summary.task_count(), committed.metrics["tasks"])
+            self.assertEqual(
+                dict(summary.moscow()),
+                {key: committed.metrics["moscow"].get(key, 0) for key in MOSCOW},
+            )
+
+    def test_summaries_page(self):
+        self.client.force_login(get_user_model().objects.create_user(username="u"))
+        committed = BoardCommitted.objects.create(
+            thread=self.thread, before=_marked_board_state(self.rng, 10)
+        )
+
+        response = self.client.get(reverse("summaries"), {"from": "2000-01-01"})
+
+        self.assertContains(
+            response,
+            f"{committed.metrics['finished']} of {committed.metrics['tasks']} "
+            "tasks finished",
+        )
@@ -0,0 +1,119 @@
+import random
+from copy import deepcopy
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from ..board_operations import create_task_item
+from ..models import Board, BoardCommitted, BoardNode, Thread
+from ..services.boards import FULL, NODES, convert_board_history, snapshots
+from .test_commit import random_board_state
+
+
+def _stored(board):
+    return BoardCommitted.objects.non_polymorphic().get(pk=board.pk)
+
+
+class BoardSnapshotsTestCase(TestCase):
+    def setUp(self):
+        snapshots._nodes.clear()
+        self.thread = Thread.objects.create(name="Weekly")
+        self.daily = Thread.objects.create(name="Daily")
+        Thread.objects.create(name="big-picture")
+        self.rng = random.Random(17)
+
+    def _commit(self, before, after=None, transitions=None):
+        return BoardCommitted.objects.create(
+            thread=self.thread,
+            focus="focus",
+            before=deepcopy(before),
+            after=deepcopy(after if after is not None else before),
+            transitions=deepcopy(transitions or {}),
+        )
+
+    @override_settings(BOARD_COMMITTED_STORAGE=NODES)
+    def test_trees_round_trip_through_the_node_store(self):
+        before = random_board_state(self.rng, 10)
+        transitions = {"Daily": random_board_state(self.rng, 3), "Weekly": []}
+
+        board = self._commit(before, before[:4], transitions)
+        stored = _stored(board)
+
+        self.assertTrue(snapshots.is_compact(stored.before_data))
+        self.assertTrue(snapshots.is_compact(stored.transitions_data))
+
+        snapshots._nodes.clear()
+
+        self.assertEqual(stored.before, before)
+        self.assertEqual(stored.after, before[:4])
+        self.assertEqual(stored.transitions, transitions)
+
+    @override_settings(BOARD_COMMITTED_STORAGE=NODES)
+    def test_unchanged_subtrees_are_stored_once(self):
+        before = random_board_state(self.rng, 20)
+
+        self._commit(before)
+        nodes = BoardNode.objects.count()
+
+        self._commit(before + [create_task_item("one more")])
+
+        self.assertEqual(BoardNode.objects.count(), nodes + 1)
+
+    @override_settings(BOARD_COMMITTED_STORAGE=NODES)
+    def test_a_page_of_commits_loads_nodes_per_level(self):
+        for _ in range(5):
+            self._commit(random_board_state(self.rng, 10, depth=3))
+
+        snapshots._nodes.clear()
+
+        # The events, then one query per tree level
+        with self.assertNumQueries(4):
+            boards = list(BoardCommitted.objects.order_by("pk"))
+            trees = [board.before for board in boards]
+
+        self.assertEqual(len(trees), 5)
+
+    def test_history_converts_both_ways(self):
+        trees = [random_board_state(self.rng, 5) for _ in range(3)]
+        boards = [self._commit(tree, transitions={"Daily": tree[:1]}) for tree in trees]
+
+        self.assertEqual(convert_board_history(NODES, chunk_size=2), 3)
+        self.assertEqual(convert_board_history(NODES), 0)
+
+        for board, tree in zip(boards, trees):
+            stored = _stored(board)
+            self.assertTrue(snapshots.is_compact(stored.before_data))
+            self.assertEqual(stored.before, tree)
+
+        self.assertEqual(convert_board_history(FULL), 3)
+
+        for board, tree in zip(boards, trees):
+            stored = _stored(board)
+            self.assertEqual(stored.before_data, tree)
+            self.assertEqual(stored.transitions_data, {"Daily": tree[:1]})
+
+    @override_settings(BOARD_COMMITTED_STORAGE=NODES)
+    def test_commit_and_summaries_views(self):
+        user = get_user_model().objects.create_user(username="user")
+        state = random_board_state(self.rng, 8)
+        board = Board.objects.create(thread=self.thread, state=deepcopy(state))
+
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(f"/boards/{board.pk}/commit/")
+
+        self.assertEqual(response.status_code, 200)
+
+        committed = BoardCommitted.objects.get()
+        self.assertTrue(snapshots.is_compact(_stored(committed).before_data))
+        self.assertEqual(committed.before, state)
+
+        self.client.force_login(user)
+        response = self.client.get(reverse("board-summary", args=[committed.pk]))
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(reverse("summaries"), {"from": "2000-01-01"})
+        self.assertContains(response, f'id="summary-{committed.pk}"')
@@ -0,0 +1,218 @@
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from rest_framework.test import APIClient
+
+from ..board_operations import create_task_item
+from ..models import Board, Profile, Thread
+from ..services.boards import (
+    BoardVersionConflict,
+    patch_board,
+    patches,
+    save_if_unchanged,
+)
+from ..services.today import add_task, board_index, board_tree
+from ..views_board_tasks import BoardViewSet
+
+
+def _concurrent_write(board):
+    """Save the board behind the back of an instance read earlier"""
+    Board.objects.filter(pk=board.pk).update(version=uuid.uuid4())
+
+
+class BoardVersionsTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="user")
+        self.thread = Thread.objects.create(name="Daily")
+        Profile.objects.create(user=self.user, default_board_thread=self.thread)
+        self.tasks = [create_task_item(f"task {index}") for index in range(3)]
+        self.board = Board.objects.create(thread=self.thread, state=self.tasks)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _stored_texts(self):
+        board = Board.objects.get(pk=self.board.pk)
+        return [board_tree._node_text(node) for node in board.state]
+
+    def test_save_if_unchanged(self):
+        stale = Board.objects.get(pk=self.board.pk)
+        self.board.focus = "first"
+        save_if_unchanged(self.board, ["focus"])
+
+        stale.focus = "second"
+
+        with self.assertRaises(BoardVersionConflict):
+            save_if_unchanged(stale, ["focus"])
+
+        self.assertEqual(Board.objects.get(pk=self.board.pk).focus, "first")
+
+    def test_put_refuses_a_stale_version(self):
+        url = f"/boards/{self.board.pk}/"
+        data = self.client.get(url).json()
+
+        data["focus"] = "mine"
+        response = self.client.put(url, data, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()["version"], data["version"])
+
+        data["focus"] = "stale"
+        response = self.client.put(url, data, format="json")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(
+            response.json()["version"], str(Board.objects.get(pk=self.board.pk).version)
+        )
+        self.assertEqual(Board.objects.get(pk=self.board.pk).focus, "mine")
+
+    def test_put_compares_against_the_version_sent(self):
+        """A write landing after the board is read for the PUT is not lost."""
+        url = f"/boards/{self.board.pk}/"
+        data = self.client.get(url).json()
+        get_object = BoardViewSet.get_object
+        reads = []
+
+        def get_object_then_concurrent_write(view):
+            board = get_object(view)
+            reads.append(board.pk)
+
+            if len(reads) == 1:
+                _concurrent_write(board)
+
+            return board
+
+        data["focus"] = "mine"
+
+        with mock.patch.object(
+            BoardViewSet, "get_object", get_object_then_concurrent_write
+        ):
+            response = self.client.put(url, data, format="json")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertNotEqual(Board.objects.get(pk=self.board.pk).focus, "mine")
+
+    def test_operations(self):
+        first, second, third = (task["id"] for task in self.tasks)
+
+        response = self.client.post(
+            f"/boards/{self.board.pk}/operations/",
+            {
+                "operations": [
+                    {"op": "add", "text": "new", "parent": first, "id": "new-id"},
+                    {"op": "rename", "id": second, "text": "renamed"},
+                    {"op": "move", "id": third, "index": 0},
+                    {"op": "set_state", "id": "new-id", "state": "done"},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["ids"], ["new-id", second, third, "new-id"])
+
+        board = Board.objects.get(pk=self.board.pk)
+        self.assertEqual(str(board.version), response.json()["version"])
+        self.assertEqual(self._stored_texts(), ["task 2", "task 0", "renamed"])
+
+        [added] = board.state[1]["children"]
+        self.assertEqual(board_tree.get_state(added), "done")
+        self.assertTrue(added["state"]["checked"])
+
+    def test_operations_merge_with_concurrent_writes(self):
+        """Operations apply to the stored board, not the one the client read."""
+        add_task(self.user, "from phone")
+
+        response = self.client.post(
+            f"/boards/{self.board.pk}/operations/",
+            {"operations": [{"op": "add", "text": "from browser", "index": 0}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self._stored_texts(),
+            ["from browser", "task 0", "task 1", "task 2", "from phone"],
+        )
+
+    def test_operations_retry_on_conflict(self):
+        save = patches.save_if_unchanged
+        calls = []
+
+        def save_after_concurrent_write(board, fields):
+            calls.append(board.pk)
+
+            if len(calls) == 1:
+                _concurrent_write(board)
+
+            save(board, fields)
+
+        with mock.patch.object(
+            patches, "save_if_unchanged", side_effect=save_after_concurrent_write
+        ):
+            patch_board(self.board.pk, [{"op": "add", "text": "once"}])
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self._stored_texts(), ["task 0", "task 1", "task 2", "once"])
+
+    def test_operation_errors(self):
+        url = f"/boards/{self.board.pk}/operations/"
+        first = self.tasks[0]["id"]
+
+        response = self.client.post(
+            url, {"operations": [{"op": "rename", "id": first}]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            url,
+            {
+                "operations": [
+                    {"op": "add", "text": "child", "parent": first, "id": "child"},
+                    {"op": "move", "id": first, "parent": "child"},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["operation"], 1)
+
+        response = self.client.post(
+            url,
+            {"operations": [{"op": "set_state", "id": "gone", "state": "done"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self._stored_texts(), ["task 0", "task 1", "task 2"])
+
+    def test_today_operations_retry_on_conflict(self):
+        save = board_index.save_if_unchanged
+        calls = []
+
+        def save_after_concurrent_write(board, fields):
+            calls.append(board.pk)
+
+            if len(calls) == 1:
+                _concurrent_write(board)
+
+            save(board, fields)
+
+        with mock.patch.object(
+            board_index, "save_if_unchanged", side_effect=save_after_concurrent_write
+        ):
+            add_task(self.user, "buy bread")
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self._stored_texts().count("buy bread"), 1)
+
+    def test_commit_refuses_after_repeated_conflicts(self):
+        with mock.patch(
+            "tasks.apps.tree.views_board_tasks.save_if_unchanged",
+            side_effect=BoardVersionConflict(self.board.pk),
+        ):
+            response = self.client.post(f"/boards/{self.board.pk}/commit/")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self._stored_texts(), ["task 0", "task 1", "task 2"])
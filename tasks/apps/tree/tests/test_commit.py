@@ -1,6 +1,116 @@
+import random
+from copy import deepcopy
+
 from django.test import TestCase
 
-from ..commit import calculate_changes_per_board
+from ..board_operations import create_task_item
+from ..commit import (
+    calculate_changes_per_board,
+    cut_leaves,
+    merge,
+    recursively,
+    transition_data_between_boards,
+    unionize_sets,
+)
+
+THREADS = ["Daily", "Weekly", "big-picture"]
+
+
+def random_board_state(rng, items, depth=4):
+    """A board of random tasks, some checked, postponed or transitioned."""
+
+    def task(depth):
+        item = create_task_item(f"task {rng.randrange(items * 4)}")
+        markers = item["data"]["meaningfulMarkers"]
+        markers["weeksInList"] = rng.randrange(7)
+        markers["postponedFor"] = rng.choice([0, 0, 0, 1, 2])
+        markers["madeProgress"] = rng.random() < 0.2
+        markers["canBePostponed"] = rng.random() < 0.1
+
+        if rng.random() < 0.4:
+            markers["transition"] = rng.choice(THREADS)
+
+        item["state"] = {"checked": rng.random() < 0.2}
+
+        if depth > 1 and rng.random() < 0.5:
+            item["children"] = [task(depth - 1) for _ in range(rng.randrange(1, 5))]
+
+        return item
+
+    return [task(depth) for _ in range(items)]
+
+
+def changes_per_board_by_cutting(state):
+    """The commit's original implementation: one deep copy per thread."""
+    new_state = transition_data_between_boards(state)
+
+    thread_names = recursively(
+        new_state,
+        lambda item: item["data"]["meaningfulMarkers"].get("transition"),
+        unionize_sets,
+    )
+
+    return {name: cut_leaves(deepcopy(new_state), name) for name in thread_names}
+
+
+class PartitionTestCase(TestCase):
+    """The single-pass partition gives the boards cut_leaves gave."""
+
+    def test_matches_cutting_leaves_per_thread(self):
+        rng = random.Random(0)
+
+        for example in range(300):
+            state = random_board_state(rng, items=rng.randrange(0, 12))
+
+            with self.subTest(example=example):
+                self.assertEqual(
+                    calculate_changes_per_board(deepcopy(state)),
+                    changes_per_board_by_cutting(deepcopy(state)),
+                )
+
+    def test_does_not_modify_the_board(self):
+        state = random_board_state(random.Random(1), items=20)
+        original = deepcopy(state)
+
+        calculate_changes_per_board(state)
+
+        self.assertEqual(state, original)
+
+    def test_nested_transitions(self):
+        """A transitioned child of a transitioned task goes to both threads."""
+        parent = create_task_item("parent")
+        child = create_task_item("child")
+        leaf = create_task_item("leaf")
+        parent["data"]["meaningfulMarkers"]["transition"] = "Weekly"
+        child["data"]["meaningfulMarkers"]["transition"] = "Daily"
+        child["children"] = [leaf]
+        parent["children"] = [child]
+
+        result = calculate_changes_per_board([parent])
+
+        self.assertEqual(set(result), {"Weekly", "Daily", None})
+        self.assertEqual(result[None], [])
+        self.assertEqual(
+            [item["text"] for item in result["Weekly"][0]["children"]], ["child"]
+        )
+        self.assertEqual(result["Weekly"][0]["children"][0]["children"], [])
+        self.assertEqual(
+            [item["text"] for item in result["Daily"][0]["children"][0]["children"]],
+            ["leaf"],
+        )
+        self.assertNotIn(
+            "transition", result["Daily"][0]["children"][0]["data"]["meaningfulMarkers"]
+        )
+
+    def test_merge_appends_new_items_in_order(self):
+        a = [create_task_item("one")]
+        b = [create_task_item(text) for text in ["three", "one", "two"]]
+        b[1]["children"] = [create_task_item("nested")]
+
+        merged = merge(a, b)
+
+        self.assertEqual([item["text"] for item in merged], ["one", "three", "two"])
+        self.assertEqual([item["text"] for item in merged[0]["children"]], ["nested"])
 
 
 class CommitTestCase(TestCase):
@@ -0,0 +1,82 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from ..models import JournalAdded, Plan, Reflection, Thread
+
+
+def _at(day, hour=12):
+    return timezone.make_aware(datetime.datetime(2024, 1, day, hour))
+
+
+class DailyEventsRangeAPITestCase(TestCase):
+    """The range endpoint returns the daily_events structure for many days."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(username="user")
+        )
+        self.daily = Thread.objects.create(name="Daily")
+        self.weekly = Thread.objects.create(name="Weekly")
+
+    def _journal(self, published, thread=None):
+        return JournalAdded.objects.create(
+            comment="entry", thread=thread or self.daily, published=published
+        )
+
+    def _range(self, date_from, date_to, **params):
+        return self.client.get(
+            reverse("daily-events-range"), {"from": date_from, "to": date_to, **params}
+        )
+
+    def test_matches_daily_events_for_each_day(self):
+        """Every day of the range has the same payload as daily_events."""
+        self._journal(_at(1))
+        self._journal(_at(3, 23))
+        self._journal(_at(3), thread=self.weekly)
+        Plan.objects.create(
+            pub_date=datetime.date(2024, 1, 2), thread=self.daily, focus="Rest"
+        )
+        Reflection.objects.create(
+            pub_date=datetime.date(2024, 1, 3), thread=self.daily, good="Ran"
+        )
+
+        days = self._range("2024-01-01", "2024-01-03").json()["days"]
+
+        self.assertEqual(
+            [day["date"] for day in days], ["2024-01-01", "2024-01-02", "2024-01-03"]
+        )
+
+        for day in days:
+            single = self.client.get(reverse("daily-events"), {"date": day["date"]})
+            self.assertEqual(day, single.json())
+
+    def test_query_count_does_not_grow_with_the_range(self):
+        """A month costs as many queries as a few days."""
+        for day in (1, 2, 20):
+            self._journal(_at(day))
+            Plan.objects.create(
+                pub_date=datetime.date(2024, 1, day), thread=self.daily, focus="x"
+            )
+
+        def count_queries(date_to):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self._range("2024-01-01", date_to).status_code, 200)
+            return len(queries)
+
+        self.assertEqual(count_queries("2024-01-31"), count_queries("2024-01-03"))
+
+    def test_invalid_ranges_are_rejected(self):
+        self.assertEqual(self._range("2024-01-01", "").status_code, 400)
+        self.assertEqual(self._range("2024-01-01", "soon").status_code, 400)
+        self.assertEqual(self._range("2024-01-05", "2024-01-01").status_code, 400)
+        self.assertEqual(self._range("2024-01-01", "2024-12-31").status_code, 200)
+        self.assertEqual(self._range("2024-01-01", "2025-01-01").status_code, 400)
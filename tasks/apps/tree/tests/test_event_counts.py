@@ -0,0 +1,152 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from ..models import (
+    Event,
+    Habit,
+    HabitTracked,
+    JournalAdded,
+    MonthlyEventCount,
+    PhotoAdded,
+    Thread,
+)
+from ..utils.statistics import (
+    count_events_by_type,
+    get_event_count_matrix,
+    rebuild_event_counts,
+)
+
+
+def _at(year, month, day=1):
+    return timezone.make_aware(datetime.datetime(year, month, day, 12))
+
+
+class MonthlyEventCountTestCase(TestCase):
+    """The monthly event rollup is maintained on event save and delete."""
+
+    def setUp(self):
+        self.thread = Thread.objects.create(name="Daily")
+        self.habit = Habit.objects.create(name="Run", slug="run")
+
+    def _journal(self, published, comment="entry"):
+        return JournalAdded.objects.create(
+            comment=comment, thread=self.thread, published=published
+        )
+
+    def _snapshot(self):
+        return sorted(
+            MonthlyEventCount.objects.filter(count__gt=0).values_list(
+                "year", "month", "content_type_id", "count"
+            )
+        )
+
+    def test_new_events_are_counted_per_type_and_year(self):
+        """Counts are split per event type and filtered by year."""
+        self._journal(_at(2024, 1))
+        self._journal(_at(2024, 2))
+        self._journal(_at(2023, 6))
+        HabitTracked.objects.create(
+            habit=self.habit, thread=self.thread, published=_at(2024, 3)
+        )
+
+        counts = count_events_by_type(2024)
+
+        self.assertEqual(counts["journal_count"], 2)
+        self.assertEqual(counts["habit_count"], 1)
+        self.assertEqual(counts["event_count"], 3)
+        self.assertEqual(count_events_by_type()["journal_count"], 3)
+
+    def test_subclasses_count_towards_their_parent_type(self):
+        """PhotoAdded counts as a journal entry, like JournalAdded.objects.count()."""
+        PhotoAdded.objects.create(
+            comment="",
+            thread=self.thread,
+            published=_at(2024, 1),
+            original_key="a.jpg",
+            content_type="image/jpeg",
+        )
+
+        counts = count_events_by_type(2024)
+
+        self.assertEqual(counts["journal_count"], JournalAdded.objects.count())
+        self.assertEqual(counts["event_count"], 1)
+
+    def test_republishing_moves_the_event_between_months(self):
+        """Changing published moves the count to the new month."""
+        journal = self._journal(_at(2024, 1))
+
+        journal.published = _at(2023, 12)
+        journal.save()
+
+        self.assertEqual(count_events_by_type(2024)["journal_count"], 0)
+        self.assertEqual(count_events_by_type(2023)["journal_count"], 1)
+
+    def test_saving_only_published_moves_the_event(self):
+        """update_fields naming published still updates the rollup."""
+        journal = self._journal(_at(2024, 1))
+
+        journal.published = _at(2023, 12)
+        journal.save(update_fields=["published"])
+
+        self.assertEqual(count_events_by_type(2024)["journal_count"], 0)
+        self.assertEqual(count_events_by_type(2023)["journal_count"], 1)
+
+    def test_deleting_an_event_uncounts_it_once(self):
+        """Deleting a subclass instance decrements its month exactly once."""
+        self._journal(_at(2024, 1))
+        journal = self._journal(_at(2024, 1))
+
+        journal.delete()
+
+        self.assertEqual(count_events_by_type(2024)["journal_count"], 1)
+        self.assertEqual(count_events_by_type(2024)["event_count"], 1)
+
+    def test_rebuild_matches_incremental_counts(self):
+        """Backfilling from history produces the incrementally kept rollup."""
+        self._journal(_at(2024, 1))
+        self._journal(_at(2024, 5))
+        HabitTracked.objects.create(
+            habit=self.habit, thread=self.thread, published=_at(2022, 5)
+        )
+        Event.objects.get(published=_at(2024, 5)).delete()
+
+        incremental = self._snapshot()
+        rebuild_event_counts()
+
+        self.assertEqual(self._snapshot(), incremental)
+
+    def test_aggregate_counts_are_read_with_one_query(self):
+        """With content types cached, counting every event type is one query."""
+        self._journal(_at(2024, 1))
+        count_events_by_type(2024)
+
+        with self.assertNumQueries(1):
+            count_events_by_type(2024)
+
+    def test_matrix_lists_every_year(self):
+        """The matrix maps each count key to per-year values."""
+        self._journal(_at(2024, 1))
+        self._journal(_at(2022, 1))
+
+        matrix = get_event_count_matrix()
+
+        self.assertEqual(matrix["years"], [2024, 2022])
+        self.assertEqual(matrix["counts"]["journal_count"], {2024: 1, 2022: 1})
+        self.assertEqual(matrix["counts"]["habit_count"], {2024: 0, 2022: 0})
+
+    def test_matrix_endpoint(self):
+        """The all-years matrix is served as JSON."""
+        self._journal(_at(2024, 1))
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username="user"))
+
+        response = client.get(reverse("stats-matrix-json"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["counts"]["journal_count"], {"2024": 1})
@@ -0,0 +1,199 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from ..models import (
+    Event,
+    Habit,
+    HabitKeyword,
+    HabitTracked,
+    InsightRefined,
+    JournalAdded,
+    JournalTag,
+    Observation,
+    ObservationAttached,
+    ObservationClosed,
+    ObservationDetached,
+    ObservationMade,
+    ObservationRecontextualized,
+    ObservationReflectedUpon,
+    ObservationReinterpreted,
+    ObservationType,
+    ObservationUpdated,
+    Thread,
+)
+from ..serializers import EventSerializer
+from ..services.events.prefetch import prefetch_event_relations
+
+DAY = datetime.date(2024, 1, 1)
+
+
+def _at(minute):
+    return timezone.make_aware(datetime.datetime(2024, 1, 1, 8)) + datetime.timedelta(
+        minutes=minute
+    )
+
+
+class EventSerializationQueryTestCase(TestCase):
+    """Event lists serialize in a number of queries independent of their size."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(username="user")
+        )
+        self.user = get_user_model().objects.get(username="user")
+        self.thread = Thread.objects.create(name="Daily")
+        self.type = ObservationType.objects.create(
+            name="Observation", slug="observation"
+        )
+        self.tag = JournalTag.objects.create(name="Work", slug="work")
+        self.minute = 0
+
+    def _published(self):
+        self.minute += 1
+        return _at(self.minute)
+
+    def _observation_stream(self):
+        """One observation with every kind of observation event.
+
+        A second stream is closed, so its events link to the closed view.
+        """
+        observation = Observation.objects.create(
+            pub_date=DAY,
+            user=self.user,
+            thread=self.thread,
+            type=self.type,
+            situation="Situation",
+            interpretation="Interpretation",
+            approach="Approach",
+        )
+        other = Observation.objects.create(
+            pub_date=DAY, user=self.user, thread=self.thread, type=self.type
+        )
+
+        ObservationMade.from_observation(observation, self._published()).save()
+
+        observation.situation = "Recontextualized"
+        ObservationRecontextualized.from_observation(
+            observation, "Situation", self._published()
+        ).save()
+        ObservationReinterpreted.from_observation(
+            observation, "Interpretation", self._published()
+        ).save()
+        ObservationReflectedUpon.from_observation(
+            observation, "Approach", self._published()
+        ).save()
+        ObservationUpdated.objects.create(
+            observation=observation,
+            thread=self.thread,
+            comment="Update",
+            published=self._published(),
+        )
+
+        for model in (ObservationAttached, ObservationDetached):
+            model.objects.create(
+                thread=self.thread,
+                event_stream_id=observation.event_stream_id,
+                other_event_stream_id=other.event_stream_id,
+                published=self._published(),
+            )
+
+        closed = ObservationClosed.from_observation(observation, self._published())
+        closed.save()
+        InsightRefined.from_observation_closed(
+            closed, published=self._published()
+        ).save()
+
+        gone = Observation.objects.create(
+            pub_date=DAY, user=self.user, thread=self.thread, type=self.type
+        )
+        ObservationMade.from_observation(gone, self._published()).save()
+        ObservationClosed.from_observation(gone, self._published()).save()
+        gone.delete()
+
+    def _day(self, copies):
+        for _ in range(copies):
+            self._observation_stream()
+
+            journal = JournalAdded.objects.create(
+                comment="Entry", thread=self.thread, published=self._published()
+            )
+            journal.tags.add(self.tag)
+
+            habit = Habit.objects.create(
+                name=f"Habit {self.minute}", slug=f"habit-{self.minute}"
+            )
+            HabitKeyword.objects.create(habit=habit, keyword=f"habit-{self.minute}")
+            HabitTracked.objects.create(
+                habit=habit, thread=self.thread, published=self._published()
+            )
+
+    def _count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("daily-events"), {"date": DAY.isoformat()}
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+        return len(queries), len(response.json()["events"])
+
+    def test_daily_events_query_count_is_fixed(self):
+        """A busy day costs no more queries than a quiet one."""
+        self._day(1)
+        small_queries, small_events = self._count_queries()
+
+        self._day(9)
+        large_queries, large_events = self._count_queries()
+
+        self.assertEqual(large_events, 10 * small_events)
+        self.assertEqual(large_queries, small_queries)
+
+    def test_prefetched_events_serialize_identically(self):
+        """Bulk-loaded relations give the same payload as per-row lookups."""
+        self._day(2)
+        events = list(Event.objects.filter(published__date=DAY))
+
+        per_row = [EventSerializer(event).data for event in events]
+        prefetched = EventSerializer(
+            prefetch_event_relations(list(Event.objects.filter(published__date=DAY))),
+            many=True,
+        ).data
+
+        self.assertEqual(prefetched, per_row)
+
+    def test_prefetched_lookups_match_per_row_lookups(self):
+        """url(), situation_at_creation() and __str__ agree with the queries."""
+        self._day(1)
+        events = list(Event.objects.instance_of(*OBSERVATION_STREAM_EVENTS))
+        prefetched = prefetch_event_relations(
+            list(Event.objects.instance_of(*OBSERVATION_STREAM_EVENTS))
+        )
+
+        for plain, bulk in zip(events, prefetched):
+            self.assertEqual(bulk.url(), plain.url())
+            self.assertEqual(
+                bulk.situation_at_creation(), plain.situation_at_creation()
+            )
+            self.assertEqual(str(bulk), str(plain))
+
+
+OBSERVATION_STREAM_EVENTS = (
+    ObservationMade,
+    ObservationRecontextualized,
+    ObservationReinterpreted,
+    ObservationReflectedUpon,
+    ObservationUpdated,
+    ObservationAttached,
+    ObservationDetached,
+    ObservationClosed,
+    InsightRefined,
+)
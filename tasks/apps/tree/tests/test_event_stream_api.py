@@ -0,0 +1,112 @@
+import datetime
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from ..models import Habit, HabitTracked, JournalAdded, Thread
+
+
+def _at(day, hour=12):
+    return timezone.make_aware(datetime.datetime(2024, 1, day, hour))
+
+
+class EventStreamAPITestCase(TestCase):
+    """The NDJSON event export streams events in (published, id) order."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(username="user")
+        )
+        self.daily = Thread.objects.create(name="Daily")
+        self.other = Thread.objects.create(name="big-picture")
+        self.habit = Habit.objects.create(name="Run", slug="run")
+
+    def _journal(self, published, thread=None):
+        return JournalAdded.objects.create(
+            comment="entry", thread=thread or self.daily, published=published
+        )
+
+    def _stream(self, **params):
+        response = self.client.get(reverse("event-stream"), params)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        body = b"".join(response.streaming_content).decode()
+
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_streams_events_in_order_across_days(self):
+        """Events of a whole range come back in one response, oldest first."""
+        later = self._journal(_at(3))
+        earlier = self._journal(_at(1))
+        same_time = self._journal(_at(1))
+
+        rows = self._stream(**{"from": "2024-01-01", "to": "2024-01-03"})
+
+        self.assertEqual(
+            [row["id"] for row in rows], [earlier.pk, same_time.pk, later.pk]
+        )
+        self.assertEqual(rows[0]["resourcetype"], "JournalAdded")
+
+    def test_date_range_is_inclusive(self):
+        """The to date includes the whole day."""
+        self._journal(_at(1))
+        inside = self._journal(_at(2, 23))
+        self._journal(_at(3, 0))
+
+        rows = self._stream(**{"from": "2024-01-02", "to": "2024-01-02"})
+
+        self.assertEqual([row["id"] for row in rows], [inside.pk])
+
+    def test_filters_by_thread_type_and_stream(self):
+        journal = self._journal(_at(1))
+        self._journal(_at(1), thread=self.other)
+        tracked = HabitTracked.objects.create(
+            habit=self.habit, thread=self.daily, published=_at(2)
+        )
+
+        self.assertEqual(
+            [row["id"] for row in self._stream(thread="Daily")],
+            [journal.pk, tracked.pk],
+        )
+        self.assertEqual(
+            [row["id"] for row in self._stream(type="HabitTracked")], [tracked.pk]
+        )
+        self.assertEqual(
+            [
+                row["id"]
+                for row in self._stream(event_stream_id=str(tracked.event_stream_id))
+            ],
+            [tracked.pk],
+        )
+
+    def test_keyset_cursor_resumes_after_the_last_event(self):
+        """A capped dump continues from the last line's published and id."""
+        events = [self._journal(_at(1)) for _ in range(3)] + [self._journal(_at(2))]
+
+        first_page = self._stream(limit="2")
+        last = first_page[-1]
+        rest = self._stream(after_published=last["published"], after_id=last["id"])
+
+        self.assertEqual(
+            [row["id"] for row in first_page + rest], [e.pk for e in events]
+        )
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in [
+            {"from": "yesterday"},
+            {"type": "Unknown"},
+            {"event_stream_id": "not-a-uuid"},
+            {"after_id": "3"},
+            {"limit": "ten"},
+        ]:
+            response = self.client.get(reverse("event-stream"), params)
+
+            self.assertEqual(response.status_code, 400, params)
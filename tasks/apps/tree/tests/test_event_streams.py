@@ -0,0 +1,167 @@
+import datetime
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import (
+    EventStreamHead,
+    Habit,
+    HabitTracked,
+    Observation,
+    ObservationAttached,
+    ObservationType,
+    Thread,
+)
+from ..utils.event_streams import advance_stream_heads, rebuild_stream_heads
+from ..utils.statistics import bulk_update_events
+
+
+def _at(day, hour=12):
+    return timezone.make_aware(datetime.datetime(2024, 1, day, hour))
+
+
+class EventStreamHeadTestCase(TestCase):
+    """Stream heads follow the newest event of each stream."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="user")
+        self.thread = Thread.objects.create(name="big-picture")
+        self.type = ObservationType.objects.create(
+            name="Observation", slug="observation"
+        )
+        self.habit = Habit.objects.create(name="Run", slug="run")
+
+    def _observation(self):
+        return Observation.objects.create(
+            pub_date=datetime.date(2024, 1, 1),
+            user=self.user,
+            thread=self.thread,
+            type=self.type,
+        )
+
+    def _event(self, observation, published):
+        return ObservationAttached.objects.create(
+            thread=self.thread,
+            event_stream_id=observation.event_stream_id,
+            other_event_stream_id=uuid.uuid4(),
+            published=published,
+        )
+
+    def _head(self, event_stream_id):
+        return (
+            EventStreamHead.objects.filter(event_stream_id=event_stream_id)
+            .values_list("last_event_published", flat=True)
+            .first()
+        )
+
+    def _snapshot(self):
+        return sorted(
+            EventStreamHead.objects.values_list(
+                "event_stream_id", "last_event_published"
+            )
+        )
+
+    def test_head_tracks_the_newest_event(self):
+        """Older events do not move the head back."""
+        observation = self._observation()
+
+        self._event(observation, _at(2))
+        self._event(observation, _at(1))
+
+        self.assertEqual(self._head(observation.event_stream_id), _at(2))
+
+    def test_advancing_heads_in_bulk_never_moves_them_back(self):
+        """Bulk advances create missing heads and keep newer ones."""
+        newer, older = self._observation(), self._observation()
+        self._event(newer, _at(5))
+        self._event(older, _at(5))
+        new_stream = uuid.uuid4()
+
+        advance_stream_heads(
+            {
+                newer.event_stream_id: _at(9),
+                older.event_stream_id: _at(2),
+                new_stream: _at(3),
+            }
+        )
+
+        self.assertEqual(self._head(newer.event_stream_id), _at(9))
+        self.assertEqual(self._head(older.event_stream_id), _at(5))
+        self.assertEqual(self._head(new_stream), _at(3))
+
+    def test_republishing_the_newest_event_earlier_recomputes_the_head(self):
+        """Moving the newest event back in time falls back to the next newest."""
+        observation = self._observation()
+        self._event(observation, _at(2))
+        newest = self._event(observation, _at(3))
+
+        newest.published = _at(1)
+        newest.save()
+
+        self.assertEqual(self._head(observation.event_stream_id), _at(2))
+
+    def test_bulk_updating_the_newest_event_earlier_recomputes_the_head(self):
+        """Bulk updates move heads back like saves do."""
+        observation = self._observation()
+        self._event(observation, _at(2))
+        newest = self._event(observation, _at(3))
+
+        newest.published = _at(1)
+        bulk_update_events(ObservationAttached, [newest], ["published"])
+
+        self.assertEqual(self._head(observation.event_stream_id), _at(2))
+
+    def test_deleting_events_recomputes_the_head(self):
+        """Deleting the newest event retreats the head; the last removes it."""
+        observation = self._observation()
+        older = self._event(observation, _at(1))
+        newest = self._event(observation, _at(2))
+
+        newest.delete()
+        self.assertEqual(self._head(observation.event_stream_id), _at(1))
+
+        older.delete()
+        self.assertIsNone(self._head(observation.event_stream_id))
+
+    def test_habit_rekeying_moves_the_head(self):
+        """Re-keying a habit's events moves its head to the new stream."""
+        HabitTracked.objects.create(
+            habit=self.habit, thread=self.thread, published=_at(1)
+        )
+        old_stream_id = self.habit.event_stream_id
+
+        self.habit.event_stream_id = uuid.uuid4()
+        self.habit.save()
+
+        self.assertIsNone(self._head(old_stream_id))
+        self.assertEqual(self._head(self.habit.event_stream_id), _at(1))
+
+    def test_rebuild_matches_incremental_heads(self):
+        """Rebuilding from history reproduces the maintained heads."""
+        first, second = self._observation(), self._observation()
+        self._event(first, _at(1))
+        self._event(second, _at(3))
+        self._event(second, _at(2)).delete()
+
+        incremental = self._snapshot()
+        rebuild_stream_heads()
+
+        self.assertEqual(self._snapshot(), incremental)
+
+    def test_observations_are_annotated_from_the_head(self):
+        """with_last_event_published reads the stream head."""
+        observation = self._observation()
+        quiet = self._observation()
+        self._event(observation, _at(1))
+        self._event(observation, _at(5))
+
+        published = dict(
+            Observation.objects.with_last_event_published().values_list(
+                "pk", "last_event_published"
+            )
+        )
+
+        self.assertEqual(published[observation.pk], _at(5))
+        self.assertIsNone(published[quiet.pk])
@@ -1,11 +1,22 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
-from ..models import Habit, HabitKeyword, HabitTracked, Thread
+from ..models import (
+    EventStreamHead,
+    Habit,
+    HabitKeyword,
+    HabitTracked,
+    MonthlyEventCount,
+    Statistics,
+    Thread,
+)
+from ..utils.habit_calendar import VERSION_KEY
 
 
 class TrackHabitAPITestCase(APITestCase):
@@ -100,3 +111,160 @@ class TrackHabitAPITestCase(APITestCase):
         response = self.client.post(self.url, payload, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(HabitTracked.objects.get().note, "")
+
+
+class TrackHabitBatchAPITestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(username="phone", password="x")
+        cls.token = Token.objects.create(user=cls.user)
+        cls.daily_thread = Thread.objects.create(name="Daily")
+        cls.habit = Habit.objects.create(name="Health metrics", slug="health-metrics")
+        HabitKeyword.objects.create(habit=cls.habit, keyword="health-metrics")
+        cls.sleep = Habit.objects.create(name="Sleep", slug="sleep")
+        HabitKeyword.objects.create(habit=cls.sleep, keyword="sleep")
+        cls.url = reverse("track-habit-batch-api")
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def _post(self, *records):
+        return self.client.post(
+            self.url,
+            {
+                "records": [
+                    {"keyword": keyword, "date": date, "note": note}
+                    for keyword, date, note in records
+                ]
+            },
+            format="json",
+        )
+
+    def _month(self, keyword, month=4, note="steps=1000"):
+        return [(keyword, f"2026-{month:02}-{day:02}", note) for day in range(1, 31)]
+
+    def test_creates_events_and_reports_each_record(self):
+        response = self._post(
+            ("health-metrics", "2026-05-16", "steps=100"),
+            ("sleep", "2026-05-16", "7h"),
+            ("nope", "2026-05-16", ""),
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["status"] for result in response.json()["results"]],
+            ["created", "created", "unknown_keyword"],
+        )
+        self.assertEqual(
+            response.json()["counts"], {"created": 2, "unknown_keyword": 1}
+        )
+
+        event = HabitTracked.objects.get(habit=self.sleep)
+        self.assertEqual(event.note, "7h")
+        self.assertEqual(event.thread, self.daily_thread)
+        self.assertEqual(event.event_stream_id, self.sleep.event_stream_id)
+        self.assertEqual(event.published.date().isoformat(), "2026-05-16")
+
+    def test_updates_events_of_days_already_tracked(self):
+        self._post(("health-metrics", "2026-05-16", "steps=100"))
+
+        response = self._post(
+            ("health-metrics", "2026-05-16", "steps=200"),
+            ("health-metrics", "2026-05-17", "steps=300"),
+            ("health-metrics", "2026-05-17", "steps=400"),
+        )
+
+        self.assertEqual(
+            [result["status"] for result in response.json()["results"]],
+            ["updated", "created", "updated"],
+        )
+        self.assertEqual(
+            list(HabitTracked.objects.values_list("note", flat=True)),
+            ["steps=200", "steps=400"],
+        )
+
+    def test_matches_records_posted_one_by_one(self):
+        """Events and read models end up as after single-record POSTs."""
+        records = [
+            ("health-metrics", "2026-04-30", "steps=1 distance=2km"),
+            ("sleep", "2026-05-01", "seven hours"),
+            ("health-metrics", "2026-04-30", "steps=3"),
+        ]
+
+        for keyword, date, note in records:
+            self.client.post(
+                reverse("track-habit-api"),
+                {"keyword": keyword, "date": date, "note": note},
+                format="json",
+            )
+
+        single = self._snapshot()
+        HabitTracked.objects.all().delete()
+
+        self._post(*records)
+
+        self.assertEqual(self._snapshot(), single)
+
+    def _snapshot(self):
+        return [
+            list(
+                HabitTracked.objects.values_list(
+                    "habit", "published", "note", "word_count", "event_stream_id"
+                )
+            ),
+            sorted(
+                Statistics.objects.exclude(key__startswith=VERSION_KEY).values_list(
+                    "key", "value"
+                )
+            ),
+            sorted(MonthlyEventCount.objects.values_list("year", "month", "count")),
+            sorted(
+                EventStreamHead.objects.values_list(
+                    "event_stream_id", "last_event_published"
+                )
+            ),
+        ]
+
+    def test_query_count_does_not_grow_with_the_records(self):
+        # Creates the read model rows the posts below only update
+        self._post(
+            *self._month("sleep", month=4),
+            *self._month("sleep", month=5),
+            ("health-metrics", "2026-03-01", "steps=10"),
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            self._post(("health-metrics", "2026-04-01", "steps=10"))
+
+        with self.assertNumQueries(len(context.captured_queries)):
+            response = self._post(*self._month("health-metrics", month=5))
+
+        self.assertEqual(response.json()["counts"], {"created": 30})
+
+        with CaptureQueriesContext(connection) as context:
+            self._post(("sleep", "2026-04-01", "8h"))
+
+        with self.assertNumQueries(len(context.captured_queries)):
+            response = self._post(*self._month("sleep", month=5, note="8h"))
+
+        self.assertEqual(response.json()["counts"], {"updated": 30})
+
+    def test_invalid_record_rejects_the_batch(self):
+        response = self._post(("sleep", "not-a-date", ""))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date", response.json()["records"][0])
+        self.assertEqual(HabitTracked.objects.count(), 0)
+
+    def test_empty_batch_returns_400(self):
+        response = self.client.post(self.url, {"records": []}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_missing_token_returns_401(self):
+        self.client.credentials()
+
+        response = self._post(("sleep", "2026-05-16", ""))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,205 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from ..models import Habit, HabitDayCount, HabitTracked, Thread
+from ..services.habits import track_habits
+from ..utils.habit_calendar import habit_day_counts, rebuild_habit_day_counts
+from ..utils.statistics import bulk_create_events, bulk_update_events
+from ..views_habit import habit_calendar
+
+
+def _at(year, month, day, hour=12):
+    return timezone.make_aware(datetime.datetime(year, month, day, hour))
+
+
+class HabitDayCountTestCase(TestCase):
+    """The daily habit rollup is maintained on HabitTracked save and delete."""
+
+    def setUp(self):
+        self.thread = Thread.objects.create(name="Daily")
+        self.habit = Habit.objects.create(name="Run", slug="run")
+        self.other = Habit.objects.create(name="Read", slug="read")
+
+    def _track(self, published, occured=True, habit=None):
+        return HabitTracked.objects.create(
+            habit=habit or self.habit,
+            thread=self.thread,
+            published=published,
+            occured=occured,
+        )
+
+    def _days(self, habit=None):
+        return habit_day_counts(
+            [(habit or self.habit).pk],
+            datetime.date(2000, 1, 1),
+            datetime.date(2100, 1, 1),
+        )[(habit or self.habit).pk]
+
+    def _snapshot(self):
+        return sorted(
+            HabitDayCount.objects.values_list("habit_id", "date", "occurred", "skipped")
+        )
+
+    def test_occurrences_are_counted_per_day(self):
+        self._track(_at(2024, 1, 1, 8))
+        self._track(_at(2024, 1, 1, 20))
+        self._track(_at(2024, 1, 2))
+
+        self.assertEqual(
+            self._days(),
+            {datetime.date(2024, 1, 1): 2, datetime.date(2024, 1, 2): 1},
+        )
+
+    def test_a_skip_marks_the_whole_day(self):
+        """Like the calendar always did, one skip overrides any occurrences."""
+        self._track(_at(2024, 1, 1, 8))
+        self._track(_at(2024, 1, 1, 10), occured=False)
+        self._track(_at(2024, 1, 1, 20))
+
+        self.assertEqual(self._days(), {datetime.date(2024, 1, 1): -1})
+
+    def test_editing_moves_the_event_between_days_and_habits(self):
+        tracked = self._track(_at(2024, 1, 1), occured=False)
+
+        tracked.published = _at(2024, 1, 3)
+        tracked.occured = True
+        tracked.save()
+
+        self.assertEqual(self._days(), {datetime.date(2024, 1, 3): 1})
+
+        tracked.habit = self.other
+        tracked.save()
+
+        self.assertEqual(self._days(), {})
+        self.assertEqual(self._days(self.other), {datetime.date(2024, 1, 3): 1})
+
+    def test_deleting_removes_emptied_days(self):
+        first = self._track(_at(2024, 1, 1))
+        self._track(_at(2024, 1, 1))
+
+        first.delete()
+        self.assertEqual(self._days(), {datetime.date(2024, 1, 1): 1})
+
+        HabitTracked.objects.all().delete()
+        self.assertFalse(HabitDayCount.objects.exists())
+
+    def test_bulk_paths_match_rebuild(self):
+        """Bulk inserts, bulk updates and batch tracking keep the rollup exact."""
+        created = bulk_create_events(
+            HabitTracked,
+            [
+                HabitTracked(
+                    habit=self.habit,
+                    thread=self.thread,
+                    published=_at(2024, 2, day),
+                    occured=day % 3 != 0,
+                    event_stream_id=self.habit.event_stream_id,
+                )
+                for day in range(1, 10)
+            ],
+        )
+
+        for event in created[:4]:
+            event.published += datetime.timedelta(days=20)
+            event.occured = not event.occured
+
+        bulk_update_events(HabitTracked, created[:4], ["published", "occured"])
+
+        self.habit.keywords.create(keyword="run")
+        track_habits(
+            [
+                {"keyword": "run", "date": datetime.date(2024, 2, 6), "note": "#run"},
+                {"keyword": "run", "date": datetime.date(2024, 3, 1), "note": "#run"},
+            ],
+            self.thread,
+        )
+
+        incremental = self._snapshot()
+        rebuild_habit_day_counts()
+
+        self.assertEqual(self._snapshot(), incremental)
+        self.assertEqual(self._days()[datetime.date(2024, 2, 21)], -1)
+
+    def test_calendar_starts_on_monday_and_fills_gaps(self):
+        self._track(_at(2024, 1, 10))
+
+        calendar = habit_calendar(self.habit, _at(2024, 1, 10), _at(2024, 1, 14))
+
+        self.assertEqual(calendar[0].date, datetime.date(2024, 1, 8))
+        self.assertEqual([day.count for day in calendar], [0, 0, 1, 0, 0, 0, 0])
+
+
+class HabitCalendarViewsTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="user")
+        self.thread = Thread.objects.create(name="Daily")
+        self.habits = [
+            Habit.objects.create(name=f"Habit {index}", slug=f"habit-{index}")
+            for index in range(3)
+        ]
+
+        for habit in self.habits:
+            habit.keywords.create(keyword=habit.slug)
+
+            HabitTracked.objects.create(
+                habit=habit, thread=self.thread, published=_at(2023, 12, 31)
+            )
+            HabitTracked.objects.create(
+                habit=habit, thread=self.thread, published=timezone.now()
+            )
+
+    def test_api_serves_several_habits_and_years(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(
+            reverse("habit-calendar-api"),
+            {"habit": ["habit-0", "habit-2"], "year": [2023, timezone.now().year]},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [habit["slug"] for habit in response.json()["habits"]],
+            ["habit-0", "habit-2"],
+        )
+        self.assertEqual(
+            response.json()["habits"][0]["days"],
+            {"2023-12-31": 1, timezone.localdate().isoformat(): 1},
+        )
+
+    def test_api_rejects_unknown_habits(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(reverse("habit-calendar-api"), {"habit": "missing"})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_renders_every_calendar_in_constant_queries(self):
+        self.client.force_login(self.user)
+        url = reverse("public-habit-list")
+
+        # Warm up the session and content type caches
+        self.client.get(url)
+        # Compare pages with none of the habit stats cached
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertContains(response, 'class="calendar"', count=Habit.objects.count())
+
+        Habit.objects.create(name="Another", slug="another")
+        cache.clear()
+
+        with self.assertNumQueries(len(queries)):
+            self.client.get(url)
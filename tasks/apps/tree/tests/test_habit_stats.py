@@ -0,0 +1,128 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from ..models import Habit, HabitTracked, Thread
+from ..services.habits import analytics, compute_habit_stats, habit_stats
+
+TODAY = datetime.date(2024, 6, 12)
+
+
+def _days_before(*offsets, count=1):
+    return {TODAY - datetime.timedelta(days=offset): count for offset in offsets}
+
+
+class ComputeHabitStatsTestCase(TestCase):
+    def test_no_history(self):
+        stats = compute_habit_stats({}, TODAY)
+
+        self.assertEqual(stats.current_streak, 0)
+        self.assertEqual(stats.longest_streak, 0)
+        self.assertIsNone(stats.longest_streak_end)
+        self.assertIsNone(stats.last_tracked)
+        self.assertEqual(len(stats.weekly), 52)
+
+    def test_current_streak_waits_for_today(self):
+        """An untracked today keeps the streak ending yesterday."""
+        days = _days_before(1, 2, 3)
+
+        self.assertEqual(compute_habit_stats(days, TODAY).current_streak, 3)
+
+        days[TODAY] = 2
+        self.assertEqual(compute_habit_stats(days, TODAY).current_streak, 4)
+
+        days[TODAY] = -1
+        self.assertEqual(compute_habit_stats(days, TODAY).current_streak, 0)
+
+    def test_skips_and_gaps_end_streaks(self):
+        days = _days_before(1, 2, 4, 5, 6, 7, 500, 501, 502, 503, 504)
+        days.update(_days_before(3, count=-1))
+
+        stats = compute_habit_stats(days, TODAY)
+
+        self.assertEqual(stats.current_streak, 2)
+        self.assertEqual(stats.longest_streak, 5)
+        self.assertEqual(stats.longest_streak_end, TODAY - datetime.timedelta(days=500))
+        self.assertEqual(stats.days_tracked, 11)
+        self.assertEqual(stats.days_skipped, 1)
+        self.assertEqual(stats.last_tracked, TODAY - datetime.timedelta(days=1))
+        self.assertEqual(
+            (stats.last_7_days, stats.last_30_days, stats.last_365_days), (5, 6, 6)
+        )
+
+    def test_weekly_frequency_counts_days_per_week(self):
+        stats = compute_habit_stats(_days_before(0, 1, 2, 9), TODAY)
+
+        # 2024-06-12 is a Wednesday
+        self.assertEqual(stats.weekly[-1], (datetime.date(2024, 6, 10), 3))
+        self.assertEqual(stats.weekly[-2], (datetime.date(2024, 6, 3), 1))
+        self.assertEqual(sum(days for _, days in stats.weekly), 4)
+
+
+class HabitStatsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.thread = Thread.objects.create(name="Daily")
+        self.habits = [
+            Habit.objects.create(name=f"Habit {index}", slug=f"habit-{index}")
+            for index in range(3)
+        ]
+
+    def _track(self, habit, days_ago):
+        HabitTracked.objects.create(
+            habit=habit,
+            thread=self.thread,
+            published=timezone.now() - datetime.timedelta(days=days_ago),
+        )
+
+    def test_cached_until_tracking_changes(self):
+        self._track(self.habits[0], 1)
+
+        with self.assertNumQueries(2):
+            stats = habit_stats(self.habits)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(habit_stats(self.habits), stats)
+
+        self.assertEqual(stats[self.habits[0].pk].current_streak, 1)
+
+        self._track(self.habits[0], 2)
+
+        self.assertEqual(habit_stats(self.habits)[self.habits[0].pk].current_streak, 2)
+
+    def test_tracking_a_habit_keeps_the_others_cached(self):
+        self._track(self.habits[1], 0)
+        habit_stats(self.habits)
+
+        self._track(self.habits[0], 1)
+
+        with mock.patch.object(
+            analytics, "habit_day_counts", wraps=analytics.habit_day_counts
+        ) as day_counts:
+            stats = habit_stats(self.habits)
+
+        self.assertEqual(day_counts.call_args.args[0], [self.habits[0].pk])
+        self.assertEqual(stats[self.habits[0].pk].current_streak, 1)
+        self.assertEqual(stats[self.habits[1].pk].current_streak, 1)
+
+    def test_api(self):
+        self._track(self.habits[1], 0)
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username="u"))
+
+        response = client.get(reverse("habit-stats-api"), {"habit": "habit-1"})
+
+        self.assertEqual(response.status_code, 200)
+        [habit] = response.json()["habits"]
+        self.assertEqual(habit["slug"], "habit-1")
+        self.assertEqual(habit["event_stream_id"], str(self.habits[1].event_stream_id))
+        self.assertEqual(habit["current_streak"], 1)
+        self.assertEqual(habit["last_tracked"], timezone.localdate().isoformat())
+        self.assertEqual(len(habit["weekly"]), 52)
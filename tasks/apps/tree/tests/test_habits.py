@@ -1,7 +1,13 @@
+import random
+
 from django.test import TestCase
 
-from ..models import Habit, HabitKeyword
-from ..services.journalling.habit_extraction import habits_line_to_habits_tracked
+from ..models import Habit, HabitKeyword, Statistics
+from ..services.journalling.habit_extraction import (
+    find_best_keyword_match,
+    habits_line_to_habits_tracked,
+)
+from ..services.journalling.keyword_index import VERSION_KEY, KeywordTrie
 
 
 class HabitParsingTestCase(TestCase):
@@ -115,3 +121,55 @@ class HabitParsingTestCase(TestCase):
             "#medytacja dziś rano",
             [(True, self.meditation_habit, "#medytacja dziś rano")],
         )
+
+    def test_shortest_unique_prefix_of_three_characters_matches(self):
+        """A token matches the keyword sharing the longest prefix of 3+ chars."""
+        self._parse_and_check("#work hard", [(True, self.workout_habit, "#work hard")])
+        self._parse_and_check("#fo", [])
+
+    def test_new_keywords_are_matched_at_once(self):
+        """Adding or deleting a keyword replaces the cached trie."""
+        self._parse_and_check("#czytanie", [])
+
+        keyword = HabitKeyword.objects.create(habit=self.food_habit, keyword="czytanie")
+        self._parse_and_check("#czytanie", [(True, self.food_habit, "#czytanie")])
+
+        keyword.delete()
+        self._parse_and_check("#czytanie", [])
+
+    def test_cached_trie_costs_one_query(self):
+        """While the keywords are unchanged only the version is read."""
+        habits_line_to_habits_tracked("#food")
+
+        with self.assertNumQueries(1):
+            habits_line_to_habits_tracked("#food #workout")
+
+    def test_trie_is_rebuilt_when_another_process_changes_keywords(self):
+        """A version token written elsewhere makes the trie reload."""
+        habits_line_to_habits_tracked("#food")
+
+        HabitKeyword.objects.filter(keyword="medytacja").update(keyword="joga")
+        Statistics.objects.filter(key=VERSION_KEY).update(value="elsewhere")
+
+        self._parse_and_check("#joga", [(True, self.meditation_habit, "#joga")])
+
+
+class KeywordTrieTestCase(TestCase):
+    """The trie finds the same keywords as the linear scan."""
+
+    def test_best_match_agrees_with_linear_scan(self):
+        rng = random.Random(0)
+
+        keywords = list(
+            {
+                "".join(rng.choice("abcdeł") for _ in range(rng.randrange(1, 8)))
+                for _ in range(300)
+            }
+        )
+        trie = KeywordTrie(dict.fromkeys(keywords))
+
+        for _ in range(2000):
+            string = "".join(rng.choice("abcdeł ") for _ in range(rng.randrange(0, 10)))
+            _, length, keyword = find_best_keyword_match(string, keywords)
+
+            self.assertEqual(trie.best_match(string), (length, keyword), string)
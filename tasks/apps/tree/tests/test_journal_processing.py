@@ -1,8 +1,35 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from ..models import Habit, HabitKeyword, HabitTracked, JournalAdded, Reflection, Thread
-from ..services.journalling.journal_processing import process_journal_entry
+from ..models import (
+    EventStreamHead,
+    Habit,
+    HabitKeyword,
+    HabitTracked,
+    JournalAdded,
+    MonthlyEventCount,
+    Reflection,
+    Story,
+    StoryEvent,
+    Thread,
+)
+from ..services.journalling.journal_processing import (
+    process_journal_entry,
+    submit_journal_entry,
+)
+from ..tasks import process_journal_entry_task
+from ..utils.event_streams import rebuild_stream_heads
+from ..utils.statistics import (
+    calculate_total_word_count,
+    count_words,
+    get_word_count_statistic,
+    rebuild_event_counts,
+)
 
 
 class JournalProcessingTestCase(TestCase):
@@ -150,9 +177,7 @@ class JournalProcessingTestCase(TestCase):
     def test_indented_and_nested_quoted_lines_are_ignored(self):
         """Indented (`  >`) and nested (`>>`) quote lines are also skipped."""
         journal = self._create_journal(
-            "  > [x] indented quote\n"
-            ">> #food nested quote\n"
-            "[x] kept"
+            "  > [x] indented quote\n" ">> #food nested quote\n" "[x] kept"
         )
 
         process_journal_entry(journal)
@@ -169,3 +194,148 @@ class JournalProcessingTestCase(TestCase):
 
         self.assertEqual(HabitTracked.objects.count(), 1)
         self.assertEqual(HabitTracked.objects.get().note, "#food eaten > a lot")
+
+    def test_habits_tracked_are_created_in_bulk(self):
+        """The number of queries does not grow with the habits tracked."""
+        for name in ("Walk", "Read", "Piano"):
+            habit = Habit.objects.create(name=name, slug=name.lower())
+            HabitKeyword.objects.create(habit=habit, keyword=name.lower())
+
+        one = self._create_journal("#food pizza")
+        many = self._create_journal("#food pizza #walk park !read #piano scales")
+
+        # Creates the read model rows the entries below only update
+        process_journal_entry(self._create_journal("#food #walk #read #piano"))
+
+        with CaptureQueriesContext(connection) as context:
+            process_journal_entry(one)
+
+        with self.assertNumQueries(len(context.captured_queries)):
+            process_journal_entry(many)
+
+        self.assertEqual(HabitTracked.objects.count(), 9)
+
+    def test_bulk_created_habits_tracked_match_saved_ones(self):
+        """Bulk-created rows get the stream ids and read models of a save."""
+        journal = self._create_journal("#food pizza for lunch")
+
+        process_journal_entry(journal)
+
+        habit_tracked = HabitTracked.objects.get()
+        self.assertEqual(habit_tracked.event_stream_id, self.food_habit.event_stream_id)
+        self.assertEqual(habit_tracked.word_count, count_words(habit_tracked))
+
+        counts = sorted(MonthlyEventCount.objects.values_list("content_type", "count"))
+        heads = sorted(
+            EventStreamHead.objects.values_list(
+                "event_stream_id", "last_event_published"
+            )
+        )
+        words, _ = get_word_count_statistic()
+
+        rebuild_event_counts()
+        rebuild_stream_heads()
+
+        self.assertEqual(
+            sorted(MonthlyEventCount.objects.values_list("content_type", "count")),
+            counts,
+        )
+        self.assertEqual(
+            sorted(
+                EventStreamHead.objects.values_list(
+                    "event_stream_id", "last_event_published"
+                )
+            ),
+            heads,
+        )
+        self.assertEqual(words, calculate_total_word_count())
+
+
+@override_settings(JOURNAL_PROCESSING_ASYNC=True)
+class AsyncJournalProcessingTestCase(TestCase):
+    """Journal entries submitted with JOURNAL_PROCESSING_ASYNC enabled."""
+
+    def setUp(self):
+        self.daily_thread = Thread.objects.create(name="Daily")
+
+        habit = Habit.objects.create(name="Food", slug="food")
+        HabitKeyword.objects.create(habit=habit, keyword="food")
+
+        self.journal = JournalAdded.objects.create(
+            comment="[x] cooked\n#food pizza",
+            thread=self.daily_thread,
+            published=timezone.now(),
+        )
+
+    def _submit(self, **kwargs):
+        with mock.patch("tasks.apps.tree.tasks.process_journal_entry_task.delay"):
+            with self.captureOnCommitCallbacks(execute=True):
+                submit_journal_entry(self.journal, **kwargs)
+
+    @mock.patch("tasks.apps.tree.tasks.process_journal_entry_task.delay")
+    def test_processing_is_scheduled_after_commit(self, delay):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            submit_journal_entry(self.journal, skip_habits=True)
+
+            self.assertFalse(Reflection.objects.exists())
+
+        self.assertEqual(len(callbacks), 1)
+        delay.assert_called_once_with(self.journal.pk, skip_habits=True, story_id=None)
+        self.assertTrue(JournalAdded.objects.get(pk=self.journal.pk).processing_pending)
+
+    def test_task_processes_the_entry_once(self):
+        self._submit()
+
+        process_journal_entry_task(self.journal.pk)
+        process_journal_entry_task(self.journal.pk)
+
+        self.assertEqual(Reflection.objects.get().good, "cooked")
+        self.assertEqual(HabitTracked.objects.count(), 1)
+        self.assertFalse(
+            JournalAdded.objects.get(pk=self.journal.pk).processing_pending
+        )
+
+    def test_entry_is_linked_to_its_story_before_processing(self):
+        story = Story.objects.create(
+            user=get_user_model().objects.create_user(username="traveller"),
+            title="Trip",
+        )
+
+        self._submit(story=story)
+
+        self.assertEqual(
+            list(StoryEvent.objects.values_list("event_id", flat=True)),
+            [self.journal.pk],
+        )
+
+        process_journal_entry_task(self.journal.pk, story_id=story.pk)
+
+        self.assertEqual(
+            sorted(StoryEvent.objects.values_list("event_id", flat=True)),
+            [self.journal.pk, HabitTracked.objects.get().pk],
+        )
+
+    def test_failed_processing_leaves_the_entry_pending(self):
+        self._submit()
+
+        with mock.patch(
+            "tasks.apps.tree.services.journalling.process_journal_entry",
+            side_effect=RuntimeError("worker lost"),
+        ):
+            with self.assertRaises(RuntimeError):
+                process_journal_entry_task(self.journal.pk)
+
+        self.assertTrue(JournalAdded.objects.get(pk=self.journal.pk).processing_pending)
+
+        process_journal_entry_task(self.journal.pk)
+
+        self.assertEqual(Reflection.objects.get().good, "cooked")
+
+    def test_task_ignores_deleted_entries(self):
+        self._submit()
+        journal_added_id = self.journal.pk
+        self.journal.delete()
+
+        process_journal_entry_task(journal_added_id)
+
+        self.assertFalse(HabitTracked.objects.exists())
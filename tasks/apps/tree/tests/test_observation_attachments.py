@@ -0,0 +1,164 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from ..models import (
+    Observation,
+    ObservationAttached,
+    ObservationAttachmentProjection,
+    ObservationDetached,
+    ObservationType,
+    Thread,
+)
+from ..presenters import ComplexPresenter
+from ..services.observations.attachments import (
+    ATTACH,
+    DETACH,
+    rebuild_attachment_projections,
+    replay_attachments,
+)
+from ..views_observation import filter_out_attached_observations
+
+
+class ObservationAttachmentProjectionTestCase(TestCase):
+    """The attachment projection follows attach/detach events as they are written."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="user")
+        self.thread = Thread.objects.create(name="big-picture")
+        self.type = ObservationType.objects.create(
+            name="Observation", slug="observation"
+        )
+        self.complex = self._observation("complex")
+        self.first = self._observation("first")
+        self.second = self._observation("second")
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _observation(self, situation):
+        return Observation.objects.create(
+            pub_date=datetime.date(2024, 1, 1),
+            user=self.user,
+            thread=self.thread,
+            type=self.type,
+            situation=situation,
+        )
+
+    def _event(self, model, other, minutes):
+        return model.objects.create(
+            thread=self.thread,
+            event_stream_id=self.complex.event_stream_id,
+            other_event_stream_id=other.event_stream_id,
+            published=timezone.make_aware(datetime.datetime(2024, 1, 1, 12, minutes)),
+        )
+
+    def _attached(self):
+        return ComplexPresenter(self.complex.event_stream_id).get_attached_stream_ids()
+
+    def test_attach_and_detach_update_the_projection(self):
+        """Attach adds and detach removes the other stream."""
+        self._event(ObservationAttached, self.first, 1)
+        self._event(ObservationAttached, self.second, 2)
+        self._event(ObservationDetached, self.first, 3)
+
+        self.assertEqual(self._attached(), {self.second.event_stream_id})
+
+        projection = ObservationAttachmentProjection.objects.get(
+            event_stream_id=self.complex.event_stream_id
+        )
+        self.assertEqual(projection.attached_count, 1)
+
+    def test_out_of_order_events_replay_the_stream(self):
+        """An event older than the last applied one triggers a replay."""
+        self._event(ObservationAttached, self.first, 5)
+        self._event(ObservationDetached, self.first, 1)
+
+        self.assertEqual(self._attached(), {self.first.event_stream_id})
+
+    def test_detach_wins_over_attach_at_the_same_instant(self):
+        """At equal timestamps a detach is applied after the attach."""
+        self._event(ObservationDetached, self.first, 1)
+        self._event(ObservationAttached, self.first, 1)
+
+        self.assertEqual(self._attached(), set())
+
+    def test_deleting_an_event_replays_the_stream(self):
+        """Removing an attach event drops the attachment."""
+        event = self._event(ObservationAttached, self.first, 1)
+
+        event.delete()
+
+        self.assertEqual(self._attached(), set())
+
+    def test_rebuild_matches_incremental_projection(self):
+        """Rebuilding from history reproduces the maintained projection."""
+        self._event(ObservationAttached, self.first, 1)
+        self._event(ObservationAttached, self.second, 2)
+        self._event(ObservationDetached, self.second, 3)
+        incremental = self._attached()
+
+        ObservationAttachmentProjection.objects.all().delete()
+        rebuild_attachment_projections()
+
+        self.assertEqual(self._attached(), incremental)
+
+    def test_list_annotation_reads_the_projection(self):
+        """with_attached_count reports the number of attached streams."""
+        self._event(ObservationAttached, self.first, 1)
+        self._event(ObservationAttached, self.second, 2)
+
+        counts = dict(
+            Observation.objects.with_attached_count().values_list(
+                "pk", "attached_count"
+            )
+        )
+
+        self.assertEqual(counts[self.complex.pk], 2)
+        self.assertEqual(counts[self.first.pk], 0)
+
+    def test_attach_endpoint_and_attachments_endpoint(self):
+        """Attaching through the API is visible in the attachments endpoint."""
+        response = self.client.post(
+            reverse("public-observation-attach", args=[self.complex.pk]),
+            {"other_observation_id": self.first.pk},
+        )
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get(
+            reverse("public-observation-attachments", args=[self.complex.pk])
+        )
+
+        self.assertEqual(response.json()["count"], 1)
+        self.assertEqual(
+            response.json()["attached_observation_stream_ids"],
+            [str(self.first.event_stream_id)],
+        )
+
+    def test_search_filter_excludes_attached_observations(self):
+        """The attach picker hides the base and already attached observations."""
+        self._event(ObservationAttached, self.first, 1)
+
+        observations = filter_out_attached_observations(
+            Observation.objects.all(), self.complex.pk
+        )
+
+        self.assertEqual(list(observations), [self.second])
+
+
+class ReplayAttachmentsTestCase(TestCase):
+    def test_replay_sorts_changes_by_time(self):
+        """Changes are applied in published order regardless of input order."""
+        stream = "2f1b6a3e-0000-4000-8000-000000000001"
+
+        self.assertEqual(
+            replay_attachments([(2, DETACH, stream), (1, ATTACH, stream)]), set()
+        )
+        self.assertEqual(
+            replay_attachments([(1, DETACH, stream), (2, ATTACH, stream)]), {stream}
+        )
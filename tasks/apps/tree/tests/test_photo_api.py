@@ -30,6 +30,11 @@ class PhotoAPITestCase(APITestCase):
     def setUp(self):
         self._auth()
         self.story = Story.objects.create(user=self.user, title="Trip")
+        # Photo confirms read the original's EXIF; keep that off the network.
+        for name in ("download_bytes", "download_range"):
+            patcher = mock.patch(f"{STORAGE}.{name}", return_value=b"")
+            patcher.start()
+            self.addCleanup(patcher.stop)
 
     def _auth(self, token=None):
         self.client.credentials(HTTP_AUTHORIZATION=f"Token {(token or self.token).key}")
@@ -0,0 +1,247 @@
+from datetime import datetime as datetime_cls
+from datetime import timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from ..models import (
+    EventStreamHead,
+    HabitTracked,
+    MonthlyEventCount,
+    PhotoAdded,
+    Profile,
+    SearchDocument,
+    Statistics,
+    Story,
+    StoryEvent,
+    Thread,
+)
+from ..utils.habit_calendar import VERSION_KEY
+
+PUB_AT = datetime_cls(2026, 5, 25, 14, 30, tzinfo=dt_timezone.utc)
+STORAGE = "tasks.apps.tree.services.photos.storage"
+
+
+class PhotoBatchAPITestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(username="phone", password="x")
+        cls.token = Token.objects.create(user=cls.user)
+        cls.daily, _ = Thread.objects.get_or_create(name="Daily")
+        Profile.objects.create(user=cls.user, default_board_thread=cls.daily)
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.story = Story.objects.create(user=self.user, title="Trip")
+        self.uploaded = set()
+
+        for name, kwargs in [
+            ("download_bytes", {"return_value": b""}),
+            ("download_range", {"return_value": b""}),
+            ("object_exists", {"side_effect": lambda key: key in self.uploaded}),
+            ("list_keys", {"side_effect": lambda prefix: set(self.uploaded)}),
+        ]:
+            patcher = mock.patch(f"{STORAGE}.{name}", **kwargs)
+            self.addCleanup(patcher.stop)
+            setattr(self, name, patcher.start())
+
+    def _key(self, name):
+        return f"trips/{self.user.pk}/{self.story.pk}/{name}.jpg"
+
+    def _photo(self, name, comment="", day=25, **extra):
+        return {
+            "key": self._key(name),
+            "content_type": "image/jpeg",
+            "comment": comment,
+            "published": PUB_AT.replace(day=day).isoformat(),
+            **extra,
+        }
+
+    def _confirm(self, *photos):
+        return self.client.post(
+            reverse("android-trip-photo-batch-confirm"),
+            {"story_id": self.story.pk, "photos": list(photos)},
+            format="json",
+        )
+
+    def _snapshot(self):
+        return [
+            list(
+                PhotoAdded.objects.order_by("original_key").values_list(
+                    "original_key", "published", "word_count", "event_stream_id"
+                )
+            ),
+            sorted(
+                StoryEvent.objects.filter(story=self.story).values_list(
+                    "event__polymorphic_ctype", flat=True
+                )
+            ),
+            HabitTracked.objects.count(),
+            SearchDocument.objects.count(),
+            sorted(
+                Statistics.objects.exclude(key__startswith=VERSION_KEY).values_list(
+                    "key", "value"
+                )
+            ),
+            sorted(MonthlyEventCount.objects.values_list("year", "month", "count")),
+            sorted(
+                EventStreamHead.objects.values_list(
+                    "event_stream_id", "last_event_published"
+                )
+            ),
+        ]
+
+    def test_presign(self):
+        with mock.patch(
+            f"{STORAGE}.presign_put", side_effect=lambda key, ct: f"https://put/{key}"
+        ):
+            response = self.client.post(
+                reverse("android-trip-photo-batch-presign"),
+                {
+                    "story_id": self.story.pk,
+                    "content_types": ["image/jpeg", "image/heic"],
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        uploads = response.json()["uploads"]
+        self.assertEqual(len(uploads), 2)
+        self.assertTrue(uploads[0]["key"].startswith(self._key("")[:-5]))
+        self.assertTrue(uploads[1]["key"].endswith(".heic"))
+        self.assertEqual(uploads[1]["upload_url"], f"https://put/{uploads[1]['key']}")
+
+        response = self.client.post(
+            reverse("android-trip-photo-batch-presign"),
+            {"story_id": self.story.pk, "content_types": ["image/gif"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_confirm_matches_single_confirms(self):
+        photos = [
+            self._photo("a"),
+            self._photo("b", comment="view\n#poi 38.7, -9.1 Lisbon", day=26),
+            self._photo("c", day=3),
+        ]
+        self.uploaded = {photo["key"] for photo in photos}
+
+        for photo in photos:
+            self.client.post(
+                reverse("android-trip-photo-confirm"),
+                {"story_id": self.story.pk, **photo},
+                format="json",
+            )
+
+        single = self._snapshot()
+        PhotoAdded.objects.all().delete()
+        HabitTracked.objects.all().delete()
+
+        response = self._confirm(*photos)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._snapshot(), single)
+        self.list_keys.assert_called_once_with(self._key("")[:-4])
+
+    def test_commented_photos_are_dated_by_their_exif(self):
+        captured = PUB_AT.replace(day=20)
+        photos = [self._photo("a", comment="#poi 38.7, -9.1 Lisbon"), self._photo("b")]
+        self.uploaded = {photo["key"] for photo in photos}
+
+        with mock.patch(
+            "tasks.apps.tree.services.trips.batches.capture_datetime_from_storage",
+            return_value=captured,
+        ) as capture:
+            response = self._confirm(*photos)
+
+        capture.assert_called_once_with(self._key("a"))
+        [commented, plain] = response.json()["photos"]
+        self.assertEqual(
+            PhotoAdded.objects.get(pk=commented["photo_id"]).published, captured
+        )
+        self.assertEqual(PhotoAdded.objects.get(pk=plain["photo_id"]).published, PUB_AT)
+        self.assertEqual(HabitTracked.objects.get().published, captured)
+
+    def test_missing_objects_are_reported_per_photo(self):
+        self.uploaded = {self._key("a")}
+
+        response = self._confirm(self._photo("a"), self._photo("gone"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [found, missing] = response.json()["photos"]
+        self.assertEqual(
+            PhotoAdded.objects.get(pk=found["photo_id"]).original_key, self._key("a")
+        )
+        self.assertEqual(missing["key"], self._key("gone"))
+        self.assertIn("error", missing)
+        self.assertEqual(PhotoAdded.objects.count(), 1)
+
+    def test_idempotency_keys_make_retries_safe(self):
+        self.uploaded = {self._key("a"), self._key("b")}
+        photos = [
+            self._photo("a", idempotency_key="ph-a"),
+            self._photo("b", idempotency_key="ph-b"),
+        ]
+
+        first = self._confirm(*photos).json()["photos"]
+        second = self._confirm(*photos, self._photo("a", idempotency_key="ph-a"))
+
+        self.assertEqual(second.json()["photos"], first + first[:1])
+        self.assertEqual(PhotoAdded.objects.count(), 2)
+        self.assertEqual(StoryEvent.objects.count(), 2)
+        # Nothing new to confirm: no listing of the bucket
+        self.list_keys.assert_called_once()
+
+    def test_thumbnails_are_enqueued_as_one_group(self):
+        self.uploaded = {self._key("a"), self._key("b")}
+
+        with mock.patch("celery.group") as group:
+            with self.captureOnCommitCallbacks(execute=True):
+                photos = self._confirm(self._photo("a"), self._photo("b"))
+
+        [signatures] = group.call_args.args
+        self.assertEqual(
+            [signature.args for signature in signatures],
+            [(photo["photo_id"],) for photo in photos.json()["photos"]],
+        )
+        group.return_value.delay.assert_called_once_with()
+
+    def test_query_count_does_not_grow_with_the_photos(self):
+        self.uploaded = {self._key(name) for name in "abcdefgh"}
+
+        # The first photo of the month creates the statistics rows
+        self._confirm(self._photo("a"))
+
+        with CaptureQueriesContext(connection) as context:
+            self._confirm(self._photo("b"))
+
+        with self.assertNumQueries(len(context.captured_queries)):
+            response = self._confirm(*(self._photo(name) for name in "cdefgh"))
+
+        self.assertEqual(len(response.json()["photos"]), 6)
+
+    def test_stopped_story_409(self):
+        self.uploaded = {self._key("a")}
+        self.story.stopped = PUB_AT
+        self.story.save(update_fields=["stopped"])
+
+        response = self._confirm(self._photo("a"))
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_invalid_photo_rejects_the_batch(self):
+        self.uploaded = {self._key("a")}
+
+        response = self._confirm(self._photo("a"), {"key": self._key("b")})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("photos[1]", response.json()["error"])
+        self.assertEqual(PhotoAdded.objects.count(), 0)
@@ -0,0 +1,94 @@
+import io
+import struct
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.test import SimpleTestCase
+
+from PIL import Image
+from pillow_heif import register_heif_opener
+
+from ..services.photos import read_capture_datetime_ranged
+from ..services.photos.metadata import HEADER_CHUNK, HEADER_LIMIT
+
+register_heif_opener()
+
+TAKEN = datetime(2021, 7, 15, 9, 30, 0, tzinfo=dt_timezone.utc)
+
+
+def _image_with_exif(format, size=(64, 48)):
+    img = Image.new("RGB", size, "red")
+    exif = img.getexif()
+    exif.get_ifd(0x8769)[0x9003] = "2021:07:15 09:30:00"
+    exif.get_ifd(0x8769)[0x9011] = "+00:00"
+
+    buf = io.BytesIO()
+    img.save(buf, format, exif=exif.tobytes())
+    return buf.getvalue()
+
+
+def _with_segment_before_exif(jpeg, length):
+    """Insert an APP15 segment of ``length`` bytes right after SOI"""
+    segment = b"\xff\xef" + struct.pack(">H", length + 2) + b"\x00" * length
+    return jpeg[:2] + segment + jpeg[2:]
+
+
+class RangedCaptureDatetimeTestCase(SimpleTestCase):
+    def _read(self, data):
+        self.ranges = []
+        self.full_downloads = 0
+
+        def read_range(start, end):
+            self.ranges.append((start, end))
+            return data[start : end + 1]
+
+        def read_all():
+            self.full_downloads += 1
+            return data
+
+        return read_capture_datetime_ranged(read_range, read_all)
+
+    def test_jpeg_reads_one_range(self):
+        self.assertEqual(self._read(_image_with_exif("JPEG")), TAKEN)
+        self.assertEqual(self.ranges, [(0, HEADER_CHUNK - 1)])
+        self.assertEqual(self.full_downloads, 0)
+
+    def test_jpeg_grows_the_range_to_reach_exif(self):
+        jpeg = _with_segment_before_exif(_image_with_exif("JPEG"), 65000)
+        jpeg = _with_segment_before_exif(jpeg, 1000)
+        jpeg += b"\x00" * HEADER_CHUNK * 4
+
+        self.assertEqual(self._read(jpeg), TAKEN)
+        self.assertEqual(
+            self.ranges, [(0, HEADER_CHUNK - 1), (HEADER_CHUNK, 2 * HEADER_CHUNK - 1)]
+        )
+        self.assertEqual(self.full_downloads, 0)
+
+    def test_heif(self):
+        self.assertEqual(self._read(_image_with_exif("HEIF")), TAKEN)
+        self.assertEqual(len(self.ranges), 1)
+        self.assertEqual(self.full_downloads, 0)
+
+    def test_jpeg_without_exif(self):
+        buf = io.BytesIO()
+        Image.new("RGB", (8, 8)).save(buf, "JPEG")
+
+        self.assertIsNone(self._read(buf.getvalue()))
+        self.assertEqual(self.full_downloads, 0)
+
+    def test_other_formats_are_downloaded(self):
+        self.assertEqual(self._read(_image_with_exif("PNG")), TAKEN)
+        self.assertEqual(self.full_downloads, 1)
+
+    def test_headers_past_the_limit_are_downloaded(self):
+        jpeg = _with_segment_before_exif(_image_with_exif("JPEG"), 65000)
+
+        for _ in range(HEADER_LIMIT // 65000):
+            jpeg = _with_segment_before_exif(jpeg, 65000)
+
+        self.assertEqual(self._read(jpeg), TAKEN)
+        self.assertEqual(self.full_downloads, 1)
+
+    def test_garbage(self):
+        self.assertIsNone(self._read(b"\xff\xd8\xff\xe1\x00"))
+        self.assertIsNone(self._read(b""))
@@ -0,0 +1,146 @@
+import threading
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..middleware import PhotoStorageCountsMiddleware
+from ..services.photos import storage
+
+
+class PhotoStorageClientsTestCase(SimpleTestCase):
+    def setUp(self):
+        storage.reset_clients()
+        self.addCleanup(storage.reset_clients)
+
+    def test_clients_are_built_once_per_endpoint(self):
+        with storage.counting() as counts:
+            storage.presign_get("a.jpg", expires=60)
+            storage.presign_get_web("a.jpg", expires=60)
+
+        self.assertIn(counts["clients"], (1, 2))
+
+        with storage.counting() as counts:
+            for _ in range(3):
+                storage.presign_get("a.jpg", expires=60)
+                storage.presign_get_web("a.jpg", expires=60)
+
+        self.assertEqual(counts, {"presign_get": 6})
+        self.assertIs(storage._public_client(), storage._public_client())
+
+    def test_changed_settings_build_a_new_client(self):
+        client = storage._internal_client()
+
+        with override_settings(AWS_S3_MAX_POOL_CONNECTIONS=3):
+            pooled = storage._internal_client()
+
+        self.assertIsNot(pooled, client)
+        self.assertEqual(pooled.meta.config.max_pool_connections, 3)
+
+    def test_threads_share_one_client(self):
+        built = []
+        barrier = threading.Barrier(8)
+        session = storage.boto3.session.Session
+
+        def build(*args, **kwargs):
+            built.append(1)
+            return session(*args, **kwargs)
+
+        def use():
+            barrier.wait()
+            clients.append(storage._internal_client())
+
+        clients = []
+        threads = [threading.Thread(target=use) for _ in range(8)]
+
+        with mock.patch.object(storage.boto3.session, "Session", side_effect=build):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(built), 1)
+        self.assertEqual(len({id(client) for client in clients}), 1)
+
+    def test_middleware_logs_counts_of_the_request(self):
+        def view(request):
+            storage.presign_get("a.jpg")
+            storage.presign_get("a.jpg")
+            return HttpResponse()
+
+        middleware = PhotoStorageCountsMiddleware(view)
+
+        with self.assertLogs("tasks.apps.tree.middleware", "DEBUG") as logs:
+            middleware(RequestFactory().get("/trips/1/"))
+
+        [message] = logs.output
+        self.assertIn("GET /trips/1/", message)
+        self.assertIn("clients=1, presign_get=1, presign_get_cached=1", message)
+
+        with self.assertNoLogs("tasks.apps.tree.middleware", "DEBUG"):
+            PhotoStorageCountsMiddleware(lambda request: HttpResponse())(
+                RequestFactory().get("/")
+            )
+
+
+@override_settings(PHOTO_PRESIGN_GET_TTL=3600, PHOTO_PRESIGN_GET_MARGIN=900)
+class PresignedURLCacheTestCase(SimpleTestCase):
+    # The start of a signing bucket (a multiple of 2700 seconds)
+    START = 2700 * 660000
+
+    def setUp(self):
+        storage.reset_clients()
+        self.addCleanup(storage.reset_clients)
+
+    def _at(self, seconds):
+        return mock.patch.object(storage.time, "time", return_value=seconds)
+
+    def _query(self, url):
+        return {name: value for name, [value] in parse_qs(urlsplit(url).query).items()}
+
+    def test_urls_are_reused_within_a_bucket(self):
+        with self._at(self.START + 10), storage.counting() as counts:
+            url = storage.presign_get("a.jpg")
+            self.assertEqual(storage.presign_get("a.jpg"), url)
+            self.assertNotEqual(storage.presign_get("b.jpg"), url)
+            self.assertNotEqual(storage.presign_get_web("a.jpg"), url)
+
+        self.assertEqual(counts["presign_get"], 3)
+        self.assertEqual(counts["presign_get_cached"], 1)
+
+        # Signed again by another process later in the bucket: the same URL.
+        storage.reset_clients()
+
+        with self._at(self.START + 2699):
+            self.assertEqual(storage.presign_get("a.jpg"), url)
+
+        with self._at(self.START + 2700):
+            self.assertNotEqual(storage.presign_get("a.jpg"), url)
+
+    def test_urls_are_valid_for_at_least_the_margin(self):
+        for offset in (0, 1000, 2699):
+            storage.reset_clients()
+
+            with self._at(self.START + offset):
+                query = self._query(storage.presign_get("a.jpg"))
+
+            signed_at = (
+                datetime.strptime(query["X-Amz-Date"], "%Y%m%dT%H%M%SZ")
+                .replace(tzinfo=dt_timezone.utc)
+                .timestamp()
+            )
+            expires = signed_at + int(query["X-Amz-Expires"])
+
+            self.assertEqual(signed_at, self.START)
+            self.assertGreaterEqual(expires - (self.START + offset), 900)
+
+    def test_explicit_expiry_is_not_cached(self):
+        with self._at(self.START), storage.counting() as counts:
+            storage.presign_get("a.jpg", expires=60)
+            url = storage.presign_get("a.jpg", expires=60)
+
+        self.assertEqual(counts["presign_get"], 2)
+        self.assertEqual(self._query(url)["X-Amz-Expires"], "60")
@@ -1,4 +1,5 @@
 import io
+from datetime import timedelta
 from unittest import mock
 
 from django.contrib.auth import get_user_model
@@ -6,8 +7,10 @@ from django.test import TestCase
 from django.utils import timezone
 
 from PIL import Image
+from PIL.JpegImagePlugin import JpegImageFile
 
-from ..models import PhotoAdded, Thread
+from ..models import PhotoAdded, Story, StoryEvent, Thread
+from ..services.photos import renditions
 from ..tasks import generate_photo_thumbnail
 
 STORAGE = "tasks.apps.tree.services.photos.storage"
@@ -19,6 +22,12 @@ def _png_bytes(size=(1200, 800)):
     return buf.getvalue()
 
 
+def _jpeg_bytes(size=(4000, 3000)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, (10, 120, 200)).save(buf, "JPEG")
+    return buf.getvalue()
+
+
 class ThumbnailTaskTestCase(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -27,12 +36,13 @@ class ThumbnailTaskTestCase(TestCase):
         cls.daily, _ = Thread.objects.get_or_create(name="Daily")
 
     def _photo(self):
+        self.published = timezone.now()
         return PhotoAdded.objects.create(
             thread=self.daily,
             comment="",
             original_key="trips/1/1/abc.jpg",
             content_type="image/jpeg",
-            published=timezone.now(),
+            published=self.published,
         )
 
     @mock.patch(f"{STORAGE}.upload_bytes")
@@ -46,12 +56,85 @@ class ThumbnailTaskTestCase(TestCase):
         # Longest edge clamped to the configured max (default 480).
         self.assertLessEqual(max(photo.width, photo.height), 480)
 
-        # Uploaded as WebP under the derived key.
-        up.assert_called_once()
-        called_key, called_data, called_ct = up.call_args.args
-        self.assertEqual(called_key, "trips/1/1/abc_thumb.webp")
-        self.assertEqual(called_ct, "image/webp")
-        self.assertEqual(Image.open(io.BytesIO(called_data)).format, "WEBP")
+        # Every rendition uploaded as WebP under its derived key.
+        uploads = {call.args[0]: call.args[1:] for call in up.call_args_list}
+        self.assertEqual(
+            set(uploads),
+            {
+                "trips/1/1/abc_tiny.webp",
+                "trips/1/1/abc_thumb.webp",
+                "trips/1/1/abc_display.webp",
+            },
+        )
+        for data, content_type in uploads.values():
+            self.assertEqual(content_type, "image/webp")
+            self.assertEqual(Image.open(io.BytesIO(data)).format, "WEBP")
+
+    @mock.patch(f"{STORAGE}.upload_bytes")
+    @mock.patch(f"{STORAGE}.download_bytes", return_value=_jpeg_bytes())
+    def test_records_renditions_from_one_download(self, dl, up):
+        photo = self._photo()
+
+        with mock.patch.object(
+            JpegImageFile, "draft", autospec=True, side_effect=JpegImageFile.draft
+        ) as draft:
+            generate_photo_thumbnail.apply(args=[photo.pk]).get()
+
+        dl.assert_called_once_with("trips/1/1/abc.jpg")
+        # Decoded at a reduced scale, just large enough for the display size.
+        draft.assert_called_once()
+        self.assertEqual(draft.call_args.args[2], (1600, 1200))
+
+        photo.refresh_from_db()
+        self.assertEqual(
+            photo.renditions,
+            {
+                "tiny": {"key": "trips/1/1/abc_tiny.webp", "width": 32, "height": 24},
+                "thumb": {
+                    "key": "trips/1/1/abc_thumb.webp",
+                    "width": 480,
+                    "height": 360,
+                },
+                "display": {
+                    "key": "trips/1/1/abc_display.webp",
+                    "width": 1600,
+                    "height": 1200,
+                },
+            },
+        )
+        self.assertEqual((photo.width, photo.height), (480, 360))
+        # A photo without a story keeps its time without EXIF.
+        self.assertEqual(photo.published, self.published)
+
+    @mock.patch(f"{STORAGE}.upload_bytes")
+    def test_trip_photo_keeps_a_comment_edited_while_rendering(self, up):
+        photo = self._photo()
+        story = Story.objects.create(user=self.user, title="Trip")
+        StoryEvent.objects.create(story=story, event=photo)
+        captured = self.published - timedelta(days=2)
+
+        def download_while_editing(key):
+            PhotoAdded.objects.filter(pk=photo.pk).update(comment="Edited meanwhile")
+            return _png_bytes()
+
+        def render_with_capture_time(raw, sizes):
+            _, rendered = render_renditions(raw, sizes)
+            return captured, rendered
+
+        render_renditions = renditions.render_renditions
+
+        with (
+            mock.patch(f"{STORAGE}.download_bytes", side_effect=download_while_editing),
+            mock.patch.object(
+                renditions, "render_renditions", side_effect=render_with_capture_time
+            ),
+        ):
+            generate_photo_thumbnail.apply(args=[photo.pk]).get()
+
+        photo.refresh_from_db()
+        self.assertEqual(photo.comment, "Edited meanwhile")
+        self.assertEqual(photo.published, captured)
+        self.assertEqual(photo.thumbnail_key, "trips/1/1/abc_thumb.webp")
 
     @mock.patch(f"{STORAGE}.upload_bytes")
     @mock.patch(f"{STORAGE}.download_bytes", return_value=_png_bytes())
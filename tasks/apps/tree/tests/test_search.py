@@ -0,0 +1,188 @@
+import datetime
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from ..models import (
+    InsightRefined,
+    JournalAdded,
+    Observation,
+    ObservationClosed,
+    ObservationType,
+    SearchDocument,
+    Thread,
+)
+from ..services.search.documents import rebuild_search_documents
+from ..utils.db import pk_prefix_q
+
+postgres_only = unittest.skipUnless(
+    connection.vendor == "postgresql", "full-text search requires PostgreSQL"
+)
+
+
+class SearchDocumentTestCase(TestCase):
+    """Search documents follow the objects they index."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="user")
+        self.thread = Thread.objects.create(name="big-picture")
+        self.type = ObservationType.objects.create(
+            name="Observation", slug="observation"
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _observation(self, situation="", interpretation="", approach=""):
+        return Observation.objects.create(
+            pub_date=datetime.date(2024, 1, 1),
+            user=self.user,
+            thread=self.thread,
+            type=self.type,
+            situation=situation,
+            interpretation=interpretation,
+            approach=approach,
+        )
+
+    def _journal(self, comment):
+        return JournalAdded.objects.create(
+            comment=comment,
+            thread=self.thread,
+            published=timezone.make_aware(datetime.datetime(2024, 1, 2, 12)),
+        )
+
+    def _document(self, kind, instance):
+        return SearchDocument.objects.get(kind=kind, object_id=instance.pk)
+
+    def _snapshot(self):
+        return sorted(
+            SearchDocument.objects.values_list(
+                "kind", "object_id", "event_stream_id", "pub_date", "title", "text"
+            )
+        )
+
+    def test_saving_an_observation_writes_its_document(self):
+        """Situation is the title, interpretation and approach the text."""
+        observation = self._observation("Late again", "Felt rushed", "Leave early")
+
+        document = self._document(SearchDocument.Kind.OBSERVATION, observation)
+
+        self.assertEqual(document.title, "Late again")
+        self.assertEqual(document.text, "Felt rushed\nLeave early")
+        self.assertEqual(document.event_stream_id, observation.event_stream_id)
+
+        observation.situation = "On time"
+        observation.save()
+
+        document.refresh_from_db()
+        self.assertEqual(document.title, "On time")
+
+    def test_events_are_indexed_by_kind(self):
+        """Closed observations, insights and journal entries get documents."""
+        observation = self._observation("Late again", approach="Leave early")
+        closed = ObservationClosed.from_observation(observation)
+        closed.save()
+        insight = InsightRefined.from_observation_closed(closed, approach="Plan")
+        insight.save()
+        journal = self._journal("Walked the dog")
+
+        self.assertEqual(
+            self._document(SearchDocument.Kind.OBSERVATION_CLOSED, closed).title,
+            "Late again",
+        )
+        self.assertEqual(
+            self._document(SearchDocument.Kind.INSIGHT, insight).text, "Plan"
+        )
+        self.assertEqual(
+            self._document(SearchDocument.Kind.JOURNAL, journal).pub_date,
+            datetime.date(2024, 1, 2),
+        )
+
+    def test_deleting_removes_the_document(self):
+        """Deleted objects leave no document behind."""
+        observation = self._observation("Late again")
+        journal = self._journal("Walked the dog")
+
+        observation.delete()
+        journal.delete()
+
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_rebuild_matches_incremental_documents(self):
+        """Rebuilding from the source tables reproduces the maintained rows."""
+        self._observation("Late again", "Felt rushed")
+        self._journal("Walked the dog")
+        self._journal("Rain").delete()
+
+        incremental = self._snapshot()
+        rebuild_search_documents()
+
+        self.assertEqual(self._snapshot(), incremental)
+
+    def test_search_requires_a_query(self):
+        response = self.client.get(reverse("search"))
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_rejects_unknown_kinds(self):
+        response = self.client.get(reverse("search"), {"q": "dog", "kind": "plan"})
+
+        self.assertEqual(response.status_code, 400)
+
+    @postgres_only
+    def test_search_ranks_title_matches_first(self):
+        """Matches in the title outrank matches in the remaining text."""
+        in_text = self._observation("Morning", approach="walk the dog")
+        journal = self._journal("Walked the dog")
+
+        response = self.client.get(reverse("search"), {"q": "dog"})
+
+        results = [
+            (row["kind"], row["object_id"]) for row in response.json()["results"]
+        ]
+        self.assertEqual(
+            results, [("journal", journal.pk), ("observation", in_text.pk)]
+        )
+
+    @postgres_only
+    def test_search_filters_by_kind(self):
+        self._observation("The dog barked")
+        journal = self._journal("Walked the dog")
+
+        response = self.client.get(reverse("search"), {"q": "dog", "kind": "journal"})
+
+        self.assertEqual(
+            [row["object_id"] for row in response.json()["results"]], [journal.pk]
+        )
+
+
+class PkPrefixTestCase(TestCase):
+    def setUp(self):
+        self.thread = Thread.objects.create(name="big-picture")
+
+        for _ in range(125):
+            Thread.objects.create(name="filler")
+
+    def _matching(self, prefix):
+        return sorted(
+            Thread.objects.filter(pk_prefix_q(Thread, prefix)).values_list(
+                "pk", flat=True
+            )
+        )
+
+    def test_matches_keys_starting_with_the_prefix(self):
+        """The ranges cover the same keys as a textual prefix match."""
+        pks = Thread.objects.values_list("pk", flat=True)
+
+        for prefix in ["1", "12", str(self.thread.pk)]:
+            expected = sorted(pk for pk in pks if str(pk).startswith(prefix))
+            self.assertEqual(self._matching(prefix), expected)
+
+    def test_leading_zero_matches_nothing(self):
+        self.assertEqual(self._matching("0"), [])
@@ -16,6 +16,7 @@ from ..services.photos import (
     presign_standalone_photo,
 )
 from ..services.trips import StoryNotFoundError, presign_photo_original
+from ..tasks import generate_photo_thumbnail
 
 STORAGE = "tasks.apps.tree.services.photos.storage"
 
@@ -119,7 +120,14 @@ class StandalonePhotoServiceTestCase(TestCase):
                 content_type="image/jpeg",
                 published=added_at,
             )
+
+            # Neither does the thumbnail task, which reads the EXIF too.
+            with mock.patch(f"{STORAGE}.upload_bytes"):
+                generate_photo_thumbnail.apply(args=[photo.pk]).get()
+
+        photo.refresh_from_db()
         self.assertEqual(photo.published, added_at)
+        self.assertIsNotNone(photo.thumbnail_key)
 
     @mock.patch(f"{STORAGE}.object_exists", return_value=True)
     def test_add_standalone_photo_idempotency_returns_same_photo(self, _exists):
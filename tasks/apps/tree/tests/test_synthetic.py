@@ -0,0 +1,200 @@
+import datetime
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import (
+    Event,
+    EventStreamHead,
+    HabitDayCount,
+    HabitTracked,
+    JournalAdded,
+    MonthlyEventCount,
+    Observation,
+    ObservationAttachmentProjection,
+    PhotoAdded,
+    Plan,
+    Reflection,
+    SearchDocument,
+    Statistics,
+    Story,
+    Thread,
+    observation_event_types,
+)
+from ..services.synthetic.generator import SyntheticDataset
+from ..utils.db import bulk_create_inherited
+
+END = datetime.date(2024, 6, 30)
+
+
+class BulkCreateInheritedTestCase(TestCase):
+    def test_inserts_every_table_of_the_chain(self):
+        """PhotoAdded rows land in tree_event, tree_journaladded and its own."""
+        thread = Thread.objects.create(name="Daily")
+        published = timezone.make_aware(datetime.datetime(2024, 1, 1, 12))
+
+        photos = bulk_create_inherited(
+            PhotoAdded,
+            [
+                PhotoAdded(
+                    thread=thread,
+                    published=published,
+                    event_stream_id=Event._meta.get_field("event_stream_id").to_python(
+                        "6f1f3c1e-5d0a-4c1a-9d59-0d6f8b0f6a0%d" % index
+                    ),
+                    comment=f"Photo {index}",
+                    original_key=f"photos/1/{index}.jpg",
+                    content_type="image/jpeg",
+                )
+                for index in range(3)
+            ],
+            batch_size=2,
+        )
+
+        self.assertEqual(
+            list(Event.objects.order_by("pk")),
+            list(PhotoAdded.objects.order_by("pk")),
+        )
+        self.assertEqual(
+            [event.comment for event in Event.objects.order_by("pk")],
+            ["Photo 0", "Photo 1", "Photo 2"],
+        )
+        self.assertEqual(
+            sorted(JournalAdded.objects.values_list("pk", flat=True)),
+            [photo.pk for photo in photos],
+        )
+
+
+class SyntheticDatasetTestCase(TestCase):
+    """Bulk generated data matches what saving through the ORM produces."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="synthetic")
+
+        # Created up front so their ids survive rolling generated data back
+        for name in ("Daily", "Weekly", "big-picture"):
+            Thread.objects.create(name=name)
+
+    def _generate(self, user=None, seed=0):
+        return SyntheticDataset(
+            user or self.user, seed=seed, scale=0.2, years=1, end=END
+        ).generate()
+
+    def _events(self):
+        return list(
+            Event.objects.non_polymorphic()
+            .order_by("published", "word_count")
+            .values_list(
+                "polymorphic_ctype_id", "published", "event_stream_id", "word_count"
+            )
+        )
+
+    def _read_models(self):
+        return [
+            sorted(Statistics.objects.values_list("key", "value")),
+            sorted(
+                MonthlyEventCount.objects.values_list(
+                    "year", "month", "content_type_id", "count"
+                )
+            ),
+            sorted(
+                EventStreamHead.objects.values_list(
+                    "event_stream_id", "last_event_published"
+                )
+            ),
+            sorted(
+                ObservationAttachmentProjection.objects.values_list(
+                    "event_stream_id", "attached_stream_ids"
+                )
+            ),
+            sorted(SearchDocument.objects.values_list("kind", "object_id", "text")),
+            sorted(
+                HabitDayCount.objects.values_list(
+                    "habit_id", "date", "occurred", "skipped"
+                )
+            ),
+        ]
+
+    def test_generates_every_kind_of_row(self):
+        counts = self._generate()
+
+        for name in [
+            "JournalAdded",
+            "HabitTracked",
+            "ObservationMade",
+            "ObservationClosed",
+            "ObservationAttached",
+            "BoardCommitted",
+            "PhotoAdded",
+            "Observation",
+            "Story",
+        ]:
+            self.assertGreater(counts[name], 0, name)
+
+        self.assertEqual(
+            Event.objects.count(),
+            sum(
+                count
+                for name, count in counts.items()
+                if name not in {"Observation", "Story", "Plan", "Reflection", "Board"}
+            ),
+        )
+        self.assertTrue(HabitTracked.objects.filter(occured=False).exists())
+        self.assertTrue(Story.objects.filter(entries__isnull=False).exists())
+
+    def test_rows_match_what_the_signals_set(self):
+        """Saving every row again changes neither the rows nor the read models."""
+        self._generate()
+
+        events, read_models = self._events(), self._read_models()
+
+        open_streams = set(
+            Observation.objects.values_list("event_stream_id", flat=True)
+        )
+
+        for event in Event.objects.all():
+            # Events of closed observations cannot be saved again
+            if (
+                isinstance(event, observation_event_types)
+                and event.event_stream_id not in open_streams
+            ):
+                continue
+
+            event.save()
+
+        for observation in Observation.objects.all():
+            observation.save()
+
+        self.assertEqual(self._events(), events)
+        self.assertEqual(self._read_models(), read_models)
+
+    def test_same_seed_generates_the_same_data(self):
+        savepoint = transaction.savepoint()
+        self._generate()
+        first = self._events()
+        transaction.savepoint_rollback(savepoint)
+
+        self.assertFalse(Event.objects.exists())
+
+        self._generate()
+
+        self.assertEqual(self._events(), first)
+
+    def test_generating_again_keeps_one_plan_and_reflection_a_day(self):
+        self._generate()
+        plans = Plan.objects.count()
+
+        counts = self._generate(
+            get_user_model().objects.create_user(username="again"), seed=1
+        )
+
+        self.assertEqual(counts["Plan"], 0)
+        self.assertEqual(counts["Reflection"], 0)
+
+        for model in (Plan, Reflection):
+            days = Counter(model.objects.values_list("pub_date", "thread_id"))
+            self.assertEqual(len(days), plans)
+            self.assertEqual(max(days.values()), 1)
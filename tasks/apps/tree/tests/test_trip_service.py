@@ -38,6 +38,7 @@ from ..services.trips import (
     unshare_trip,
     update_trip,
 )
+from ..tasks import generate_photo_thumbnail
 
 STORAGE = "tasks.apps.tree.services.photos.storage"
 
@@ -329,12 +330,13 @@ class TripPhotoServiceTestCase(TestCase):
 
     def setUp(self):
         # Confirm reads the uploaded original's EXIF for the capture time; keep
-        # that download hermetic by default (no real S3, empty bytes -> no EXIF
+        # those reads hermetic by default (no real S3, empty bytes -> no EXIF
         # -> the provided ``published`` is used unchanged). Individual tests
-        # override ``download_bytes`` to supply EXIF-bearing image bytes.
-        patcher = mock.patch(f"{STORAGE}.download_bytes", return_value=b"")
-        patcher.start()
-        self.addCleanup(patcher.stop)
+        # override them to supply EXIF-bearing image bytes.
+        for name in ("download_bytes", "download_range"):
+            patcher = mock.patch(f"{STORAGE}.{name}", return_value=b"")
+            patcher.start()
+            self.addCleanup(patcher.stop)
 
     @mock.patch(f"{STORAGE}.presign_put", return_value="https://put.example/x")
     def test_presign_allocates_key_under_user_story_prefix(self, _put):
@@ -528,7 +530,13 @@ class TripPhotoServiceTestCase(TestCase):
         story = start_trip(self.alice)
         upload_time = timezone.now()
         jpeg = self._jpeg_with_exif_datetime("2021:07:15 09:30:00")
-        with mock.patch(f"{STORAGE}.download_bytes", return_value=jpeg):
+        with (
+            mock.patch(
+                f"{STORAGE}.download_range",
+                side_effect=lambda key, start, end: jpeg[start : end + 1],
+            ),
+            mock.patch(f"{STORAGE}.download_bytes") as dl,
+        ):
             photo = add_trip_photo(
                 self.alice,
                 story.pk,
@@ -537,9 +545,38 @@ class TripPhotoServiceTestCase(TestCase):
                 content_type="image/jpeg",
                 published=upload_time,
             )
-        # The EXIF capture time wins over the upload time.
+        # The EXIF capture time wins over the upload time, read without
+        # downloading the whole original.
+        expected = datetime_cls(2021, 7, 15, 9, 30, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(photo.published, expected)
+        dl.assert_not_called()
+
+    @mock.patch(f"{STORAGE}.upload_bytes")
+    @mock.patch(f"{STORAGE}.object_exists", return_value=True)
+    def test_thumbnail_task_moves_trip_photo_to_exif_capture_time(self, _exists, _up):
+        story = start_trip(self.alice)
+        upload_time = timezone.now()
+        # Confirm could not read the header (default empty ranges).
+        photo = add_trip_photo(
+            self.alice,
+            story.pk,
+            key=f"trips/{self.alice.pk}/{story.pk}/abc.jpg",
+            comment="sunset",
+            content_type="image/jpeg",
+            published=upload_time,
+        )
+        self.assertEqual(photo.published, upload_time)
+
+        jpeg = self._jpeg_with_exif_datetime("2021:07:15 09:30:00")
+        with mock.patch(f"{STORAGE}.download_bytes", return_value=jpeg):
+            generate_photo_thumbnail.apply(args=[photo.pk]).get()
+
+        photo.refresh_from_db()
         expected = datetime_cls(2021, 7, 15, 9, 30, 0, tzinfo=dt_timezone.utc)
         self.assertEqual(photo.published, expected)
+        self.assertEqual(
+            photo.thumbnail_key, f"trips/{self.alice.pk}/{story.pk}/abc_thumb.webp"
+        )
 
     @mock.patch(f"{STORAGE}.object_exists", return_value=True)
     def test_add_trip_photo_falls_back_to_published_without_exif(self, _exists):
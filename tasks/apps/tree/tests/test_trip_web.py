@@ -38,6 +38,11 @@ class TripWebTestCase(TestCase):
     def setUp(self):
         self.client.force_login(self.user)
         self.story = Story.objects.create(user=self.user, title="Lisbon weekend")
+        # Photo confirms read the original's EXIF; keep that off the network.
+        for name in ("download_bytes", "download_range"):
+            patcher = mock.patch(f"{STORAGE}.{name}", return_value=b"")
+            patcher.start()
+            self.addCleanup(patcher.stop)
 
     def _note(self, comment, story=None, published=None):
         note = JournalAdded.objects.create(
@@ -0,0 +1,156 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import (
+    Event,
+    JournalAdded,
+    Observation,
+    ObservationType,
+    Plan,
+    Statistics,
+    Thread,
+)
+from ..utils.statistics import (
+    calculate_total_word_count,
+    update_all_word_count_statistics,
+    word_count_key,
+)
+
+
+class WordCountStatisticsTestCase(TestCase):
+    """Word count statistics are maintained incrementally on save/delete."""
+
+    def setUp(self):
+        self.daily = Thread.objects.create(name="Daily")
+        self.weekly = Thread.objects.create(name="Weekly")
+        self.published = timezone.make_aware(datetime.datetime(2024, 5, 1, 12))
+
+    def _stat(self, year=None, thread=None):
+        key = word_count_key(year=year, thread_id=thread.pk if thread else None)
+        return Statistics.objects.get(key=key).value
+
+    def _journal(self, comment, thread=None, published=None):
+        return JournalAdded.objects.create(
+            comment=comment,
+            thread=thread or self.daily,
+            published=published or self.published,
+        )
+
+    def test_word_count_is_stored_on_the_event(self):
+        """Saving an event stores the number of words in its text fields."""
+        journal = self._journal("one two  three\nfour")
+
+        self.assertEqual(journal.word_count, 4)
+        self.assertEqual(Event.objects.get(pk=journal.pk).word_count, 4)
+
+    def test_creating_an_event_updates_total_year_and_thread_statistics(self):
+        """A new event is folded into the total, year and thread rows."""
+        self._journal("one two three")
+        self._journal("four five", thread=self.weekly)
+
+        self.assertEqual(self._stat(), 5)
+        self.assertEqual(self._stat(year=2024), 5)
+        self.assertEqual(self._stat(thread=self.daily), 3)
+        self.assertEqual(self._stat(year=2024, thread=self.weekly), 2)
+
+    def test_editing_an_event_applies_the_difference(self):
+        """Updating text applies only the delta to existing rows."""
+        journal = self._journal("one two three")
+
+        journal.comment = "one"
+        journal.save()
+
+        self.assertEqual(self._stat(), 1)
+        self.assertEqual(self._stat(year=2024, thread=self.daily), 1)
+
+    def test_saving_only_the_text_recounts_its_words(self):
+        """update_fields naming a text field stores the new count too."""
+        journal = self._journal("one two three")
+
+        journal.comment = "one"
+        journal.save(update_fields=["comment"])
+
+        self.assertEqual(self._stat(), 1)
+        self.assertEqual(Event.objects.get(pk=journal.pk).word_count, 1)
+
+    def test_moving_an_event_to_another_year_moves_its_words(self):
+        """Changing the published year moves the count between year rows."""
+        journal = self._journal("one two three")
+
+        journal.published = timezone.make_aware(datetime.datetime(2023, 5, 1, 12))
+        journal.save()
+
+        self.assertEqual(self._stat(), 3)
+        self.assertEqual(self._stat(year=2024), 0)
+        self.assertEqual(self._stat(year=2023), 3)
+
+    def test_deleting_an_event_subtracts_its_words_once(self):
+        """Deleting an event subclass subtracts its words exactly once."""
+        self._journal("one two")
+        journal = self._journal("three four five")
+
+        journal.delete()
+
+        self.assertEqual(self._stat(), 2)
+        self.assertEqual(self._stat(year=2024, thread=self.daily), 2)
+
+    def test_plans_are_counted_under_their_pub_date(self):
+        """Plan focus text counts under the plan's pub_date year."""
+        Plan.objects.create(
+            pub_date=datetime.date(2022, 1, 3), thread=self.daily, focus="a b c"
+        )
+
+        self.assertEqual(self._stat(), 3)
+        self.assertEqual(self._stat(year=2022), 3)
+
+    def test_observation_thread_change_moves_words_between_threads(self):
+        """Re-threading an observation stream moves its words with it."""
+        user = get_user_model().objects.create_user(username="user")
+        observation_type = ObservationType.objects.create(
+            name="Observation", slug="observation"
+        )
+        observation = Observation.objects.create(
+            pub_date=datetime.date(2024, 5, 1),
+            user=user,
+            thread=self.daily,
+            type=observation_type,
+        )
+        JournalAdded.objects.create(
+            comment="one two",
+            thread=self.daily,
+            published=self.published,
+            event_stream_id=observation.event_stream_id,
+        )
+        # JournalAdded sets its own stream id; re-key it onto the observation.
+        Event.objects.update(event_stream_id=observation.event_stream_id)
+
+        observation.thread = self.weekly
+        observation.save()
+
+        self.assertEqual(self._stat(thread=self.daily), 0)
+        self.assertEqual(self._stat(thread=self.weekly), 2)
+        self.assertEqual(self._stat(), 2)
+
+    def test_rebuild_recounts_stale_rows(self):
+        """--rebuild mode recomputes per-row counts and all statistics."""
+        journal = self._journal("one two three")
+        Event.objects.filter(pk=journal.pk).update(word_count=0)
+        Statistics.objects.all().delete()
+
+        results = update_all_word_count_statistics(rebuild=True)
+
+        self.assertEqual(results["recounted"], 1)
+        self.assertEqual(results["total"], 3)
+        self.assertEqual(results["years"], {2024: 3})
+        self.assertEqual(self._stat(year=2024, thread=self.daily), 3)
+
+    def test_summing_without_rebuild_uses_stored_counts(self):
+        """Without rebuild, statistics are re-summed from stored counts."""
+        self._journal("one two three")
+        self._journal("four", published=timezone.now())
+
+        self.assertEqual(calculate_total_word_count(year=2024), 3)
+        self.assertEqual(update_all_word_count_statistics()["total"], 4)
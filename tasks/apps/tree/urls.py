@@ -72,6 +72,21 @@ urlpatterns = [
         views_habit_api.TrackHabitAPIView.as_view(),
         name="track-habit-api",
     ),
+    path(
+        "api/v1/habit/track/batch/",
+        views_habit_api.TrackHabitBatchAPIView.as_view(),
+        name="track-habit-batch-api",
+    ),
+    path(
+        "api/v1/habit/calendar/",
+        views_habit_api.HabitCalendarAPIView.as_view(),
+        name="habit-calendar-api",
+    ),
+    path(
+        "api/v1/habit/stats/",
+        views_habit_api.HabitStatsAPIView.as_view(),
+        name="habit-stats-api",
+    ),
     path(
         "api/v1/android/task/today/",
         views_android_api.AndroidTaskListView.as_view(),
@@ -147,6 +162,16 @@ urlpatterns = [
         views_android_trip.AndroidTripPhotoConfirmView.as_view(),
         name="android-trip-photo-confirm",
     ),
+    path(
+        "api/v1/android/trip/photo/batch/presign/",
+        views_android_trip.AndroidTripPhotoBatchPresignView.as_view(),
+        name="android-trip-photo-batch-presign",
+    ),
+    path(
+        "api/v1/android/trip/photo/batch/",
+        views_android_trip.AndroidTripPhotoBatchConfirmView.as_view(),
+        name="android-trip-photo-batch-confirm",
+    ),
     path(
         "api/v1/android/trip/photo/<int:event_id>/original/",
         views_android_trip.AndroidTripPhotoOriginalView.as_view(),
@@ -337,9 +362,14 @@ urlpatterns = [
         name="public-event-archive-month",
     ),
     path("api/events/daily/", views.daily_events, name="daily-events"),
+    path("daily-events/range/", views.daily_events_range, name="daily-events-range"),
+    path("events/stream/", views.event_stream, name="event-stream"),
+    # === Search (API) ===
+    path("search/", views.search, name="search"),
     # === Statistics (views) ===
     path("stats/", views.stats, name="stats"),
     path("stats/json/", views.stats_json, name="stats-json"),
+    path("stats/matrix/json/", views.stats_matrix_json, name="stats-matrix-json"),
     # === User / Settings (views) ===
     path("accounts/settings/", views.account_settings, name="account-settings"),
     # API Router (REST Framework)
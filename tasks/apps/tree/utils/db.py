@@ -7,6 +7,11 @@ and other database-related helper functions.
 
 from collections import namedtuple
 
+from django.db import NotSupportedError, connections, router, transaction
+from django.db.models import Max, Q
+
+from .itertools import chunked
+
 Diff = namedtuple("Diff", ["old", "new"])
 
 
@@ -115,3 +120,115 @@ def normalize_for_comparison(value):
     if isinstance(value, str):
         return value.strip().replace("\r", "")
     return value
+
+
+def pk_prefix_q(model, prefix):
+    """
+    Build a Q matching rows whose primary key starts with the given digits.
+
+    Instead of comparing the key cast to text, which cannot use an index,
+    the prefix is expanded into one key range per possible key length up to
+    the largest key in the table, e.g. "12" covers 12, 120-129, 1200-1299.
+
+    Args:
+        model: The model whose integer primary keys are matched.
+        prefix: A string of digits.
+
+    Returns:
+        A Q object; matches nothing if no key can start with the prefix.
+    """
+    if not prefix.isdigit() or prefix.startswith("0"):
+        return Q(pk__in=[])
+
+    max_pk = model.objects.aggregate(max_pk=Max("pk"))["max_pk"] or 0
+    start, end = int(prefix), int(prefix)
+
+    q = Q(pk__in=[])
+
+    while start <= max_pk:
+        q |= Q(pk__gte=start, pk__lte=end)
+        start, end = start * 10, end * 10 + 9
+
+    return q
+
+
+def bulk_create_inherited(model, objs, batch_size=1000):
+    """
+    Bulk insert instances of a model with multi-table inheritance.
+
+    Django's bulk_create() refuses such models. Here the rows of every table
+    in the inheritance chain are inserted batch by batch, root table first,
+    and the keys the database returns are copied into the parent links. No
+    signals are sent and save() is not called, so anything they would set
+    (e.g. event_stream_id of events) must already be set on the instances.
+
+    Args:
+        model: The concrete model class; every instance must be of it.
+        objs: Unsaved instances.
+        batch_size: Rows per INSERT statement.
+
+    Returns:
+        The list of instances, with primary keys set.
+
+    Raises:
+        NotSupportedError: The database cannot return the keys of bulk
+            inserted rows (PostgreSQL and SQLite 3.35+ can).
+    """
+    objs = list(objs)
+    using = router.db_for_write(model)
+    connection = connections[using]
+
+    if not connection.features.can_return_rows_from_bulk_insert:
+        raise NotSupportedError("The database does not return bulk inserted keys")
+
+    root, *tables = [*reversed(model._meta.get_parent_list()), model]
+    root_fields = [
+        field
+        for field in root._meta.local_concrete_fields
+        if field is not root._meta.auto_field
+    ]
+    returning_fields = root._meta.db_returning_fields
+    root_pk = root._meta.pk.attname
+
+    # Keep every statement within the database's limit on query parameters
+    batch_size = min(
+        [batch_size]
+        + [
+            connection.ops.bulk_batch_size(fields, objs) or batch_size
+            for fields in [root_fields]
+            + [table._meta.local_concrete_fields for table in tables]
+        ]
+    )
+
+    for obj in objs:
+        # django-polymorphic sets the content type in save()
+        if hasattr(obj, "pre_save_polymorphic"):
+            obj.pre_save_polymorphic(using=using)
+
+    with transaction.atomic(using=using, savepoint=False):
+        for batch in chunked(objs, batch_size):
+            # QuerySet._insert() is what Model.save() and bulk_create() use
+            rows = root._base_manager._insert(
+                batch,
+                fields=root_fields,
+                returning_fields=returning_fields,
+                using=using,
+            )
+
+            for obj, row in zip(batch, rows):
+                for field, value in zip(returning_fields, row):
+                    setattr(obj, field.attname, value)
+
+            for table in tables:
+                for obj in batch:
+                    setattr(obj, table._meta.pk.attname, getattr(obj, root_pk))
+
+                table._base_manager._insert(
+                    batch, fields=table._meta.local_concrete_fields, using=using
+                )
+
+    for obj in objs:
+        obj._state.adding = False
+        obj._state.db = using
+
+    return objs
@@ -0,0 +1,121 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Max, Value, When
+from django.db.models.functions import Greatest
+
+from ..models import Event, EventStreamHead
+
+
+def advance_stream_head(event_stream_id, published):
+    """Move a stream's head forward to published if it is newer"""
+    heads = EventStreamHead.objects.filter(event_stream_id=event_stream_id)
+
+    if heads.filter(last_event_published__lt=published).update(
+        last_event_published=published
+    ):
+        return
+
+    if heads.exists():
+        return
+
+    try:
+        with transaction.atomic():
+            EventStreamHead.objects.create(
+                event_stream_id=event_stream_id, last_event_published=published
+            )
+    except IntegrityError:
+        # Created concurrently since the update above
+        heads.filter(last_event_published__lt=published).update(
+            last_event_published=published
+        )
+
+
+def advance_stream_heads(heads):
+    """Move several streams' heads forward in two queries
+
+    Args:
+        heads: Dict mapping event_stream_ids to the published time of their
+            newest new event.
+    """
+    if not heads:
+        return
+
+    # Heads that exist already are left alone here and advanced below
+    EventStreamHead.objects.bulk_create(
+        [
+            EventStreamHead(
+                event_stream_id=event_stream_id, last_event_published=published
+            )
+            for event_stream_id, published in heads.items()
+        ],
+        ignore_conflicts=True,
+    )
+
+    EventStreamHead.objects.filter(event_stream_id__in=heads).update(
+        last_event_published=Greatest(
+            F("last_event_published"),
+            Case(
+                *(
+                    When(event_stream_id=event_stream_id, then=Value(published))
+                    for event_stream_id, published in heads.items()
+                )
+            ),
+        )
+    )
+
+
+def refresh_stream_heads(*event_stream_ids):
+    """Recompute the heads of the given streams from their events
+
+    Streams without events lose their head row.
+    """
+    event_stream_ids = {
+        stream_id for stream_id in event_stream_ids if stream_id is not None
+    }
+
+    if not event_stream_ids:
+        return
+
+    latest = dict(
+        Event.objects.non_polymorphic()
+        .filter(event_stream_id__in=event_stream_ids)
+        .order_by()
+        .values("event_stream_id")
+        .annotate(published=Max("published"))
+        .values_list("event_stream_id", "published")
+    )
+
+    EventStreamHead.objects.filter(event_stream_id__in=event_stream_ids).exclude(
+        event_stream_id__in=latest
+    ).delete()
+
+    for event_stream_id, published in latest.items():
+        EventStreamHead.objects.update_or_create(
+            event_stream_id=event_stream_id,
+            defaults={"last_event_published": published},
+        )
+
+
+def rebuild_stream_heads():
+    """Recompute every EventStreamHead row from the event table
+
+    Runs a single grouped query over tree_event and replaces the heads.
+
+    Returns:
+        int: Number of head rows written.
+    """
+    heads = [
+        EventStreamHead(
+            event_stream_id=row["event_stream_id"],
+            last_event_published=row["published"],
+        )
+        for row in Event.objects.non_polymorphic()
+        .order_by()
+        .values("event_stream_id")
+        .annotate(published=Max("published"))
+    ]
+
+    with transaction.atomic():
+        EventStreamHead.objects.all().delete()
+        EventStreamHead.objects.bulk_create(heads, batch_size=1000)
+
+    return len(heads)
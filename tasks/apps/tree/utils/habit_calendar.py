@@ -0,0 +1,238 @@
+import uuid
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ..models import HabitDayCount, HabitTracked, Statistics
+
+VERSION_KEY = "habit_day_counts"
+
+
+def habit_day_deltas(rows, sign=1, deltas=None):
+    """Fold HabitTracked rows into per-(habit, day) count changes
+
+    Args:
+        rows: Iterable of (habit_id, published, occured) tuples.
+        sign: 1 to count the rows in, -1 to count them out.
+        deltas: Optional dict to add to, as returned by an earlier call.
+
+    Returns:
+        Dict mapping (habit_id, date) to [occurred, skipped] deltas.
+    """
+    if deltas is None:
+        deltas = defaultdict(lambda: [0, 0])
+
+    for habit_id, published, occured in rows:
+        delta = deltas[habit_id, timezone.localdate(published)]
+        delta[0 if occured else 1] += sign
+
+    return deltas
+
+
+def stored_habit_days(pks):
+    """Return the (habit_id, published, occured) stored for HabitTracked pks"""
+    return list(
+        HabitTracked.objects.non_polymorphic()
+        .filter(pk__in=pks)
+        .values_list("habit_id", "published", "occured")
+    )
+
+
+def record_habit_days(deltas):
+    """Apply per-(habit, day) count changes to the HabitDayCount rollup
+
+    Existing rows are locked and updated together; missing ones are created
+    in one insert. Rows left with no occurrences and no skips are deleted,
+    so the rollup holds exactly the tracked days.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        replace_habit_days_versions({habit_id for habit_id, _ in deltas})
+
+        rows = {
+            (row.habit_id, row.date): row
+            for row in HabitDayCount.objects.select_for_update().filter(
+                habit_id__in={habit_id for habit_id, _ in deltas},
+                date__in={date for _, date in deltas},
+            )
+        }
+
+        missing = []
+
+        for (habit_id, date), (occurred, skipped) in deltas.items():
+            row = rows.get((habit_id, date))
+
+            if row is not None:
+                row.occurred += occurred
+                row.skipped += skipped
+            elif occurred > 0 or skipped > 0:
+                missing.append(
+                    HabitDayCount(
+                        habit_id=habit_id,
+                        date=date,
+                        occurred=max(occurred, 0),
+                        skipped=max(skipped, 0),
+                    )
+                )
+
+        HabitDayCount.objects.bulk_update(rows.values(), ["occurred", "skipped"])
+
+        emptied = [
+            row.pk for row in rows.values() if row.occurred <= 0 and row.skipped <= 0
+        ]
+
+        if emptied:
+            HabitDayCount.objects.filter(pk__in=emptied).delete()
+
+        try:
+            with transaction.atomic():
+                HabitDayCount.objects.bulk_create(missing)
+        except IntegrityError:
+            # Some were created concurrently since the select above
+            for row in missing:
+                _add_to_habit_day(row)
+
+
+def _add_to_habit_day(row):
+    rows = HabitDayCount.objects.filter(habit_id=row.habit_id, date=row.date)
+
+    if rows.update(
+        occurred=F("occurred") + row.occurred, skipped=F("skipped") + row.skipped
+    ):
+        return
+
+    HabitDayCount.objects.create(
+        habit_id=row.habit_id,
+        date=row.date,
+        occurred=row.occurred,
+        skipped=row.skipped,
+    )
+
+
+def rebuild_habit_day_counts():
+    """Recompute every HabitDayCount row from the HabitTracked table
+
+    Runs a single grouped query and replaces the rollup.
+
+    Returns:
+        int: Number of rollup rows written.
+    """
+    rows = (
+        HabitTracked.objects.non_polymorphic()
+        .order_by()
+        .values("habit_id", day=TruncDate("published"))
+        .annotate(
+            occurred=Count("pk", filter=Q(occured=True)),
+            skipped=Count("pk", filter=Q(occured=False)),
+        )
+    )
+
+    counts = [
+        HabitDayCount(
+            habit_id=row["habit_id"],
+            date=row["day"],
+            occurred=row["occurred"],
+            skipped=row["skipped"],
+        )
+        for row in rows
+    ]
+
+    with transaction.atomic():
+        HabitDayCount.objects.all().delete()
+        HabitDayCount.objects.bulk_create(counts, batch_size=1000)
+        replace_habit_days_version()
+
+    return len(counts)
+
+
+def habit_days_version_key(habit_id):
+    """Statistics key of the version token of one habit's HabitDayCount rows"""
+    return f"{VERSION_KEY}_{habit_id}"
+
+
+def habit_days_versions(habit_ids):
+    """Tokens that change whenever the HabitDayCount rows of a habit change
+
+    Each habit's token combines its own, replaced when its days change,
+    with the token of the whole rollup, replaced when it is rebuilt. Read
+    with one query; a habit whose days never changed has no token of its
+    own yet.
+
+    Returns:
+        Dict mapping each habit_id to its version token.
+    """
+    keys = {habit_days_version_key(habit_id): habit_id for habit_id in habit_ids}
+
+    stored = dict(
+        Statistics.objects.filter(key__in=[VERSION_KEY, *keys]).values_list(
+            "key", "value"
+        )
+    )
+
+    rollup = stored.get(VERSION_KEY)
+
+    return {habit_id: f"{rollup}.{stored.get(key)}" for key, habit_id in keys.items()}
+
+
+def _store_version(key, version):
+    if not Statistics.objects.filter(key=key).update(value=version):
+        Statistics.objects.update_or_create(key=key, defaults={"value": version})
+
+
+def replace_habit_days_version():
+    """Store a new random version token for the whole HabitDayCount rollup
+
+    A random token rather than a counter, so one written by a rolled back
+    transaction is never seen again.
+    """
+    version = uuid.uuid4().hex
+    _store_version(VERSION_KEY, version)
+
+    return version
+
+
+def replace_habit_days_versions(habit_ids):
+    """Store a new random version token for the days of each of the habits
+
+    Habits that have a token are updated together; only the first change
+    of a habit creates its Statistics row.
+    """
+    version = uuid.uuid4().hex
+    keys = {habit_days_version_key(habit_id) for habit_id in habit_ids}
+
+    if Statistics.objects.filter(key__in=keys).update(value=version) < len(keys):
+        stored = set(
+            Statistics.objects.filter(key__in=keys).values_list("key", flat=True)
+        )
+
+        for key in keys - stored:
+            _store_version(key, version)
+
+
+def habit_day_counts(habit_ids, start, end):
+    """Read the calendar counts of several habits in one query
+
+    Args:
+        habit_ids: Iterable of Habit primary keys.
+        start: First day (inclusive).
+        end: Last day (inclusive).
+
+    Returns:
+        Dict mapping each habit_id to a {date: count} dict of its tracked
+        days, where count is -1 on days the habit was skipped.
+    """
+    calendars = {habit_id: {} for habit_id in habit_ids}
+
+    for row in HabitDayCount.objects.filter(
+        habit_id__in=calendars, date__range=(start, end)
+    ).order_by("date"):
+        calendars[row.habit_id][row.date] = row.count
+
+    return calendars
@@ -1,4 +1,5 @@
 from collections.abc import Hashable, Mapping, Sequence
+from itertools import islice
 
 
 def itemize(
@@ -30,3 +31,11 @@ def compose(*functions):
         return arg
 
     return inner
+
+
+def chunked(iterable, size):
+    """Split an iterable into lists of at most size items"""
+    iterator = iter(iterable)
+
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -1,12 +1,18 @@
 import re
-from functools import reduce
+from collections import defaultdict, namedtuple
 
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
 from django.utils import timezone
 
 from ..models import (
     Event,
     HabitTracked,
     JournalAdded,
+    MonthlyEventCount,
     ObservationClosed,
     ObservationMade,
     ObservationRecontextualized,
@@ -21,7 +27,9 @@ from ..models import (
     ProjectedOutcomeRescheduled,
     Statistics,
 )
-from .itertools import _in_second, compose
+from .db import bulk_create_inherited
+from .event_streams import advance_stream_heads, refresh_stream_heads
+from .habit_calendar import habit_day_deltas, record_habit_days, stored_habit_days
 
 
 def count_words_in_text(text):
@@ -43,45 +51,226 @@ fields = [
     "success_criteria",
 ]
 
+# Saves touching none of these leave the statistics of a row unchanged
+STATISTICS_FIELDS = {
+    "published",
+    "pub_date",
+    "thread",
+    "thread_id",
+    "event_stream_id",
+    "word_count",
+    "focus",
+    *fields,
+}
+
 
-def calculate_total_word_count(year=None):
-    """Calculate total word count from all events and plans with text content
+def count_words(instance):
+    """Count words in the text fields of an Event or a Plan
 
     Reflections are not counted as they most often just repeat the text found in journal entries.
+    """
+    if isinstance(instance, Plan):
+        return count_words_in_text(instance.focus)
+
+    return sum(count_words_in_text(getattr(instance, field, None)) for field in fields)
+
+
+def word_count_scope(instance):
+    """Return the (year, thread_id) an Event or a Plan is counted under"""
+    if isinstance(instance, Plan):
+        return instance.pub_date.year, instance.thread_id
+
+    return instance.published.year, instance.thread_id
+
+
+StoredRow = namedtuple(
+    "StoredRow",
+    ["word_count", "date", "thread_id", "event_stream_id"],
+    defaults=[None],
+)
+
+
+def stored_row(instance):
+    """Return the StoredRow currently in the database for an Event or a Plan
+
+    ``date`` is the event's ``published`` or the plan's ``pub_date``;
+    ``event_stream_id`` is None for plans.
+    Returns None for rows that have not been saved yet.
+    """
+    if instance.pk is None:
+        return None
+
+    if isinstance(instance, Plan):
+        qs, fields = Plan.objects.all(), ["pub_date", "thread_id"]
+    else:
+        qs = Event.objects.non_polymorphic()
+        fields = ["published", "thread_id", "event_stream_id"]
+
+    row = qs.filter(pk=instance.pk).values_list("word_count", *fields).first()
+
+    return StoredRow(*row) if row else None
+
+
+def word_count_key(year=None, thread_id=None):
+    """Statistics key for the word count of a year and/or thread"""
+    key = f"total_word_count_{year}" if year else "total_word_count"
+
+    if thread_id:
+        key += f"_thread_{thread_id}"
+
+    return key
+
+
+def _scopes_covering(year, thread_id):
+    """All (year, thread_id) statistics scopes a row in the given scope adds to"""
+    return [(None, None), (year, None), (None, thread_id), (year, thread_id)]
+
+
+def calculate_total_word_count(year=None, thread_id=None):
+    """Sum the stored per-row word counts of events and plans
+
+    Runs as two aggregate queries; the per-row counts are maintained on save
+    and can be recomputed with ``recount_word_counts``.
 
     Args:
         year (int, optional): Filter by year. If None, includes all records.
+        thread_id (int, optional): Filter by thread. If None, includes all threads.
     """
-    total_words = 0
+    events = Event.objects.non_polymorphic()
+    plans = Plan.objects.all()
 
-    # Count words from Events
-    events = Event.objects.all()
     if year:
         events = events.filter(published__year=year)
+        plans = plans.filter(pub_date__year=year)
 
-    for event in events:
-        # Find all text fields present on this event
-        filtered_fields = filter(lambda x: bool(getattr(event, x, None)), fields)
+    if thread_id:
+        events = events.filter(thread_id=thread_id)
+        plans = plans.filter(thread_id=thread_id)
 
-        # Create a list of all text fields for this event
-        text_fields = reduce(
-            lambda acc, x: acc + [getattr(event, x, None)], filtered_fields, []
-        )
+    total = 0
 
-        # Count words in all text fields for this event
-        for text in text_fields:
-            total_words += count_words_in_text(text)
+    for qs in (events, plans):
+        total += qs.aggregate(total=Sum("word_count"))["total"] or 0
 
-    # Count words from Plans
-    plans = Plan.objects.all()
-    if year:
-        plans = plans.filter(pub_date__year=year)
+    return total
 
-    for plan in plans:
-        if plan.focus:
-            total_words += count_words_in_text(plan.focus)
 
-    return total_words
+def apply_word_count_delta(year, thread_id, delta):
+    """Fold a word count change into every Statistics row covering the scope
+
+    Existing rows are locked and incremented. Rows that do not exist yet are
+    created from ``calculate_total_word_count``, which already includes the
+    change being applied, so callers must run this after the row was written.
+    """
+    if not delta:
+        return
+
+    scopes = {
+        word_count_key(*scope): scope for scope in _scopes_covering(year, thread_id)
+    }
+
+    with transaction.atomic():
+        stats = {
+            stat.key: stat
+            for stat in Statistics.objects.select_for_update().filter(
+                key__in=scopes.keys()
+            )
+        }
+
+        for stat in stats.values():
+            stat.value = (stat.value or 0) + delta
+            stat.last_updated = timezone.now()
+
+        Statistics.objects.bulk_update(stats.values(), ["value", "last_updated"])
+
+        for key, scope in scopes.items():
+            if key in stats:
+                continue
+
+            Statistics.objects.get_or_create(
+                key=key, defaults={"value": calculate_total_word_count(*scope)}
+            )
+
+
+def move_events_to_thread(events, thread):
+    """Bulk-move events to another thread, carrying their word counts along
+
+    A bare ``update(thread=...)`` bypasses the save signals, so the word
+    count Statistics rows are adjusted here, after the rows have moved.
+    """
+    moved = list(
+        events.non_polymorphic()
+        .exclude(thread_id=thread.pk)
+        .order_by()
+        .values("thread_id", year=ExtractYear("published"))
+        .annotate(total=Sum("word_count"))
+    )
+
+    events.update(thread=thread)
+
+    for row in moved:
+        apply_word_count_delta(row["year"], row["thread_id"], -row["total"])
+        apply_word_count_delta(row["year"], thread.pk, row["total"])
+
+
+def _local_text_fields(model):
+    return [
+        field.attname
+        for field in model._meta.get_fields(include_parents=False)
+        if field.name in fields and field.concrete
+    ]
+
+
+def recount_word_counts(chunk_size=2000):
+    """Recompute the stored word count of every event and plan
+
+    Each concrete Event subclass is read once with ``values_list`` over only
+    the text fields it declares, so no polymorphic instances are built. Only
+    rows whose count changed are written back.
+
+    Returns:
+        int: Number of rows updated.
+    """
+    computed = defaultdict(int)
+
+    for model in apps.get_app_config("tree").get_models():
+        if not issubclass(model, Event):
+            continue
+
+        text_fields = _local_text_fields(model)
+
+        if not text_fields:
+            continue
+
+        rows = model.objects.non_polymorphic().values_list("pk", *text_fields)
+
+        for pk, *texts in rows.iterator(chunk_size=chunk_size):
+            computed[pk] += sum(map(count_words_in_text, texts))
+
+    stale_events = [
+        Event(pk=pk, word_count=computed.get(pk, 0))
+        for pk, word_count in Event.objects.non_polymorphic()
+        .values_list("pk", "word_count")
+        .iterator(chunk_size=chunk_size)
+        if computed.get(pk, 0) != word_count
+    ]
+
+    stale_plans = [
+        Plan(pk=pk, word_count=count_words_in_text(focus))
+        for pk, focus, word_count in Plan.objects.values_list(
+            "pk", "focus", "word_count"
+        ).iterator(chunk_size=chunk_size)
+        if count_words_in_text(focus) != word_count
+    ]
+
+    Event.objects.bulk_update(stale_events, ["word_count"], batch_size=chunk_size)
+    Plan.objects.bulk_update(stale_plans, ["word_count"], batch_size=chunk_size)
+
+    return len(stale_events) + len(stale_plans)
+
+
+def _store_statistic(key, value):
+    Statistics.objects.update_or_create(key=key, defaults={"value": value})
 
 
 def update_word_count_statistic(year=None):
@@ -92,17 +281,7 @@ def update_word_count_statistic(year=None):
     """
     total_words = calculate_total_word_count(year)
 
-    # Create key based on year
-    key = f"total_word_count_{year}" if year else "total_word_count"
-
-    # Update or create the statistic
-    stat, created = Statistics.objects.get_or_create(
-        key=key, defaults={"value": total_words}
-    )
-
-    if not created:
-        stat.value = total_words
-        stat.save()
+    _store_statistic(word_count_key(year=year), total_words)
 
     return total_words
 
@@ -115,55 +294,60 @@ def get_all_years_in_database():
     return list(set(years))
 
 
-def update_all_word_count_statistics():
-    """Update word count statistics for all years and overall total
+def update_all_word_count_statistics(rebuild=False):
+    """Update word count statistics for all years, threads and overall total
 
-    Only updates current year and previous year if they already exist.
-    Creates statistics for other years only if they don't exist.
+    Sums the stored per-row counts server-side, grouped by year and thread,
+    and writes every Statistics row from the result.
+
+    Args:
+        rebuild (bool): Recompute the per-row counts from the text first.
 
     Returns:
-        dict: Dictionary with 'total' and 'years' containing word counts
+        dict: Dictionary with 'total', 'years' and 'recounted' (rows fixed by rebuild)
     """
-    results = {}
-
-    # Update overall total (always update)
-    total_words = update_word_count_statistic()
-    results["total"] = total_words
-
-    # Get current and previous year
-    current_year = timezone.now().year
-    previous_year = current_year - 1
-
-    # Get all years in database
-    years = get_all_years_in_database()
-    results["years"] = {}
-
-    for year in sorted(years):
-        # Always update current and previous year
-        if year in [current_year, previous_year]:
-            year_words = update_word_count_statistic(year=year)
-            results["years"][year] = year_words
-        else:
-            # Only create if doesn't exist for other years
-            key = f"total_word_count_{year}"
-            try:
-                stat = Statistics.objects.get(key=key)
-                results["years"][year] = stat.value  # Use existing value
-            except Statistics.DoesNotExist:
-                # Create new statistic for this year
-                year_words = update_word_count_statistic(year=year)
-                results["years"][year] = year_words
+    recounted = recount_word_counts() if rebuild else 0
+
+    grouped = [
+        Event.objects.non_polymorphic()
+        .order_by()
+        .values("thread_id", year=ExtractYear("published"))
+        .annotate(total=Sum("word_count")),
+        Plan.objects.order_by()
+        .values("thread_id", year=ExtractYear("pub_date"))
+        .annotate(total=Sum("word_count")),
+    ]
+
+    totals = defaultdict(int, {word_count_key(): 0})
+
+    for qs in grouped:
+        for row in qs:
+            for scope in _scopes_covering(row["year"], row["thread_id"]):
+                totals[word_count_key(*scope)] += row["total"] or 0
+
+    with transaction.atomic():
+        for key, value in totals.items():
+            _store_statistic(key, value)
+
+    years = {
+        year: totals[word_count_key(year=year)] for year in get_all_years_in_database()
+    }
 
-    return results
+    return {
+        "total": totals[word_count_key()],
+        "years": years,
+        "recounted": recounted,
+    }
 
 
-def get_word_count_statistic(year=None):
+def get_word_count_statistic(year=None, thread_id=None):
     """Get the current word count statistic
 
     Args:
         year (int, optional): Year to get statistic for. If None, gets overall statistic.
+        thread_id (int, optional): Thread to get statistic for. If None, gets all threads.
     """
-    key = f"total_word_count_{year}" if year else "total_word_count"
+    key = word_count_key(year=year, thread_id=thread_id)
 
     try:
         stat = Statistics.objects.get(key=key)
@@ -190,6 +374,261 @@ aggregate_models_dict = {
 }
 
 
+def record_event_count(year, month, content_type_id, delta):
+    """Add delta to the MonthlyEventCount row of a month and event type"""
+    if not delta:
+        return
+
+    rows = MonthlyEventCount.objects.filter(
+        year=year, month=month, content_type_id=content_type_id
+    )
+
+    if rows.update(count=F("count") + delta):
+        return
+
+    try:
+        with transaction.atomic():
+            MonthlyEventCount.objects.create(
+                year=year, month=month, content_type_id=content_type_id, count=delta
+            )
+    except IntegrityError:
+        # Created concurrently since the update above
+        rows.update(count=F("count") + delta)
+
+
+def bulk_create_events(model, events):
+    """Bulk-insert new events and fold them into the read models
+
+    Counts each event's words, inserts the rows with ``bulk_create_inherited``
+    and then applies what the save signals would have: one word count delta
+    per (year, thread), one MonthlyEventCount change per month, the stream
+    heads advanced together and, for HabitTracked, the HabitDayCount rows.
+    The ``event_stream_id`` must already be set; no search documents are
+    indexed.
+    """
+    for event in events:
+        event.word_count = count_words(event)
+
+    bulk_create_inherited(model, events)
+
+    words = defaultdict(int)
+    months = defaultdict(int)
+    heads = {}
+
+    for event in events:
+        published = event.published
+
+        words[word_count_scope(event)] += event.word_count
+        months[published.year, published.month, event.polymorphic_ctype_id] += 1
+        heads[event.event_stream_id] = max(
+            published, heads.get(event.event_stream_id, published)
+        )
+
+    for scope, delta in words.items():
+        apply_word_count_delta(*scope, delta)
+
+    for month, delta in months.items():
+        record_event_count(*month, delta)
+
+    advance_stream_heads(heads)
+
+    if issubclass(model, HabitTracked):
+        record_habit_days(habit_day_deltas(_habit_days(events)))
+
+    return events
+
+
+def _habit_days(events):
+    return [(event.habit_id, event.published, event.occured) for event in events]
+
+
+def bulk_update_events(model, events, fields):
+    """Bulk-update saved events and fold the changes into the read models
+
+    Recounts each event's words, writes ``fields`` and ``word_count`` with
+    ``bulk_update`` and then applies what the save signals would have:
+    word counts and monthly counts move with the events' years, threads and
+    months, the heads of the streams touched are advanced, or recomputed
+    where an event moved back in time or to another stream, and HabitTracked
+    days move in the HabitDayCount rollup.
+    """
+    if not events:
+        return events
+
+    before = {
+        pk: StoredRow(word_count, published, thread_id, event_stream_id)
+        for pk, word_count, published, thread_id, event_stream_id in (
+            Event.objects.non_polymorphic()
+            .filter(pk__in=[event.pk for event in events])
+            .values_list(
+                "pk", "word_count", "published", "thread_id", "event_stream_id"
+            )
+        )
+    }
+
+    if issubclass(model, HabitTracked):
+        habit_days = habit_day_deltas(stored_habit_days(before), sign=-1)
+
+    for event in events:
+        event.word_count = count_words(event)
+
+    model.objects.bulk_update(events, [*fields, "word_count"], batch_size=1000)
+
+    words = defaultdict(int)
+    months = defaultdict(int)
+    heads = {}
+    refresh = set()
+
+    for event in events:
+        old, published = before[event.pk], event.published
+        content_type_id = event.polymorphic_ctype_id
+
+        words[old.date.year, old.thread_id] -= old.word_count
+        words[word_count_scope(event)] += event.word_count
+        months[old.date.year, old.date.month, content_type_id] -= 1
+        months[published.year, published.month, content_type_id] += 1
+
+        if old.event_stream_id != event.event_stream_id or old.date > published:
+            refresh.update({old.event_stream_id, event.event_stream_id})
+        else:
+            heads[event.event_stream_id] = max(
+                published, heads.get(event.event_stream_id, published)
+            )
+
+    for scope, delta in words.items():
+        apply_word_count_delta(*scope, delta)
+
+    for month, delta in months.items():
+        record_event_count(*month, delta)
+
+    advance_stream_heads(
+        {
+            event_stream_id: published
+            for event_stream_id, published in heads.items()
+            if event_stream_id not in refresh
+        }
+    )
+    refresh_stream_heads(*refresh)
+
+    if issubclass(model, HabitTracked):
+        record_habit_days(habit_day_deltas(_habit_days(events), deltas=habit_days))
+
+    return events
+
+
+def rebuild_event_counts():
+    """Recompute every MonthlyEventCount row from the event table
+
+    Runs a single grouped query over tree_event and replaces the rollup.
+
+    Returns:
+        int: Number of rollup rows written.
+    """
+    rows = (
+        Event.objects.non_polymorphic()
+        .order_by()
+        .values(
+            "polymorphic_ctype_id",
+            year=ExtractYear("published"),
+            month=ExtractMonth("published"),
+        )
+        .annotate(count=Count("pk"))
+    )
+
+    counts = [
+        MonthlyEventCount(
+            year=row["year"],
+            month=row["month"],
+            content_type_id=row["polymorphic_ctype_id"],
+            count=row["count"],
+        )
+        for row in rows
+    ]
+
+    with transaction.atomic():
+        MonthlyEventCount.objects.all().delete()
+        MonthlyEventCount.objects.bulk_create(counts)
+
+    return len(counts)
+
+
+def _content_type_ids_by_key():
+    """Map each aggregate_models_dict key to the content types it counts
+
+    A model counts its own events and those of all its subclasses, matching
+    the polymorphic ``Model.objects.count()``. Content types are resolved in
+    one (cached) lookup.
+    """
+    content_types = ContentType.objects.get_for_models(
+        *(model for model in apps.get_models() if issubclass(model, Event)),
+        for_concrete_models=False,
+    )
+
+    return {
+        key: {
+            content_type.id
+            for model, content_type in content_types.items()
+            if issubclass(model, parent)
+        }
+        for key, parent in aggregate_models_dict.items()
+    }
+
+
+def _fold_counts_by_key(counts_by_content_type):
+    return {
+        key: sum(
+            counts_by_content_type.get(content_type_id, 0)
+            for content_type_id in content_type_ids
+        )
+        for key, content_type_ids in _content_type_ids_by_key().items()
+    }
+
+
+def count_events_by_type(year=None):
+    """Count events for every aggregate_models_dict key from the rollup
+
+    A single query over MonthlyEventCount; subclass counts are folded into
+    their parents (e.g. PhotoAdded into journal_count) like the polymorphic
+    ``Model.objects.count()`` they replace.
+    """
+    rows = MonthlyEventCount.objects.order_by()
+
+    if year:
+        rows = rows.filter(year=year)
+
+    counts = dict(rows.values_list("content_type_id").annotate(total=Sum("count")))
+
+    return _fold_counts_by_key(counts)
+
+
+def get_event_count_matrix():
+    """Count events for every aggregate_models_dict key and every year
+
+    Returns:
+        dict: 'years' (newest first) and 'counts' mapping each key to a
+        {year: count} dict, read with one grouped query over the rollup.
+    """
+    per_year = defaultdict(dict)
+
+    for year, content_type_id, total in (
+        MonthlyEventCount.objects.order_by()
+        .values_list("year", "content_type_id")
+        .annotate(total=Sum("count"))
+    ):
+        per_year[year][content_type_id] = total
+
+    years = sorted(per_year, reverse=True)
+    folded = {year: _fold_counts_by_key(per_year[year]) for year in years}
+
+    return {
+        "years": years,
+        "counts": {
+            key: {year: folded[year][key] for year in years}
+            for key in aggregate_models_dict
+        },
+    }
+
+
 def get_aggregate_statistics(year=None):
     """Get aggregate statistics for all events and activities
 
@@ -199,21 +638,7 @@ def get_aggregate_statistics(year=None):
     Returns:
         dict: Dictionary containing counts for various event types and word counts
     """
-
-    if year:
-        year_filter = lambda qs: qs.filter(published__year=year)
-    else:
-        year_filter = lambda qs: qs
-
-    _count_with_year_filter = compose(
-        lambda model: model.objects.all(),
-        year_filter,
-        lambda qs: qs.count(),
-    )
-
-    all_counts = dict(
-        map(_in_second(_count_with_year_filter), aggregate_models_dict.items())
-    )
+    all_counts = count_events_by_type(year)
 
     # Get word count statistic
     word_count, word_count_updated = get_word_count_statistic(year=year)
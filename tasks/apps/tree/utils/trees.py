@@ -0,0 +1,68 @@
+from functools import partial
+
+
+class tree_iterator:
+    """Preorder traversal tree iterator"""
+
+    def __init__(self, tree, key="children"):
+        self.key = key
+
+        # Internally this iterator requires top-level list,
+        # so if given a valid node (that has children key)
+        # wrap it in a list
+        if key in tree:
+            tree = [tree]
+
+        self.iterators = [iter(tree)]
+
+    def __iter__(self):
+        return self
+
+    def _find_next_path(self):
+        try:
+            value = next(self.iterators[-1])
+        except StopIteration:
+            # If there are no leaves to process
+            # remove last iterator and rerun the process.
+            # This is how it traverses upwards.
+            #
+            # Recursion handles for us multi-level jumps.
+            #
+            # Last pop is handled in __next__()
+            self.iterators.pop()
+            return self._find_next_path()
+
+        # Before returning a value,
+        # setup iterator-path to a node's children for future
+        # iterations. That's how it traverses deeper.
+        if self.key in value and len(value[self.key]) > 0:
+            self.iterators.append(iter(value[self.key]))
+
+        return value
+
+    def __next__(self):
+        try:
+            return self._find_next_path()
+        except IndexError:
+            # We have popped out of self.iterators to use
+            raise StopIteration
+
+
+def _state(key, default, item):
+    return item.get("state", {}).get(key, default)
+
+
+def state(key, default=None):
+    return partial(_state, key, default)
+
+
+def _marker(key, default, item):
+    return item.get("data", {}).get("meaningfulMarkers", {}).get(key, default)
+
+
+def marker(key, default=None):
+    return partial(_marker, key, default)
+
+
+def ilen(iter):
+    return sum(1 for _ in iter)
@@ -1,10 +1,16 @@
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import transaction
-from django.db.models import prefetch_related_objects
+from django.db.models import Q, prefetch_related_objects
+from django.http import StreamingHttpResponse
 from django.shortcuts import redirect, render
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.views.generic.dates import MonthArchiveView
 
 from django_filters import rest_framework as filters
@@ -13,14 +19,23 @@ from rest_framework import status, viewsets
 from rest_framework.decorators import api_view
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response as RestResponse
+from rest_framework.utils.encoders import JSONEncoder
 
 from .forms import *
 from .models import *
 from .serializers import *
-from .services.journalling import process_journal_entry
+from .services.events.prefetch import load_events, prefetch_event_relations
+from .services.journalling import submit_journal_entry
+from .services.search.documents import search_documents
 from .services.today import plan_tasks
-from .utils.datetime import make_last_day_of_the_month, make_last_day_of_the_week
-from .utils.statistics import get_aggregate_statistics
+from .utils.datetime import (
+    aware_from_date,
+    date_range_generator,
+    make_last_day_of_the_month,
+    make_last_day_of_the_week,
+)
+from .utils.itertools import chunked
+from .utils.statistics import get_aggregate_statistics, get_event_count_matrix
 from .views_trip import attach_photo_urls
 
 
@@ -57,7 +72,7 @@ class JournalAddedViewSet(viewsets.ModelViewSet):
         journal_added = serializer.save()
         skip_habits = "reflection" in self.request.data
         story = serializer.validated_data.get("story")
-        process_journal_entry(journal_added, skip_habits=skip_habits, story=story)
+        submit_journal_entry(journal_added, skip_habits=skip_habits, story=story)
 
 
 class ThreadPagination(PageNumberPagination):
@@ -352,6 +367,52 @@ def stats_json(request):
     return RestResponse(get_aggregate_statistics(year))
 
 
+@api_view(["GET"])
+def stats_matrix_json(request):
+    """Event counts per type for every year, read from the monthly rollup."""
+    return RestResponse(get_event_count_matrix())
+
+
+class SearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+@api_view(["GET"])
+def search(request):
+    """
+    Full-text search across observations, closed observations, insights and
+    journal entries, ranked by relevance.
+
+    Optional ``kind`` parameters restrict the results to some kinds.
+    """
+    query = request.GET.get("q", "").strip()
+
+    if not query:
+        return RestResponse(
+            {"error": 'Query parameter "q" is required'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    kinds = request.GET.getlist("kind")
+    unknown_kinds = set(kinds) - set(SearchDocument.Kind.values)
+
+    if unknown_kinds:
+        return RestResponse(
+            {"error": f"Unknown kind: {', '.join(sorted(unknown_kinds))}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    documents = search_documents(query, kinds=kinds)
+
+    paginator = SearchPagination()
+    page = paginator.paginate_queryset(documents, request)
+    serializer = SearchDocumentSerializer(page, many=True)
+
+    return paginator.get_paginated_response(serializer.data)
+
+
 @api_view(["GET"])
 def daily_events(request):
     day = request.GET.get("date", timezone.now().date())
@@ -392,6 +453,204 @@ def daily_events(request):
     )
 
 
+def _parse_date_param(params, name):
+    """Parse a required YYYY-MM-DD query parameter, raising ValueError."""
+    value = params.get(name)
+    parsed = parse_date(value) if value else None
+
+    if parsed is None:
+        raise ValueError(f'Query parameter "{name}" must be a YYYY-MM-DD date')
+
+    return parsed
+
+
+DAILY_EVENTS_RANGE_MAX_DAYS = 366
+
+
+@api_view(["GET"])
+def daily_events_range(request):
+    """
+    The per-day result of daily_events for every day from ``from`` to ``to``
+    (inclusive), read with one events query and one Plan and Reflection
+    lookup for the whole range. Ranges are limited to
+    ``DAILY_EVENTS_RANGE_MAX_DAYS`` days.
+    """
+    try:
+        date_from = _parse_date_param(request.GET, "from")
+        date_to = _parse_date_param(request.GET, "to")
+    except ValueError as e:
+        return RestResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if date_from > date_to:
+        return RestResponse(
+            {"error": '"from" must not be after "to"'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if (date_to - date_from).days >= DAILY_EVENTS_RANGE_MAX_DAYS:
+        return RestResponse(
+            {"error": f"The range must not exceed {DAILY_EVENTS_RANGE_MAX_DAYS} days"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    thread_name = request.GET.get("thread", "Daily")
+
+    events = (
+        Event.objects.filter(
+            published__gte=aware_from_date(date_from),
+            published__lt=aware_from_date(date_to + timedelta(days=1)),
+            thread__name=thread_name,
+        )
+        .not_instance_of(BoardCommitted)
+        .order_by("published")
+    )
+
+    events_by_day = defaultdict(list)
+
+    for event in prefetch_event_relations(load_events(events)):
+        events_by_day[timezone.localdate(event.published)].append(event)
+
+    plans = {
+        plan.pub_date: plan
+        for plan in Plan.objects.filter(
+            pub_date__range=(date_from, date_to), thread__name=thread_name
+        )
+    }
+    reflections = {
+        reflection.pub_date: reflection
+        for reflection in Reflection.objects.filter(
+            pub_date__range=(date_from, date_to), thread__name=thread_name
+        )
+    }
+
+    context = {"request": request}
+    days = []
+
+    for day in date_range_generator(
+        aware_from_date(date_from), aware_from_date(date_to)
+    ):
+        plan = plans.get(day)
+        reflection = reflections.get(day)
+
+        days.append(
+            {
+                "date": day,
+                "events": EventSerializer(
+                    events_by_day[day], many=True, context=context
+                ).data,
+                "plan": PlanSerializer(plan, context=context).data if plan else None,
+                "reflection": (
+                    ReflectionSerializer(reflection, context=context).data
+                    if reflection
+                    else None
+                ),
+            }
+        )
+
+    return RestResponse({"from": date_from, "to": date_to, "days": days})
+
+
+EVENT_STREAM_CHUNK_SIZE = 500
+
+
+def _event_stream_queryset(params):
+    """
+    Build the (published, id) ordered event queryset for event_stream.
+
+    Raises:
+        ValueError: If a parameter cannot be parsed.
+    """
+    events = Event.objects.not_instance_of(BoardCommitted).order_by("published", "id")
+
+    date_from = params.get("from")
+    date_to = params.get("to")
+
+    if date_from:
+        if not parse_date(date_from):
+            raise ValueError(f"Invalid date for from: {date_from}")
+        events = events.filter(published__gte=aware_from_date(parse_date(date_from)))
+
+    if date_to:
+        if not parse_date(date_to):
+            raise ValueError(f"Invalid date for to: {date_to}")
+        day_after = parse_date(date_to) + timedelta(days=1)
+        events = events.filter(published__lt=aware_from_date(day_after))
+
+    if threads := params.getlist("thread"):
+        events = events.filter(thread__name__in=threads)
+
+    if types := params.getlist("type"):
+        models_by_name = {
+            model.__name__: model for model in EventSerializer.model_serializer_mapping
+        }
+        unknown = set(types) - set(models_by_name)
+
+        if unknown:
+            raise ValueError(f"Unknown type: {', '.join(sorted(unknown))}")
+
+        events = events.instance_of(*(models_by_name[name] for name in types))
+
+    if event_stream_ids := params.getlist("event_stream_id"):
+        try:
+            event_stream_ids = [uuid.UUID(value) for value in event_stream_ids]
+        except ValueError:
+            raise ValueError("Invalid event_stream_id")
+        events = events.filter(event_stream_id__in=event_stream_ids)
+
+    after_published = params.get("after_published")
+    after_id = params.get("after_id")
+
+    if after_published or after_id:
+        published = parse_datetime(after_published or "")
+
+        if published is None or not (after_id or "").isdigit():
+            raise ValueError("after_published and after_id must be given together")
+
+        # Keyset cursor: strictly after the last event the client received
+        events = events.filter(
+            Q(published__gt=published) | Q(published=published, id__gt=int(after_id))
+        )
+
+    if limit := params.get("limit"):
+        if not limit.isdigit():
+            raise ValueError(f"Invalid limit: {limit}")
+        events = events[: int(limit)]
+
+    return events
+
+
+@api_view(["GET"])
+def event_stream(request):
+    """
+    Stream events as NDJSON, one serialized event per line, ordered by
+    (published, id).
+
+    Filters: ``from``/``to`` dates (inclusive), ``thread``, ``type`` (event
+    class name, e.g. JournalAdded) and ``event_stream_id``, each repeatable.
+    A dump interrupted (or capped with ``limit``) resumes by passing the last
+    line's ``published`` and ``id`` as ``after_published`` and ``after_id``.
+    """
+    try:
+        events = _event_stream_queryset(request.GET)
+    except ValueError as e:
+        return RestResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    encoder = JSONEncoder()
+    context = {"request": request}
+
+    def lines():
+        for chunk in chunked(
+            events.non_polymorphic().iterator(chunk_size=EVENT_STREAM_CHUNK_SIZE),
+            EVENT_STREAM_CHUNK_SIZE,
+        ):
+            chunk = events.get_real_instances(chunk)
+
+            for data in EventSerializer(chunk, many=True, context=context).data:
+                yield encoder.encode(data) + "\n"
+
+    return StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+
+
 @login_required
 def account_settings(request):
     try:
@@ -447,7 +706,7 @@ def journal_add(request):
         if form.is_valid():
             journal_added = form.save()
             skip_habits = "reflection" in request.POST
-            process_journal_entry(journal_added, skip_habits=skip_habits)
+            submit_journal_entry(journal_added, skip_habits=skip_habits)
 
             messages.success(request, "Journal entry added successfully!")
             today_str = timezone.now().date().isoformat()
@@ -11,6 +11,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .services.boards import BoardVersionConflict
 from .services.health import latest_weight
 from .services.today import (
     NoBoardError,
@@ -74,6 +75,13 @@ def _no_board_response():
     )
 
 
+def _board_conflict_response():
+    return Response(
+        {"error": "board is being edited elsewhere; retry"},
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class AndroidTaskListView(APIView):
     """Return today's tasks: every line in today's Plan.focus, with a
@@ -150,6 +158,8 @@ class AndroidTaskAddView(APIView):
             add_task(request.user, text, today=today)
         except NoBoardError:
             return _no_board_response()
+        except BoardVersionConflict:
+            return _board_conflict_response()
         return Response({"ok": True}, status=status.HTTP_200_OK)
 
 
@@ -206,6 +216,8 @@ class AndroidTaskCompleteView(APIView):
             )
         except NoBoardError:
             return _no_board_response()
+        except BoardVersionConflict:
+            return _board_conflict_response()
         except StoryNotFoundError:
             return Response(
                 {"error": "story not found"}, status=status.HTTP_404_NOT_FOUND
@@ -262,4 +274,6 @@ class AndroidTaskDeleteView(APIView):
             delete_task(request.user, text, today=today)
         except NoBoardError:
             return _no_board_response()
+        except BoardVersionConflict:
+            return _board_conflict_response()
         return Response({"ok": True}, status=status.HTTP_200_OK)
@@ -17,11 +17,13 @@ from .services.trips import (
     StoryStoppedError,
     add_trip_note,
     add_trip_photo,
+    add_trip_photos,
     get_detail,
     list_active,
     list_history,
     presign_photo_original,
     presign_photo_upload,
+    presign_photo_uploads,
     share_trip,
     start_trip,
     stop_trip,
@@ -94,6 +96,10 @@ def _serialize_event(event):
     elif event["type"] == "photo":
         out["comment"] = event["comment"]
         out["thumbnail_url"] = event["thumbnail_url"]
+        out["placeholder_url"] = event["placeholder_url"]
+        out["display_url"] = event["display_url"]
+        out["width"] = event["width"]
+        out["height"] = event["height"]
         out["ready"] = event["ready"]
     elif event["type"] == "habit":
         out["habit_slug"] = event["habit_slug"]
@@ -323,6 +329,38 @@ class AndroidTripPhotoPresignView(APIView):
         return Response(result, status=status.HTTP_200_OK)
 
 
+def _photo_item_from(data):
+    """Validate the fields of a photo confirm.
+
+    Returns ``(item, None)`` with the ``add_trip_photo`` keyword arguments,
+    or ``(None, message)``.
+    """
+    if not isinstance(data, dict):
+        return None, "photo must be an object"
+    key = data.get("key")
+    if not isinstance(key, str) or not key.strip():
+        return None, "key is required"
+    content_type = data.get("content_type")
+    if not isinstance(content_type, str) or not content_type.strip():
+        return None, "content_type is required"
+    comment = data.get("comment")
+    if not isinstance(comment, str):
+        return None, "comment is required"
+    published = _parse_datetime(data.get("published"))
+    if published is None:
+        return None, "published is required (full ISO 8601 timestamp)"
+    idempotency_key = data.get("idempotency_key")
+    if idempotency_key is not None and not isinstance(idempotency_key, str):
+        return None, "idempotency_key must be a string"
+    return {
+        "key": key,
+        "comment": comment,
+        "content_type": content_type,
+        "published": published,
+        "idempotency_key": idempotency_key,
+    }, None
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class AndroidTripPhotoConfirmView(APIView):
     """Confirm an uploaded photo and create the PhotoAdded event.
@@ -338,31 +376,11 @@ class AndroidTripPhotoConfirmView(APIView):
         story_id = _story_id_from(request)
         if story_id is None:
             return _bad_request("story_id is required")
-        key = request.data.get("key")
-        if not isinstance(key, str) or not key.strip():
-            return _bad_request("key is required")
-        content_type = request.data.get("content_type")
-        if not isinstance(content_type, str) or not content_type.strip():
-            return _bad_request("content_type is required")
-        comment = request.data.get("comment")
-        if not isinstance(comment, str):
-            return _bad_request("comment is required")
-        published = _parse_datetime(request.data.get("published"))
-        if published is None:
-            return _bad_request("published is required (full ISO 8601 timestamp)")
-        idempotency_key = request.data.get("idempotency_key")
-        if idempotency_key is not None and not isinstance(idempotency_key, str):
-            return _bad_request("idempotency_key must be a string")
+        item, error = _photo_item_from(request.data)
+        if error is not None:
+            return _bad_request(error)
         try:
-            photo = add_trip_photo(
-                request.user,
-                story_id,
-                key=key,
-                comment=comment,
-                content_type=content_type,
-                published=published,
-                idempotency_key=idempotency_key,
-            )
+            photo = add_trip_photo(request.user, story_id, **item)
         except StoryNotFoundError:
             return _not_found()
         except StoryStoppedError:
@@ -372,6 +390,87 @@ class AndroidTripPhotoConfirmView(APIView):
         return Response({"ok": True, "photo_id": photo.pk}, status=status.HTTP_200_OK)
 
 
+@method_decorator(csrf_exempt, name="dispatch")
+class AndroidTripPhotoBatchPresignView(APIView):
+    """Allocate S3 keys and presigned PUT URLs for a batch of photo uploads.
+
+    Takes ``content_types``, one per photo, and returns ``uploads`` with a
+    ``key``/``upload_url`` for each, in order.
+    """
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        story_id = _story_id_from(request)
+        if story_id is None:
+            return _bad_request("story_id is required")
+        content_types = request.data.get("content_types")
+        if (
+            not isinstance(content_types, list)
+            or not content_types
+            or not all(isinstance(value, str) for value in content_types)
+        ):
+            return _bad_request("content_types is required (list of strings)")
+        try:
+            uploads = presign_photo_uploads(request.user, story_id, content_types)
+        except StoryNotFoundError:
+            return _not_found()
+        except StoryStoppedError:
+            return _conflict("trip is stopped; cannot add photos")
+        except ValueError as e:
+            return _bad_request(str(e))
+        return Response({"uploads": uploads}, status=status.HTTP_200_OK)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AndroidTripPhotoBatchConfirmView(APIView):
+    """Confirm a batch of uploaded photos and create their PhotoAdded events.
+
+    Takes ``photos``, each with the fields of ``AndroidTripPhotoConfirmView``,
+    and returns one result per photo, in order: its ``photo_id``, or an
+    ``error`` when its object is not in the bucket (re-upload and retry just
+    that photo). Idempotency keys make retrying the whole batch safe.
+    """
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        story_id = _story_id_from(request)
+        if story_id is None:
+            return _bad_request("story_id is required")
+        photos = request.data.get("photos")
+        if not isinstance(photos, list) or not photos:
+            return _bad_request("photos is required (list)")
+        items = []
+        for position, data in enumerate(photos):
+            item, error = _photo_item_from(data)
+            if error is not None:
+                return _bad_request(f"photos[{position}]: {error}")
+            items.append(item)
+        try:
+            confirmed = add_trip_photos(request.user, story_id, items)
+        except StoryNotFoundError:
+            return _not_found()
+        except StoryStoppedError:
+            return _conflict("trip is stopped; cannot add photos")
+        except ValueError as e:
+            return _bad_request(str(e))
+        results = [
+            (
+                {"key": item["key"], "photo_id": photo.pk}
+                if photo is not None
+                else {
+                    "key": item["key"],
+                    "error": "uploaded photo not found; re-upload and retry",
+                }
+            )
+            for item, photo in zip(items, confirmed)
+        ]
+        return Response({"ok": True, "photos": results}, status=status.HTTP_200_OK)
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class AndroidTripPhotoOriginalView(APIView):
     """Return a fresh short-lived presigned GET URL for a photo's original."""
@@ -1,17 +1,40 @@
 import datetime
+import uuid
 
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
 
 from rest_framework import status, viewsets
-from rest_framework.decorators import api_view
+from rest_framework.decorators import action, api_view
 from rest_framework.response import Response as RestResponse
 
 from .board_operations import add_task_to_board
 from .commit import calculate_changes_per_board, merge
 from .models import Board, BoardCommitted, Thread, default_state
-from .serializers import BoardSerializer, BoardSummary
+from .serializers import BoardOperationsSerializer, BoardSerializer, BoardSummary
+from .services.boards import (
+    BoardOperationError,
+    BoardVersionConflict,
+    patch_board,
+    retry_on_conflict,
+    save_if_unchanged,
+)
+
+
+def board_conflict_response(board_id, **extra):
+    """409 with the board's current version, for the client to retry on"""
+    version = Board.objects.filter(pk=board_id).values_list("version", flat=True)
+
+    return RestResponse(
+        {
+            "errors": "board was changed since it was read",
+            "version": version.first(),
+            **extra,
+        },
+        status=status.HTTP_409_CONFLICT,
+    )
 
 
 class BoardViewSet(viewsets.ModelViewSet):
@@ -30,6 +53,59 @@ class BoardViewSet(viewsets.ModelViewSet):
 
     serializer_class = BoardSerializer
 
+    def update(self, request, *args, **kwargs):
+        """Save the board, unless it changed since the version sent was read.
+
+        Clients send back the ``version`` they read, which the save compares
+        against; without one, the board is only protected from writes during
+        this request.
+        """
+        board = self.get_object()
+        expected = request.data.get("version")
+
+        if expected is not None:
+            try:
+                board.version = uuid.UUID(str(expected))
+            except ValueError:
+                return board_conflict_response(board.pk)
+
+        serializer = self.get_serializer(
+            board, data=request.data, partial=kwargs.pop("partial", False)
+        )
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            self.perform_update(serializer)
+        except BoardVersionConflict:
+            return board_conflict_response(board.pk)
+
+        return RestResponse(serializer.data)
+
+    @action(detail=True, methods=["post"])
+    def operations(self, request, pk=None):
+        """Apply task operations to the board as currently stored.
+
+        Takes ``{"operations": [...]}``, each one of ``add`` (text, optional
+        id, parent and index), ``rename`` (id, text), ``move`` (id, optional
+        parent and index) and ``set_state`` (id, state), and returns the new
+        ``version`` and the id of the task each operation applied to.
+        """
+        board = self.get_object()
+
+        serializer = BoardOperationsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            board, ids = patch_board(board.pk, serializer.validated_data["operations"])
+        except BoardOperationError as e:
+            return board_conflict_response(
+                board.pk, errors=e.message, operation=e.position
+            )
+        except BoardVersionConflict:
+            return board_conflict_response(board.pk)
+
+        return RestResponse({"version": board.version, "ids": ids})
+
 
 def make_board(thread_name):
     thread = Thread.objects.get(name=thread_name)
@@ -40,9 +116,10 @@ def make_board(thread_name):
         return Board(thread=thread)
 
 
-@api_view(["POST"])
-def commit_board(request, id=None):
-    board = Board.objects.get(pk=id)
+@retry_on_conflict
+@transaction.atomic
+def _commit(board_id):
+    board = Board.objects.get(pk=board_id)
 
     changeset = calculate_changes_per_board(board.state)
 
@@ -72,12 +149,26 @@ def commit_board(request, id=None):
     other_boards = list(map(make_board, changeset.keys()))
 
     for other_board in other_boards:
+        # Its own board is overwritten with new_state below anyway
+        if other_board.pk == board.pk:
+            continue
+
         other_board.state = merge(other_board.state, changeset[other_board.thread.name])
-        other_board.save()
+        save_if_unchanged(other_board, ["state"])
 
     board.state = new_state
     board.date_started = now
-    board.save()
+    save_if_unchanged(board, ["state", "date_started"])
+
+    return board
+
+
+@api_view(["POST"])
+def commit_board(request, id=None):
+    try:
+        board = _commit(id)
+    except BoardVersionConflict:
+        return board_conflict_response(id)
 
     return RestResponse(BoardSerializer(board).data)
 
@@ -130,8 +221,11 @@ def period_from_request(request, days=7, start=None, end=None):
 def summaries(request):
     period = period_from_request(request, days=30)
 
-    boards = BoardCommitted.objects.filter(published__range=period).order_by(
-        "-published"
+    boards = (
+        BoardCommitted.objects.filter(published__range=period)
+        .defer("after_data", "transitions_data")
+        .select_related("thread")
+        .order_by("-published")
     )
 
     summaries = [BoardSummary(board) for board in boards]
@@ -1,5 +1,4 @@
 import datetime
-from collections import Counter
 from datetime import date
 from functools import cached_property
 
@@ -19,8 +18,12 @@ from rest_framework.response import Response as RestResponse
 from .forms import OnlyTextSingleHabitTrackedForm, SingleHabitTrackedForm
 from .models import Habit, HabitTracked, Profile, Thread
 from .serializers import HabitKeywordSerializer, HabitSerializer
+from .services.habits import habit_stats
 from .utils.datetime import DayCount, adjust_start_date_to_monday, date_range_generator
+from .utils.habit_calendar import habit_day_counts
 from .utils.itertools import itemize
+from .utils.statistics import bulk_create_events
+from .uuid_generators import habit_event_stream_id
 
 
 def get_day_from_request(request):
@@ -78,18 +81,21 @@ def track_habit(request):
             )
         return RestResponse(form.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    habits_tracked = []
-
-    for occured, habit, note in form.cleaned_data["triplets"]:
-        obj = HabitTracked.objects.create(
+    habits_tracked = [
+        HabitTracked(
             occured=occured,
             habit=habit,
             note=note,
             published=form.cleaned_data["published"],
             thread=form.cleaned_data["thread"],
         )
+        for occured, habit, note in form.cleaned_data["triplets"]
+    ]
 
-        habits_tracked.append(obj)
+    for habit_tracked in habits_tracked:
+        habit_tracked.event_stream_id = habit_event_stream_id(habit_tracked)
+
+    bulk_create_events(HabitTracked, habits_tracked)
 
     if request.htmx:
         initial_dict = {}
@@ -108,40 +114,42 @@ def track_habit(request):
     return RestResponse({"ok": True}, status=status.HTTP_200_OK)
 
 
-def _habit_calendar(habit, start, end):
-    events = (
-        HabitTracked.objects.filter(
-            habit=habit,
-            published__range=(start, end),
-        )
-        .order_by("published")
-        .values("published", "occured")
-    )
+def habit_calendars(habits, start, end):
+    """Build the DayCount calendars of several habits from one rollup query
 
-    c = Counter()
+    Returns:
+        Dict mapping each habit's pk to a list of DayCounts from the Monday
+        on or before start up to end.
+    """
+    start = adjust_start_date_to_monday(start)
 
-    for event in events:
-        if c[event["published"].date()] == -1:
-            continue
+    counts = habit_day_counts(
+        [habit.pk for habit in habits],
+        timezone.localdate(start),
+        timezone.localdate(end),
+    )
 
-        if event["occured"] == False:
-            c[event["published"].date()] = -1
-            continue
+    return {
+        habit_id: list(
+            itemize(
+                date_range_generator(start, end),
+                days,
+                default=0,
+                item_type=DayCount,
+            )
+        )
+        for habit_id, days in counts.items()
+    }
 
-        c[event["published"].date()] += 1
 
-    return c
+def habit_calendar(habit, start, end):
+    return habit_calendars([habit], start, end)[habit.pk]
 
 
-def habit_calendar(habit, start, end):
-    start = adjust_start_date_to_monday(start)
+def last_year_range():
+    now = timezone.now()
 
-    return itemize(
-        date_range_generator(start, end),
-        _habit_calendar(habit, start, end),
-        default=0,
-        item_type=DayCount,
-    )
+    return now - datetime.timedelta(days=365), now + datetime.timedelta(days=1)
 
 
 class HabitDetailView(LoginRequiredMixin, DetailView):
@@ -155,14 +163,12 @@ class HabitDetailView(LoginRequiredMixin, DetailView):
         return HabitTracked.objects.filter(habit=self.object).order_by("-published")
 
     def get_context_data(self, **kwargs):
-        start = timezone.now() - datetime.timedelta(days=365)
-        end = timezone.now() + datetime.timedelta(days=1)
-
         context = super().get_context_data(**kwargs)
 
         context.update(
             {
-                "event_calendar": habit_calendar(self.object, start, end),
+                "event_calendar": habit_calendar(self.object, *last_year_range()),
+                "stats": habit_stats([self.object])[self.object.pk],
                 "tracked_habits": self.tracked_habits,
                 "total_event_count": self.tracked_habits.count(),
             }
@@ -172,8 +178,30 @@ class HabitDetailView(LoginRequiredMixin, DetailView):
 
 
 class HabitListView(LoginRequiredMixin, ListView):
+    """All habits, each with its calendar of the last year and its streaks.
+
+    The calendars of every habit are read in a single query over the
+    HabitDayCount rollup; streaks come from the habit_stats cache.
+    """
+
     model = Habit
 
+    def get_queryset(self):
+        return super().get_queryset().prefetch_related("keywords")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        calendars = habit_calendars(context["object_list"], *last_year_range())
+        stats = habit_stats(context["object_list"])
+
+        context["habits_with_calendars"] = [
+            (habit, calendars[habit.pk], stats[habit.pk])
+            for habit in context["object_list"]
+        ]
+
+        return context
+
 
 def get_habit_keywords_for_user(user, all=False):
     from django.db.models import Count
@@ -1,5 +1,7 @@
 import datetime
+from collections import Counter
 
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.decorators import method_decorator
@@ -11,12 +13,15 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import HabitKeyword, HabitTracked, Thread
-from .serializers import TrackHabitAPISerializer
-
-
-def _aware_midday(date: datetime.date):
-    return timezone.make_aware(datetime.datetime.combine(date, datetime.time(12, 0)))
+from .models import Habit, Thread
+from .serializers import (
+    HabitCalendarQuerySerializer,
+    HabitQuerySerializer,
+    TrackHabitAPISerializer,
+    TrackHabitBatchAPISerializer,
+)
+from .services.habits import UNKNOWN_KEYWORD, habit_stats, track_habits
+from .utils.habit_calendar import habit_day_counts
 
 
 @method_decorator(csrf_exempt, name="dispatch")
@@ -37,33 +42,161 @@ class TrackHabitAPIView(APIView):
     def post(self, request):
         serializer = TrackHabitAPISerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        data = serializer.validated_data
 
-        keyword = get_object_or_404(
-            HabitKeyword.objects.select_related("habit"), keyword=data["keyword"]
-        )
-        habit = keyword.habit
         thread = get_object_or_404(Thread, name="Daily")
 
-        published = _aware_midday(data["date"])
-
-        existing = HabitTracked.objects.filter(
-            habit=habit, published__date=data["date"]
-        ).first()
-
-        if existing is not None:
-            existing.note = data["note"]
-            existing.occured = True
-            existing.thread = thread
-            existing.published = published
-            existing.save()
-        else:
-            HabitTracked.objects.create(
-                habit=habit,
-                occured=True,
-                note=data["note"],
-                thread=thread,
-                published=published,
-            )
+        [result] = track_habits([serializer.validated_data], thread)
+
+        if result == UNKNOWN_KEYWORD:
+            raise Http404("No habit with this keyword")
 
         return Response({"ok": True}, status=status.HTTP_200_OK)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class TrackHabitBatchAPIView(APIView):
+    """JSON endpoint recording many (keyword, date, note) records at once.
+
+    Meant for backfills, e.g. a month of health metrics in one request. Each
+    record behaves as a POST to TrackHabitAPIView would; the response lists
+    per record whether its event was ``created`` or ``updated``, or that its
+    keyword is unknown (``unknown_keyword``). Records with unknown keywords
+    do not stop the others from being saved.
+    """
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = TrackHabitBatchAPISerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        records = serializer.validated_data["records"]
+
+        thread = get_object_or_404(Thread, name="Daily")
+
+        results = track_habits(records, thread)
+
+        return Response(
+            {
+                "results": [
+                    {
+                        "keyword": record["keyword"],
+                        "date": record["date"].isoformat(),
+                        "status": result,
+                    }
+                    for record, result in zip(records, results)
+                ],
+                "counts": Counter(results),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+def _habits_from_query(validated_data):
+    """The habits named by repeated ``habit=<slug>`` parameters, or all"""
+    slugs = set(validated_data.get("habit", []))
+
+    habits = Habit.objects.all()
+
+    if slugs:
+        habits = habits.filter(slug__in=slugs)
+
+    habits = list(habits)
+
+    if len(habits) < len(slugs):
+        raise Http404("No habit with this slug")
+
+    return habits
+
+
+class HabitCalendarAPIView(APIView):
+    """Daily counts of several habits over several years.
+
+    Query parameters (both repeatable):
+    - habit=<slug>: Habits to include, all habits by default
+    - year=YYYY: Years to include, the current year by default
+
+    Days are read from the HabitDayCount rollup in one query, however long
+    the history. Only tracked days are listed; a count of -1 marks a day
+    the habit was skipped.
+    """
+
+    def get(self, request):
+        serializer = HabitCalendarQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        habits = _habits_from_query(serializer.validated_data)
+        years = sorted(
+            set(serializer.validated_data.get("year") or [timezone.localdate().year])
+        )
+
+        calendars = habit_day_counts(
+            [habit.pk for habit in habits],
+            datetime.date(years[0], 1, 1),
+            datetime.date(years[-1], 12, 31),
+        )
+
+        return Response(
+            {
+                "years": years,
+                "habits": [
+                    {
+                        "slug": habit.slug,
+                        "name": habit.name,
+                        "days": {
+                            day.isoformat(): count
+                            for day, count in sorted(calendars[habit.pk].items())
+                            if day.year in years
+                        },
+                    }
+                    for habit in habits
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+def _optional_isoformat(day):
+    return day.isoformat() if day is not None else None
+
+
+class HabitStatsAPIView(APIView):
+    """Streaks and frequencies of habits, computed for today.
+
+    Query parameters:
+    - habit=<slug>: Habits to include (repeatable), all habits by default
+
+    See ``compute_habit_stats`` for what each value counts.
+    """
+
+    def get(self, request):
+        serializer = HabitQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        habits = _habits_from_query(serializer.validated_data)
+        stats = habit_stats(habits)
+
+        return Response(
+            {
+                "habits": [
+                    {
+                        "slug": habit.slug,
+                        "name": habit.name,
+                        "event_stream_id": habit.event_stream_id,
+                        **stats[habit.pk]._asdict(),
+                        "longest_streak_end": _optional_isoformat(
+                            stats[habit.pk].longest_streak_end
+                        ),
+                        "last_tracked": _optional_isoformat(
+                            stats[habit.pk].last_tracked
+                        ),
+                        "weekly": [
+                            {"week": monday.isoformat(), "days": days}
+                            for monday, days in stats[habit.pk].weekly
+                        ],
+                    }
+                    for habit in habits
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
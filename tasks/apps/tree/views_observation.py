@@ -2,7 +2,6 @@ from datetime import date
 
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
 from django.db import transaction
 from django.db.models import Exists, OuterRef, Subquery
 from django.forms import inlineformset_factory
@@ -28,6 +27,7 @@ from .models import (
     ObservationDetached,
     ObservationType,
     ObservationUpdated,
+    SearchDocument,
     Thread,
     observation_event_types,
 )
@@ -46,6 +46,8 @@ from .serializers import (
 )
 from .services.observations.event_creation import create_observation_change_events
 from .services.observations.insights import extract_insight
+from .services.search.documents import search_documents
+from .utils.db import pk_prefix_q
 
 
 class ObservationPagination(PageNumberPagination):
@@ -502,7 +504,7 @@ def observation_attach(request, observation_id):
             # It's okay if observation doesn't exist (could be closed)
             other_observation = None
 
-    # Check if the observation is already attached by replaying events
+    # Check if the observation is already attached
     from .presenters import ComplexPresenter
 
     complex_presenter = ComplexPresenter(complex_observation.event_stream_id)
@@ -531,7 +533,11 @@ def observation_attach(request, observation_id):
         other_event_stream_id=other_event_stream_id,
         observation=other_observation,
     )
-    attach_event.save()
+
+    # The attachment projection is updated by a post_save signal; keep it in
+    # the same transaction as the event.
+    with transaction.atomic():
+        attach_event.save()
 
     serializer = ObservationAttachedSerializer(
         attach_event, context={"request": request}
@@ -552,7 +558,7 @@ def observation_detach(request, observation_id):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Check if the observation is currently attached by replaying events
+    # Check if the observation is currently attached
     from .presenters import ComplexPresenter
 
     complex_presenter = ComplexPresenter(complex_observation.event_stream_id)
@@ -580,7 +586,9 @@ def observation_detach(request, observation_id):
         event_stream_id=complex_observation.event_stream_id,
         other_event_stream_id=other_event_stream_id,
     )
-    detach_event.save()
+
+    with transaction.atomic():
+        detach_event.save()
 
     serializer = ObservationDetachedSerializer(
         detach_event, context={"request": request}
@@ -636,7 +644,8 @@ def observation_search(request):
         # Search by primary key pattern - find PKs that start with the number
         observations = (
             Observation.objects.with_last_event_published()
-            .extra(where=["CAST(id AS TEXT) LIKE %s"], params=[pk_query + "%"])
+            .filter(pk_prefix_q(Observation, pk_query))
+            .select_related("thread", "type", "user")
             .order_by("id")
         )
 
@@ -665,22 +674,17 @@ def observation_search(request):
             }
         )
 
-    # Create search vectors with different weights
-    # Situation field gets higher weight (A = highest weight)
-    # Interpretation and approach get lower weight (B)
-    search_vector = (
-        SearchVector("situation", weight="A")
-        + SearchVector("interpretation", weight="B")
-        + SearchVector("approach", weight="B")
-    )
-
-    search_query = SearchQuery(query)
+    # Match against the stored search documents; situation is weighted
+    # above interpretation and approach
+    documents = search_documents(query, kinds=[SearchDocument.Kind.OBSERVATION])
 
-    # Search observations and rank by relevance
     observations = (
         Observation.objects.with_last_event_published()
-        .annotate(search=search_vector, rank=SearchRank(search_vector, search_query))
-        .filter(search=search_query)
+        .annotate(
+            rank=Subquery(documents.filter(object_id=OuterRef("pk")).values("rank")[:1])
+        )
+        .filter(pk__in=documents.values("object_id"))
+        .select_related("thread", "type", "user")
         .order_by("-rank", "-pub_date")
     )
 
@@ -313,7 +313,9 @@ def today(request):
     reflection = get_or_initial(Reflection, pub_date=canonical_date, thread=thread)
 
     habits = Habit.objects.all()
-    tracked_habits = HabitTracked.objects.filter(published__range=period.as_tuple())
+    tracked_habits = HabitTracked.objects.filter(
+        published__range=period.as_tuple()
+    ).select_related("habit")
 
     if request.method == "POST":
         plan = PlanForm(request.POST, instance=today_plan, prefix="today_plan")
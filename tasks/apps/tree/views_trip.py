@@ -128,13 +128,7 @@ def _story_events(story):
     side-effect HabitTracked rows). Shared by the private and public detail
     views so both render through the same pipeline.
     """
-    entries = (
-        StoryEvent.objects.filter(story=story, event__journaladded__isnull=False)
-        .select_related("event")
-        .order_by("-event__published")
-    )
-    events = [entry.event.get_real_instance() for entry in entries]
-    return attach_photo_urls(events)
+    return attach_photo_urls(trip_ops.story_entries(story))
 
 
 def _share_context(request, story):
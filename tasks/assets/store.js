@@ -15,12 +15,18 @@ const apiRequest = async (url, options = {}) => {
     });
 
     if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
+        const error = new Error(`HTTP error! status: ${response.status}`);
+        error.status = response.status;
+        error.data = await response.json().catch(() => null);
+        throw error;
     }
 
     return response.json();
 };
 
+// Board saves go out one at a time, see save()
+let lastSave = Promise.resolve();
+
 import { createTreeItem, createBoard, FILTER_MODES, nodeMatchesMode, ensureItemIds } from './utils'
 
 import equal from 'deep-equal'
@@ -58,6 +64,10 @@ export const useBoardStore = defineStore('board', {
         currentThreadPtr: name_ptr(DEFAULT_NAME),
         filterMode: 'all',
         listViewMode: false,
+        // Set when a save was refused because the board was edited
+        // elsewhere: { boardId, version } with the version now stored.
+        // Local edits are kept, and not saved, until the user picks a side.
+        conflict: null,
     }),
 
     getters: {
@@ -117,6 +127,7 @@ export const useBoardStore = defineStore('board', {
                 ensureItemIds(board.state)
             }
             this.listResponse = payload
+            this.conflict = null
         },
 
         updateBoardInListResponse(payload) {
@@ -204,12 +215,78 @@ export const useBoardStore = defineStore('board', {
 
             this.updateBoardInListResponse(newBoard)
 
-            const board = await apiRequest(`/boards/${newBoard.id}/`, {
-                method: 'PUT',
-                body: JSON.stringify(newBoard)
-            })
+            if (this.conflict) {
+                // Kept locally until the conflict is resolved
+                return;
+            }
 
-            this.updateBoardInListResponse(board)
+            await this.queuePut(newBoard)
+        },
+
+        async queuePut(newBoard) {
+            // Each save sends the version the previous one returned, so the
+            // server refuses it if the board was edited elsewhere meanwhile
+            const saving = lastSave.then(() => this.putBoard(newBoard))
+            lastSave = saving.catch(() => {})
+
+            await saving
+        },
+
+        async putBoard(newBoard) {
+            const findBoard = () => this.listResponse.results.find(
+                (item) => item.id === newBoard.id
+            )
+
+            let board
+
+            try {
+                board = await apiRequest(`/boards/${newBoard.id}/`, {
+                    method: 'PUT',
+                    body: JSON.stringify({
+                        ...newBoard,
+                        version: findBoard()?.version ?? newBoard.version,
+                    })
+                })
+            } catch (error) {
+                if (error.status === 409) {
+                    // Edited elsewhere: keep the local board and let the
+                    // user choose between it and the stored one
+                    this.conflict = {
+                        boardId: newBoard.id,
+                        version: error.data?.version,
+                    }
+                    return
+                }
+
+                throw error
+            }
+
+            // Keep edits made while saving, which are queued to save next
+            const current = findBoard()
+
+            if (current) {
+                current.version = board.version
+            }
+        },
+
+        async keepLocalBoard() {
+            const { boardId, version } = this.conflict
+            const board = this.listResponse.results.find((item) => item.id === boardId)
+
+            this.conflict = null
+
+            if (!board) {
+                return;
+            }
+
+            // Saves over the edits made elsewhere
+            board.version = version
+            await this.queuePut(board)
+        },
+
+        async loadStoredBoard() {
+            this.conflict = null
+            await this.reloadBoards()
         },
 
         async close() {
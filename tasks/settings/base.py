@@ -60,6 +60,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
+    "tasks.apps.tree.middleware.PhotoStorageCountsMiddleware",
 ]
 
 ROOT_URLCONF = "tasks.urls"
@@ -213,4 +214,39 @@ globals().setdefault(
     "AWS_S3_WEB_ENDPOINT_URL", globals().get("AWS_S3_PUBLIC_ENDPOINT_URL")
 )
 
+# Connections each cached S3 client keeps open; at least the number of threads
+# a web or Celery worker process runs, so none waits for a free one.
+globals().setdefault(
+    "AWS_S3_MAX_POOL_CONNECTIONS",
+    int(os.environ.get("AWS_S3_MAX_POOL_CONNECTIONS", "20")),
+)
+
+# Presigned GET URLs are reused until this many seconds before they expire, so
+# a page is never rendered with a photo URL about to stop working.
+globals().setdefault(
+    "PHOTO_PRESIGN_GET_MARGIN",
+    int(os.environ.get("PHOTO_PRESIGN_GET_MARGIN", "900")),
+)
+
+# Renditions the thumbnail task encodes from each original, by longest edge in
+# pixels: a placeholder shown while loading, the grid miniature (recorded as
+# ``thumbnail_key``) and the size a photo is opened at. aws.py may override it.
+globals().setdefault(
+    "PHOTO_RENDITIONS",
+    {
+        "tiny": 32,
+        "thumb": globals().get("PHOTO_THUMBNAIL_MAX_EDGE", 480),
+        "display": int(os.environ.get("PHOTO_DISPLAY_MAX_EDGE", "1600")),
+    },
+)
+
 CELERY_BEAT_SCHEDULE = {}
+
+# Extract reflections and habits from new journal entries in a Celery worker
+# after the request commits, instead of inside the request.
+JOURNAL_PROCESSING_ASYNC = os.environ.get("JOURNAL_PROCESSING_ASYNC", "") == "1"
+
+# Store the board trees of new BoardCommitted events as references into the
+# content-addressed BoardNode store ("nodes"), sharing unchanged subtrees
+# between commits, instead of as full JSON copies ("full").
+BOARD_COMMITTED_STORAGE = os.environ.get("BOARD_COMMITTED_STORAGE", "full")